@@ -0,0 +1,230 @@
+# MIT License
+
+# Copyright (c) 2020 Tirth Patel & Tirth Hihoriya
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Benchmarks for the scheduling logic.
+
+Runs the scheduler on seeded synthetic workloads (see
+`workload.generate_workload`) and times the phases that matter for
+large runs:
+
+ - `dispatch`: a full simulation, reported as events per second.
+ - `quantum`: admitting, dispatching and computing the time quantum
+   with `scheduler.BurstStatistics`, reported as dispatches per second.
+ - `metrics`: `metrics.calculate_metrics` over all processes.
+ - `export`: `metrics.save_results` to a temporary file.
+
+The results are written as JSON so they can be compared across
+versions.
+
+Usage::
+
+    python benchmark.py --sizes 1000 100000 10000000 --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from metrics import calculate_metrics, save_results
+from scheduler import TIME_QUANTUM_METHODS, BurstStatistics, RoundRobinSimulation
+from workload import ARRIVAL_PATTERNS, BURST_DISTRIBUTIONS, generate_workload
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_WORKLOADS = (
+    ("poisson", "lognormal"),
+    ("poisson", "pareto"),
+    ("batch", "lognormal"),
+    ("zero", "uniform"),
+)
+
+
+def _best_of(repeat, function):
+    """Run `function` `repeat` times. Returns the shortest time
+    and the value returned by the last run."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, value
+
+
+def bench_dispatch(table, method, repeat=1):
+    def simulate():
+        simulation = RoundRobinSimulation(table.copy(), time_quantum_method=method)
+        events = 0
+        for _ in simulation.events():
+            events += 1
+        return simulation, events
+
+    seconds, (simulation, events) = _best_of(repeat, simulate)
+    return seconds, events, simulation
+
+
+def bench_quantum(table, method, repeat=1):
+    burst_time = table.burst_time
+
+    def compute():
+        # Every process is admitted, dispatched once and its quantum
+        # is computed, like a ready queue that keeps turning over.
+        statistics = BurstStatistics()
+        for value in burst_time:
+            statistics.add(value)
+        for value in burst_time:
+            statistics.time_quantum(method)
+            statistics.remove(value)
+
+    seconds, _ = _best_of(repeat, compute)
+    return seconds, len(burst_time)
+
+
+def run_benchmarks(
+    sizes=DEFAULT_SIZES,
+    workloads=DEFAULT_WORKLOADS,
+    methods=TIME_QUANTUM_METHODS,
+    seed=0,
+    repeat=1,
+    log=None,
+):
+    """Run the benchmarks.
+
+    Returns
+    -------
+    results: list
+        One dict per measurement with the `benchmark`, `size`,
+        `arrivals`, `bursts`, `method`, `seconds` and `ops_per_second`.
+    """
+    results = []
+
+    def record(benchmark, size, arrivals, bursts, method, seconds, ops):
+        result = {
+            "benchmark": benchmark,
+            "size": size,
+            "arrivals": arrivals,
+            "bursts": bursts,
+            "method": method,
+            "seconds": seconds,
+            "ops_per_second": ops / seconds if seconds > 0 else None,
+        }
+        results.append(result)
+        if log is not None:
+            print(
+                f"{benchmark:<9} {size:>9} {arrivals:<8} {bursts:<10} "
+                f"{method or '':<15} {seconds:10.4f}s",
+                file=log,
+            )
+
+    for size in sizes:
+        for arrivals, bursts in workloads:
+            seconds, table = _best_of(
+                1, lambda: generate_workload(size, arrivals, bursts, seed=seed)
+            )
+            record("generate", size, arrivals, bursts, None, seconds, size)
+            for method in methods:
+                seconds, events, simulation = bench_dispatch(table, method, repeat)
+                record("dispatch", size, arrivals, bursts, method, seconds, events)
+                seconds, dispatches = bench_quantum(table, method, repeat)
+                record("quantum", size, arrivals, bursts, method, seconds, dispatches)
+
+            # The metrics and the export don't depend on the method,
+            # we use the results of the last simulation.
+            rows = simulation.terminated_tasks
+            seconds, _ = _best_of(
+                repeat, lambda: calculate_metrics(simulation.table, rows)
+            )
+            record("metrics", size, arrivals, bursts, None, seconds, size)
+            with tempfile.TemporaryDirectory() as directory:
+                filename = os.path.join(directory, "results.csv")
+                seconds, _ = _best_of(
+                    repeat, lambda: save_results(filename, simulation.table, rows)
+                )
+            record("export", size, arrivals, bursts, None, seconds, size)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scheduler.")
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=int,
+        default=list(DEFAULT_SIZES),
+        help="number of processes per workload",
+    )
+    parser.add_argument(
+        "--arrivals",
+        nargs="+",
+        choices=ARRIVAL_PATTERNS,
+        help="arrival patterns to run (default: a representative set)",
+    )
+    parser.add_argument(
+        "--bursts",
+        nargs="+",
+        choices=BURST_DISTRIBUTIONS,
+        help="burst time distributions to run with every arrival pattern",
+    )
+    parser.add_argument(
+        "--methods",
+        nargs="+",
+        choices=TIME_QUANTUM_METHODS,
+        default=list(TIME_QUANTUM_METHODS),
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1, help="keep the best of N")
+    parser.add_argument("--label", help="a label for this run, e.g. a version")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args(argv)
+
+    workloads = DEFAULT_WORKLOADS
+    if args.arrivals or args.bursts:
+        workloads = [
+            (arrivals, bursts)
+            for arrivals in args.arrivals or ARRIVAL_PATTERNS
+            for bursts in args.bursts or BURST_DISTRIBUTIONS
+        ]
+    results = run_benchmarks(
+        args.sizes, workloads, args.methods, args.seed, args.repeat, log=sys.stderr
+    )
+    report = {
+        "label": args.label,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
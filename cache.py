@@ -0,0 +1,351 @@
+# MIT License
+
+# Copyright (c) 2020 Tirth Patel & Tirth Hihoriya
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Content-addressed cache of simulation results.
+
+A run is identified by a hash of the processes it schedules (their
+pids, burst and arrival times, not the file they came from), the time
+quantum method and every parameter of the simulation. Running the same
+workload with the same settings again returns the cached results
+instead of scheduling the processes again, while changing any of them
+gives a different key.
+
+The results are kept in memory, evicting the least recently used
+ones, and optionally in a directory on disk, which is trimmed to a
+size cap by evicting the least recently used files.
+
+Usage::
+
+    cache = ResultCache("~/.cache/roundrobin")
+    result = cache.run(table, "Harmonic")
+    result.save("results.csv")
+"""
+
+import copy
+import hashlib
+import os
+import pickle
+import random
+import threading
+from array import array
+from collections import OrderedDict, namedtuple
+
+from metrics import calculate_metrics, result_rows, write_results
+from scheduler import TICK, RoundRobinSimulation
+
+# Bump when a change to the simulation changes its results,
+# so that results cached by older versions aren't used.
+CACHE_VERSION = 2
+
+EXTENSION = ".result"
+
+
+class CachedResult(
+    namedtuple(
+        "CachedResult", ("columns", "metrics", "context_switches", "switch_overhead")
+    )
+):
+    """The results of a run.
+
+    Attributes
+    ----------
+    columns: tuple
+        One array per `RESULT_COLUMNS`, with a row per terminated
+        process in the order they terminated.
+
+    metrics: dict
+        The metrics of `metrics.calculate_metrics`.
+
+    context_switches: int
+        The number of context switches of the run.
+
+    switch_overhead: float
+        The time spent switching between processes.
+    """
+
+    __slots__ = ()
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def rows(self):
+        """Yield the `RESULT_COLUMNS` of each process."""
+        return zip(*self.columns)
+
+    def save(self, filename):
+        """Write the results to a CSV file like `metrics.save_results`."""
+        write_results(filename, self.rows())
+
+
+def workload_digest(table):
+    """Hash the pids, burst times and arrival times of a `ProcessTable`."""
+    digest = hashlib.sha256()
+    digest.update(str(len(table)).encode())
+    for column in (table.pid, table.burst_time, table.arrival_time):
+        digest.update(column.tobytes())
+    return digest.hexdigest()
+
+
+def _fingerprint(value):
+    # A stable representation of a parameter, which can be an object
+    # with state like a ContextSwitchCost or a BurstEstimator.
+    if value is None or isinstance(value, (bool, int, str)):
+        return repr(value)
+    if isinstance(value, float):
+        return value.hex()
+    if isinstance(value, (tuple, list)):
+        return "[" + ",".join(map(_fingerprint, value)) + "]"
+    if isinstance(value, dict):
+        items = sorted((_fingerprint(k), _fingerprint(v)) for k, v in value.items())
+        return "{" + ",".join(f"{k}:{v}" for k, v in items) + "}"
+    if isinstance(value, random.Random):
+        return _fingerprint(value.getstate())
+    if hasattr(value, "__code__"):
+        # Functions with the same name, like lambdas, differ by their code.
+        code = value.__code__
+        return (
+            f"{value.__module__}.{value.__qualname__}:"
+            + hashlib.sha256(code.co_code + repr(code.co_consts).encode()).hexdigest()
+        )
+    if callable(value) and hasattr(value, "__qualname__"):
+        return f"{value.__module__}.{value.__qualname__}"
+    if hasattr(value, "__dict__"):
+        return type(value).__qualname__ + _fingerprint(vars(value))
+    raise TypeError(f"Can't cache results of runs with a {type(value).__name__}")
+
+
+def cache_key(table, time_quantum_method, **parameters):
+    """The key of a run of `RoundRobinSimulation` on `table`.
+
+    Parameters
+    ----------
+    table: ProcessTable
+        The processes to schedule.
+
+    time_quantum_method: str
+        The time quantum method.
+
+    **parameters:
+        The other arguments of the simulation.
+
+    Returns
+    -------
+    key: str
+        A hex digest that changes with any of the inputs.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{CACHE_VERSION}:{workload_digest(table)}:".encode())
+    digest.update(_fingerprint((time_quantum_method, parameters)).encode())
+    return digest.hexdigest()
+
+
+class ResultCache(object):
+    """Cache of the results of simulations.
+
+    Parameters
+    ----------
+    directory: optional, str
+        Directory to store the results in. Results are only kept
+        in memory if not given.
+
+    max_entries: optional, int
+        Number of results kept in memory.
+
+    max_bytes: optional, int
+        Size cap of the directory.
+    """
+
+    def __init__(self, directory=None, max_entries=128, max_bytes=256 * 2**20):
+        self.directory = directory and os.path.expanduser(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def __getstate__(self):
+        # Worker processes of a sweep share the directory, not the memory.
+        state = self.__dict__.copy()
+        state["memory"] = OrderedDict()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + EXTENSION)
+
+    def get(self, key):
+        """The cached result of a key, or `None`."""
+        with self.lock:
+            result = self.memory.get(key)
+            if result is not None:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return result
+        result = self._load(key)
+        with self.lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._remember(key, result)
+        return result
+
+    def put(self, key, result):
+        """Cache the result of a key."""
+        with self.lock:
+            self._remember(key, result)
+        if self.directory:
+            self._store(key, result)
+
+    def _remember(self, key, result):
+        self.memory[key] = result
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def _load(self, key):
+        if not self.directory:
+            return None
+        try:
+            with open(self.path(key), "rb") as f:
+                result = CachedResult(*pickle.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError, TypeError):
+            # A truncated or foreign file is a miss, not an error.
+            return None
+        # The access time isn't reliable, so the modification time
+        # records when a file was last used.
+        try:
+            os.utime(self.path(key))
+        except OSError:
+            pass
+        return result
+
+    def _store(self, key, result):
+        path = self.path(key)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as f:
+            pickle.dump(tuple(result), f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Readers never see a partially written file.
+        os.replace(temporary, path)
+        self.trim()
+
+    def trim(self):
+        """Evict the least recently used files until the
+        directory fits in `max_bytes`."""
+        files = []
+        total = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(EXTENSION):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Drop every cached result, in memory and on disk."""
+        with self.lock:
+            self.memory.clear()
+        if self.directory:
+            for name in os.listdir(self.directory):
+                if name.endswith(EXTENSION):
+                    os.remove(os.path.join(self.directory, name))
+
+    def run(
+        self,
+        table,
+        time_quantum_method="Arithmetic",
+        time_quantum=None,
+        context_switch_cost=None,
+        burst_estimator=None,
+        resolution=TICK,
+    ):
+        """The results of scheduling `table` with `RoundRobinSimulation`,
+        from the cache if the same run was cached before.
+
+        Neither the table nor the context switch cost and the burst
+        estimator are modified. The arguments are the ones of
+        `RoundRobinSimulation`.
+
+        Returns
+        -------
+        result: CachedResult
+            The results of the run.
+        """
+        key = cache_key(
+            table,
+            time_quantum_method,
+            time_quantum=time_quantum,
+            context_switch_cost=context_switch_cost,
+            burst_estimator=burst_estimator,
+            resolution=resolution,
+        )
+        result = self.get(key)
+        if result is not None:
+            return result
+
+        # The cost and the estimator are stateful, so the simulation
+        # runs on copies and the same arguments give the same key again.
+        simulation = RoundRobinSimulation(
+            table.copy(),
+            time_quantum_method=time_quantum_method,
+            time_quantum=time_quantum,
+            context_switch_cost=copy.deepcopy(context_switch_cost),
+            burst_estimator=copy.deepcopy(burst_estimator),
+            resolution=resolution,
+        )
+        rows = simulation.run()
+        columns = tuple(
+            array(code, values)
+            for code, values in zip(
+                "qdddddd", zip(*result_rows(simulation.table, rows))
+            )
+        )
+        result = CachedResult(
+            columns,
+            calculate_metrics(simulation.table, rows),
+            simulation.context_switches,
+            simulation.switch_overhead,
+        )
+        self.put(key, result)
+        return result
@@ -0,0 +1,266 @@
+# MIT License
+
+# Copyright (c) 2020 Tirth Patel & Tirth Hihoriya
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Checkpoints of long running simulations.
+
+`Checkpointer` saves the state of a `scheduler.RoundRobinSimulation`
+(its clock, ready queue, pending arrivals, burst statistics, burst
+estimator and context switch counters) to a file every `interval`
+seconds of wall clock time, and resumes it from that file after a
+crash or an interruption.
+
+In streaming mode, the results of the terminated processes are
+appended to a CSV file and evicted from the simulation as they
+terminate. Together with arrivals read lazily from the workload, a
+run of any length then only keeps the processes that are in the
+system in memory.
+
+Usage::
+
+    checkpointer = Checkpointer(simulation, "run.checkpoint", results="results.csv")
+    for event in checkpointer.record(simulation.events()):
+        pass
+    checkpointer.close()
+
+    # After an interruption, start over from the latest checkpoint:
+    checkpointer = Checkpointer.resume(
+        "run.checkpoint", arrivals=iter_workload("trace.csv"), results="results.csv"
+    )
+"""
+
+import csv
+import os
+import pickle
+import time
+
+from metrics import RESULT_COLUMNS, StreamingMetrics, result_rows
+from scheduler import PREEMPT, TERMINATE
+
+# Bump when the state of the simulation changes in
+# a way that older checkpoints can't be resumed from.
+CHECKPOINT_VERSION = 2
+
+
+def save_checkpoint(filename, state):
+    """Save `state`, a dict of picklable objects, to `filename`. The file
+    is replaced atomically, so it always holds a complete checkpoint."""
+    temporary = f"{filename}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        pickle.dump(
+            {"version": CHECKPOINT_VERSION, **state},
+            f,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, filename)
+
+
+def load_checkpoint(filename):
+    """Load the state saved by `save_checkpoint`.
+
+    Raises
+    ------
+    ValueError
+        If the checkpoint was written by an incompatible version.
+    """
+    with open(filename, "rb") as f:
+        state = pickle.load(f)
+    if state.pop("version", None) != CHECKPOINT_VERSION:
+        raise ValueError(f"{filename}: incompatible checkpoint version")
+    return state
+
+
+class Checkpointer(object):
+    """Checkpoint a simulation while it runs.
+
+    The burst estimator and the context switch cost are saved with the
+    simulation, so they must be picklable: the `key` of a
+    `BurstEstimator` has to be a module level function.
+
+    Parameters
+    ----------
+    simulation: RoundRobinSimulation
+        The simulation to checkpoint.
+
+    filename: str
+        The checkpoint file. If `None`, the results are
+        streamed but no checkpoint is saved.
+
+    interval: optional, float
+        Seconds of wall clock time between checkpoints.
+
+    results: optional, str
+        The CSV file to stream the results of the terminated processes to.
+        If given, they are evicted from the simulation once written. The
+        file is overwritten, unless the run is resumed.
+
+    batch_size: optional, int
+        Number of terminated processes written and evicted at once.
+
+    metrics: optional, StreamingMetrics
+        The metrics of the processes that terminated so far.
+    """
+
+    def __init__(
+        self,
+        simulation,
+        filename,
+        interval=60.0,
+        results=None,
+        batch_size=4096,
+        metrics=None,
+    ):
+        self.simulation = simulation
+        self.filename = filename
+        self.interval = interval
+        self.batch_size = batch_size
+        self.metrics = StreamingMetrics() if metrics is None else metrics
+        self.last_saved = time.monotonic()
+        # Whether the simulation is between two steps, where it can be
+        # checkpointed, rather than halfway through running a process.
+        self.consistent = True
+        self.results = None
+        if results is not None:
+            self._open_results(results)
+
+    def _open_results(self, filename, offset=None):
+        if offset is None:
+            self.results = open(filename, "w", newline="")
+            self.writer = csv.writer(self.results)
+            self.writer.writerow(RESULT_COLUMNS)
+            return
+        # The results written after the checkpoint are dropped,
+        # as the simulation will produce them again.
+        with open(filename, "r+b") as f:
+            f.truncate(offset)
+        self.results = open(filename, "a", newline="")
+        self.writer = csv.writer(self.results)
+
+    @classmethod
+    def resume(cls, filename, arrivals=None, results=None, interval=60.0, **kwargs):
+        """Resume from the checkpoint in `filename`.
+
+        Parameters
+        ----------
+        arrivals: optional, iterable
+            The same arrivals the simulation was created with, if any.
+            The ones read before the checkpoint are skipped.
+
+        results: optional, str
+            The CSV file the results were streamed to. The results
+            written after the checkpoint are dropped from it.
+
+        Returns
+        -------
+        checkpointer: Checkpointer
+            Its `simulation` continues where the checkpoint left off.
+        """
+        state = load_checkpoint(filename)
+        simulation = state["simulation"]
+        if arrivals is not None:
+            simulation.resume_arrivals(arrivals)
+        checkpointer = cls(
+            simulation, filename, interval, metrics=state["metrics"], **kwargs
+        )
+        if results is not None:
+            checkpointer._open_results(results, state["results_offset"])
+        return checkpointer
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        elif self.results is not None:
+            # Keep the latest checkpoint to resume from.
+            self.results.close()
+            self.results = None
+
+    def record(self, events):
+        """Yield `events` unchanged, checkpointing the simulation between
+        them. A checkpoint is only taken after a process is preempted or
+        terminated, when no event generator is halfway through a step."""
+        simulation = self.simulation
+        table = simulation.table
+        terminated_tasks = simulation.terminated_tasks
+        for event in events:
+            self.consistent = event.kind in (PREEMPT, TERMINATE)
+            if event.kind == TERMINATE:
+                self.metrics.add_row(table, event.row)
+            yield event
+            if not self.consistent:
+                continue
+            if self.results is not None and len(terminated_tasks) >= self.batch_size:
+                self.evict()
+            if time.monotonic() - self.last_saved >= self.interval:
+                self.save()
+
+    def evict(self):
+        """Append the results of the terminated processes to the
+        results file and evict them from the simulation."""
+        simulation = self.simulation
+        self.writer.writerows(
+            result_rows(simulation.table, simulation.terminated_tasks)
+        )
+        self.results.flush()
+        simulation.compact()
+
+    def save(self):
+        """Checkpoint the simulation now.
+
+        Raises
+        ------
+        ValueError
+            If the last event recorded was not a preemption or a
+            termination, so that the simulation is halfway
+            through a step.
+        """
+        if not self.consistent:
+            raise ValueError("Can only checkpoint after a preemption or a termination")
+        results_offset = None
+        if self.results is not None:
+            # The results file must hold every process the
+            # checkpoint no longer knows about.
+            self.evict()
+            os.fsync(self.results.fileno())
+            results_offset = self.results.tell()
+        if self.filename is not None:
+            save_checkpoint(
+                self.filename,
+                {
+                    "simulation": self.simulation,
+                    "metrics": self.metrics,
+                    "results_offset": results_offset,
+                },
+            )
+        self.last_saved = time.monotonic()
+
+    def close(self):
+        """Write out the remaining results and save a last checkpoint,
+        unless the simulation was left halfway through a step."""
+        if self.consistent:
+            self.save()
+        if self.results is not None:
+            self.results.close()
+            self.results = None
@@ -1,16 +1,558 @@
+"""Analysis dashboard of a schedule.
+
+`RoundRobinGraph` shows a Gantt chart of the schedule, the length of
+the ready queue and the time quantum over time, and a histogram of
+the waiting times of each time quantum method.
+
+Runs can have millions of events, far more than there are pixels to
+draw them on. The intervals of the Gantt chart and the points of the
+time series are therefore kept in level-of-detail pyramids: every
+level merges the intervals (or summarizes the points) of the level
+below at twice the time scale. Only the level that matches the zoom
+level of the view is drawn. The playhead and the data appended to a
+live run are drawn with blitting, on top of a cached background, so
+the whole figure is redrawn only when the view changes.
+
+matplotlib is only needed to draw the dashboard. The data structures
+work without it.
+
+Usage::
+
+    python graphing.py run.trace --workload trace.csv
+"""
+
+import argparse
+import sys
 import tkinter as tk
-import tkinter.messagebox as msg
+from array import array
+from bisect import bisect_left, bisect_right
+
+from scheduler import (
+    ADMIT,
+    DISPATCH,
+    PREEMPT,
+    TERMINATE,
+    TIME_QUANTUM_METHODS,
+    BurstEstimator,
+    RoundRobinSimulation,
+)
+
+# Number of intervals or points drawn per horizontal pixel.
+POINTS_PER_PIXEL = 2
+
+# An interval made of several merged slices isn't owned by one process.
+MERGED = -1
+
+
+def _merges(gap, last_start, last_end, last_owner, start, end, owner):
+    # Slices closer than the gap are merged when one of them
+    # is too short to show or when they have the same owner.
+    return start - last_end < gap and (
+        owner == last_owner or end - start < gap or last_end - last_start < gap
+    )
+
+
+class IntervalPyramid(object):
+    """Level-of-detail pyramid of the intervals of one Gantt lane.
+
+    Level 0 holds the slices as they were scheduled. Level `k` merges
+    neighbouring intervals of level `k - 1` that are closer than
+    `base * 2**(k - 1)` time units, unless both are at least that
+    long and belong to different processes. Every interval left is
+    next to one that long, so the number of intervals of a level is
+    bounded by twice the span of the lane divided by that length.
+
+    The levels are extended as slices are appended, so a live view
+    costs O(log n) per slice. The last interval of a level can still
+    grow, so it is only merged into the next level once the level
+    moves on to a new interval. `view` merges those last intervals
+    on the fly.
+
+    Parameters
+    ----------
+    base: optional, float
+        The shortest interval kept, at level 1.
+    """
+
+    def __init__(self, base=0.1):
+        self.base = base
+        self.starts = array("d")
+        self.ends = array("d")
+        self.owners = array("q")
+        self.levels = [(self.starts, self.ends, self.owners)]
+        # The last intervals of each level, merged into the levels above.
+        self._tails = None
+
+    def append(self, start, end, owner):
+        """Append a slice. Slices must be appended in time order."""
+        self.starts.append(start)
+        self.ends.append(end)
+        self.owners.append(owner)
+        self._tails = None
+        # Slices never change, so level 1 takes them right away.
+        self._merge(1, start, end, owner)
+
+    def _merge(self, level, start, end, owner):
+        if level == len(self.levels):
+            self.levels.append((array("d"), array("d"), array("q")))
+        starts, ends, owners = self.levels[level]
+        gap = self.base * 2 ** (level - 1)
+        if starts and _merges(gap, starts[-1], ends[-1], owners[-1], start, end, owner):
+            ends[-1] = max(ends[-1], end)
+            if owners[-1] != owner:
+                owners[-1] = MERGED
+            return
+        if starts:
+            # The last interval is final now, the level above takes it.
+            self._merge(level + 1, starts[-1], ends[-1], owners[-1])
+        starts.append(start)
+        ends.append(end)
+        owners.append(owner)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _levels(self):
+        # Every level `k` is its merged intervals but the last one,
+        # followed by its tail: that last interval with the tail of
+        # level `k - 1` merged into it.
+        if self._tails is not None:
+            return self._tails
+        tails = [(len(self.starts), [])]
+        level = 1
+        while tails[-1][0] + len(tails[-1][1]) > 1:
+            tail = []
+            kept = 0
+            if level < len(self.levels):
+                starts, ends, owners = self.levels[level]
+                if starts:
+                    kept = len(starts) - 1
+                    tail.append([starts[-1], ends[-1], owners[-1]])
+            gap = self.base * 2 ** (level - 1)
+            for start, end, owner in tails[-1][1]:
+                if tail and _merges(gap, *tail[-1], start, end, owner):
+                    tail[-1][1] = max(tail[-1][1], end)
+                    if tail[-1][2] != owner:
+                        tail[-1][2] = MERGED
+                else:
+                    tail.append([start, end, owner])
+            tails.append((kept, [tuple(interval) for interval in tail]))
+            level += 1
+        self._tails = tails
+        return tails
+
+    def level_for(self, time_per_pixel):
+        """The coarsest level that still shows gaps of one pixel."""
+        levels = len(self._levels())
+        level = 0
+        gap = self.base
+        while level + 1 < levels and gap <= time_per_pixel:
+            level += 1
+            gap *= 2
+        return level
+
+    def view(self, start, end, pixels):
+        """The intervals overlapping `[start, end]` at the level of
+        detail of a view `pixels` wide.
+
+        Returns
+        -------
+        intervals: list
+            `(start, end, owner)` tuples. `owner` is `MERGED` for
+            intervals that merge slices of several processes.
+        """
+        if not len(self):
+            return []
+        level = self.level_for((end - start) / max(pixels, 1))
+        kept, tail = self._levels()[level]
+        intervals = []
+        if kept:
+            starts, ends, owners = self.levels[level]
+            # Intervals don't overlap, so their ends are sorted as well.
+            first = bisect_left(ends, start, 0, kept)
+            last = bisect_right(starts, end, 0, kept)
+            intervals = list(
+                zip(starts[first:last], ends[first:last], owners[first:last])
+            )
+        return intervals + [
+            interval for interval in tail if interval[1] >= start and interval[0] <= end
+        ]
+
+
+class SeriesPyramid(object):
+    """Level-of-detail pyramid of a step series.
+
+    Level `k` keeps the minimum and the maximum of every `2**k`
+    consecutive points, so peaks stay visible however far the view
+    is zoomed out. Appending a point updates the last entry of
+    every level, in O(log n).
+    """
+
+    def __init__(self):
+        self.times = array("d")
+        self.values = array("d")
+        self.levels = [(self.times, self.values, self.values)]
+
+    def append(self, time, value):
+        self.times.append(time)
+        self.values.append(value)
+        index = len(self.times) - 1
+        for level in range(1, len(self.levels)):
+            times, lows, highs = self.levels[level]
+            if index >> level == len(times):
+                # The first point of a new group of `2**level` points.
+                times.append(time)
+                lows.append(value)
+                highs.append(value)
+            elif lows[-1] <= value <= highs[-1]:
+                # Neither this group nor the ones containing it change.
+                break
+            else:
+                lows[-1] = min(lows[-1], value)
+                highs[-1] = max(highs[-1], value)
+        times, lows, highs = self.levels[-1]
+        if len(times) == 2:
+            self.levels.append(
+                (
+                    array("d", times[:1]),
+                    array("d", [min(lows)]),
+                    array("d", [max(highs)]),
+                )
+            )
+
+    def __len__(self):
+        return len(self.times)
+
+    def view(self, start, end, pixels):
+        """The points of the series inside `[start, end]`, at most
+        `POINTS_PER_PIXEL * pixels` of them.
+
+        Returns
+        -------
+        times: list
+            Time of each point.
+
+        values: list
+            Value of each point. At coarse levels, each point is drawn as
+            its minimum followed by its maximum.
+        """
+        if not len(self):
+            return [], []
+        budget = POINTS_PER_PIXEL * max(pixels, 1)
+        for level, (times, lows, highs) in enumerate(self.levels):
+            first = max(bisect_right(times, start) - 1, 0)
+            last = bisect_right(times, end) + 1
+            if last - first <= budget or level == len(self.levels) - 1:
+                break
+        if level == 0:
+            return list(times[first:last]), list(lows[first:last])
+        view_times = []
+        view_values = []
+        for time, low, high in zip(
+            times[first:last], lows[first:last], highs[first:last]
+        ):
+            view_times += (time, time)
+            view_values += (low, high)
+        return view_times, view_values
+
+
+class ScheduleData(object):
+    """The data shown by the dashboard, built from scheduling events.
+
+    Parameters
+    ----------
+    base: optional, float
+        The smallest gap between slices merged in the Gantt chart.
+    """
+
+    def __init__(self, base=0.1):
+        self.base = base
+        # One Gantt lane per CPU. Single CPU runs only use lane 0.
+        self.lanes = {}
+        self.queue_length = SeriesPyramid()
+        self.quantum = SeriesPyramid()
+        self.ready = 0
+        self.running = {}
+        self.end = 0.0
+
+    @classmethod
+    def from_events(cls, events, table=None, base=0.1):
+        """Build the data of `simulation.events()` (pass the simulation's
+        `table` to show pids) or of the records of a `TraceReader`."""
+        data = cls(base)
+        data.extend(events, table)
+        return data
 
-import numpy as np
-import matplotlib
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2TkAgg
-from matplotlib.figure import Figure
+    def lane(self, core):
+        core = core or 0
+        if core not in self.lanes:
+            self.lanes[core] = IntervalPyramid(self.base)
+        return self.lanes[core]
 
-matplotlib.use("TkAgg")
+    def extend(self, events, table=None):
+        """Add events, in time order."""
+        for event in events:
+            # Trace records carry pids, events carry rows of the table.
+            owner = getattr(event, "pid", None)
+            row = getattr(event, "row", None)
+            if owner is None and row is not None:
+                owner = row if table is None else table.pid[row]
+            if event.kind == ADMIT:
+                self.ready += 1
+            elif event.kind == DISPATCH:
+                self.ready -= 1
+                self.running[event.core or 0] = (event.time, owner)
+                if event.quantum is not None:
+                    self.quantum.append(event.time, event.quantum)
+            elif event.kind in (PREEMPT, TERMINATE):
+                core = event.core or 0
+                start, owner = self.running.pop(core)
+                self.lane(core).append(start, event.time, owner)
+                if event.kind == PREEMPT:
+                    self.ready += 1
+            else:
+                continue
+            self.queue_length.append(event.time, self.ready)
+            self.end = max(self.end, event.time)
+
+
+def waiting_times_by_method(table, methods=TIME_QUANTUM_METHODS):
+    """Schedule copies of the processes of `table` with every
+    time quantum method.
+
+    Returns
+    -------
+    waiting_times: dict
+        The waiting times of the processes for each method.
+    """
+    waiting_times = {}
+    for method in methods:
+        simulation = RoundRobinSimulation(
+            table.copy(), method, burst_estimator=BurstEstimator()
+        )
+        rows = simulation.run()
+        waiting_times[method] = array(
+            "d", map(simulation.table.waiting_time.__getitem__, rows)
+        )
+    return waiting_times
+
+
+def histogram(values, low, high, bins=50):
+    """Count `values` in `bins` equal bins between `low` and `high`.
+    Values above `high` are counted in the last bin.
+
+    Returns
+    -------
+    counts: list
+        The count of each bin.
+
+    edges: list
+        The `bins + 1` edges of the bins.
+    """
+    width = (high - low) / bins or 1.0
+    counts = [0] * bins
+    for value in values:
+        counts[min(max(int((value - low) / width), 0), bins - 1)] += 1
+    return counts, [low + i * width for i in range(bins + 1)]
 
 
 class RoundRobinGraph(tk.Frame):
-    def __init__(self, parent, controller):
+    """The analysis dashboard.
+
+    Parameters
+    ----------
+    parent: tk.Widget
+        The widget to place the dashboard in.
+
+    controller: optional, osproject.RoundRobin
+        The animation whose last run to show. Ignored if `data` is given.
+
+    data: optional, ScheduleData
+        The schedule to show.
+
+    waiting_times: optional, dict
+        Waiting times per time quantum method, for the histograms.
+    """
+
+    def __init__(self, parent, controller=None, data=None, waiting_times=None):
         super().__init__(parent)
+        # matplotlib is optional, so it is only imported when a
+        # dashboard is actually shown.
+        import matplotlib
+
+        matplotlib.use("TkAgg")
+        from matplotlib.backends.backend_tkagg import (
+            FigureCanvasTkAgg,
+            NavigationToolbar2Tk,
+        )
+        from matplotlib.collections import LineCollection
+        from matplotlib.figure import Figure
+
+        if data is None and controller is not None:
+            from schedtrace import TraceReader
+
+            with TraceReader(controller.trace_filename) as trace:
+                data = ScheduleData.from_events(
+                    trace, base=controller.simulation.grid.resolution
+                )
+            if waiting_times is None:
+                waiting_times = waiting_times_by_method(controller.simulation.table)
+        self.data = data or ScheduleData()
+        self.waiting_times = waiting_times or {}
+
         label = tk.Label(self, text="Graphs for Analysis", font=("Verdana", 12))
+        label.pack(side=tk.TOP, pady=10)
+
+        self.figure = Figure(figsize=(9, 7), constrained_layout=True)
+        self.gantt_axes = self.figure.add_subplot(3, 1, 1)
+        self.queue_axes = self.figure.add_subplot(3, 1, 2, sharex=self.gantt_axes)
+        self.quantum_axes = self.queue_axes.twinx()
+        self.histogram_axes = self.figure.add_subplot(3, 1, 3)
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self)
+        self.toolbar = NavigationToolbar2Tk(self.canvas, self)
+        self.toolbar.update()
+        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+
+        # The Gantt bars of every lane are a single collection whose
+        # segments are replaced when the view changes.
+        self.colormap = matplotlib.colormaps["tab20"]
+        self.gantt = LineCollection([], linewidths=12)
+        self.gantt_axes.add_collection(self.gantt)
+        self.gantt_axes.set_ylabel("CPU")
+        self.gantt_axes.set_title("Schedule")
+        (self.queue_line,) = self.queue_axes.plot(
+            [], [], drawstyle="steps-post", color="tab:blue", label="ready queue"
+        )
+        (self.quantum_line,) = self.quantum_axes.plot(
+            [], [], drawstyle="steps-post", color="tab:orange", label="time quantum"
+        )
+        self.queue_axes.set_ylabel("ready processes")
+        self.quantum_axes.set_ylabel("time quantum")
+        self.queue_axes.set_xlabel("time")
+
+        # The playhead is animated: it is left out of the full redraws
+        # and blitted on top of the cached background instead.
+        self.playheads = [
+            axes.axvline(0.0, color="red", linewidth=1, animated=True)
+            for axes in (self.gantt_axes, self.queue_axes)
+        ]
+        self.background = None
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+        self.gantt_axes.callbacks.connect("xlim_changed", self.on_xlim_changed)
+
+        self.draw_histograms()
+        self.reset_view()
+
+    def pixels(self):
+        return max(int(self.gantt_axes.bbox.width), 1)
+
+    def reset_view(self):
+        lanes = max(len(self.data.lanes), 1)
+        self.gantt_axes.set_ylim(-0.5, lanes - 0.5)
+        self.gantt_axes.set_yticks(range(lanes))
+        self.gantt_axes.set_xlim(0.0, max(self.data.end, 1.0))
+        self.queue_axes.set_ylim(0, max(self.data.queue_length.values, default=0) + 1)
+        self.quantum_axes.set_ylim(0, max(self.data.quantum.values, default=0) + 1)
+        self.canvas.draw_idle()
+
+    def on_xlim_changed(self, axes):
+        # Zooming or panning picks the level of detail of the new view.
+        start, end = axes.get_xlim()
+        self.update_view(start, end)
+
+    def update_view(self, start, end):
+        pixels = self.pixels()
+        segments = []
+        colors = []
+        for lane, pyramid in sorted(self.data.lanes.items()):
+            for interval_start, interval_end, owner in pyramid.view(start, end, pixels):
+                segments.append(((interval_start, lane), (interval_end, lane)))
+                colors.append("grey" if owner == MERGED else self.colormap(owner % 20))
+        self.gantt.set_segments(segments)
+        self.gantt.set_colors(colors)
+        self.queue_line.set_data(*self.data.queue_length.view(start, end, pixels))
+        self.quantum_line.set_data(*self.data.quantum.view(start, end, pixels))
+
+    def on_draw(self, event):
+        # Cache everything but the animated artists after a full redraw.
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.blit()
+
+    def blit(self):
+        if self.background is None:
+            return
+        self.canvas.restore_region(self.background)
+        for playhead in self.playheads:
+            playhead.axes.draw_artist(playhead)
+        self.canvas.blit(self.figure.bbox)
+
+    def set_time(self, time):
+        """Move the playhead to `time` without redrawing the figure."""
+        for playhead in self.playheads:
+            playhead.set_xdata([time, time])
+        self.blit()
+
+    def append_events(self, events, table=None):
+        """Add the events of a live run. The figure is only redrawn in
+        full when the new events fall outside of the current view."""
+        self.data.extend(events, table)
+        start, end = self.gantt_axes.get_xlim()
+        if self.data.end > end:
+            self.gantt_axes.set_xlim(start, self.data.end * 1.1)
+            self.canvas.draw_idle()
+            return
+        self.update_view(start, end)
+        if self.background is None:
+            return
+        self.canvas.restore_region(self.background)
+        for artist in (self.gantt, self.queue_line, self.quantum_line):
+            artist.axes.draw_artist(artist)
+        self.canvas.blit(self.figure.bbox)
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.blit()
+
+    def draw_histograms(self):
+        axes = self.histogram_axes
+        axes.set_title("Waiting time per time quantum method")
+        axes.set_xlabel("waiting time")
+        axes.set_ylabel("processes")
+        if not self.waiting_times:
+            return
+        high = max(max(values, default=0.0) for values in self.waiting_times.values())
+        for method, values in self.waiting_times.items():
+            counts, edges = histogram(values, 0.0, high or 1.0)
+            axes.stairs(counts, edges, label=method)
+        axes.legend()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show the analysis dashboard.")
+    parser.add_argument("trace", help="schedule trace written by the animation")
+    parser.add_argument(
+        "--workload", help="CSV or JSON lines workload to compare the methods on"
+    )
+    args = parser.parse_args(argv)
+
+    from schedtrace import TraceReader
+    from workload import load_workload
+
+    with TraceReader(args.trace) as trace:
+        data = ScheduleData.from_events(trace)
+    waiting_times = None
+    if args.workload:
+        table, errors = load_workload(args.workload)
+        for error in errors:
+            print(f"{args.workload}: skipped {error}", file=sys.stderr)
+        waiting_times = waiting_times_by_method(table)
+
+    root = tk.Tk()
+    root.title("Round Robin Analysis")
+    RoundRobinGraph(root, data=data, waiting_times=waiting_times).pack(
+        fill=tk.BOTH, expand=True
+    )
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
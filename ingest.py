@@ -0,0 +1,312 @@
+# MIT License
+
+# Copyright (c) 2020 Tirth Patel & Tirth Hihoriya
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Live ingestion of processes into a running simulation.
+
+`ProcessIngestor` accepts processes over a local TCP or Unix socket,
+or from stdin, while a simulation runs. Each line is either a JSON
+object with the keys `pid`, `burst_time` and `arrival_time`, or a
+"<pid> ; <arrival time> ; <burst time>" line as typed in the
+animation. A JSON process without an `arrival_time` arrives at the
+current time of the simulation and one without a `burst_time` runs
+for its predicted burst time (see `scheduler.BurstEstimator`).
+
+The lines are parsed on an asyncio event loop and handed over to the
+simulation in batches. At most `max_pending` batches wait to be
+picked up. When the simulation falls behind, the readers stop reading,
+so the back-pressure reaches the clients through the flow control
+of their connections.
+
+The simulation picks the batches up between two events by iterating
+`ingestor.feed(simulation)` instead of `simulation.events()`. When
+it runs out of work, it waits for new processes until the ingestor
+is closed.
+
+Usage::
+
+    python ingest.py --tcp 127.0.0.1:9000
+    generate-load | python ingest.py --stdin --method Harmonic
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+from collections import deque
+
+from scheduler import (
+    DISPATCH,
+    TIME_QUANTUM_METHODS,
+    BurstEstimator,
+    Process,
+    RoundRobinSimulation,
+)
+from workload import RowError, parse_process, validate
+
+
+def parse_record(line):
+    """Parse a line of JSON or of the form "<pid> ; <arrival> ; <burst>".
+
+    Returns
+    -------
+    fields: tuple
+        The `(pid, burst_time, arrival_time)` of the process. The arrival
+        time is `None` if the process arrives when it is received.
+
+    Raises
+    ------
+    ValueError
+        If the line is not a valid process.
+    """
+    line = line.strip()
+    if not line.startswith("{"):
+        process = parse_process(line)
+        return process.pid, process.burst_time, process.arrival_time
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"invalid JSON: {e}") from None
+    if not isinstance(record, dict):
+        raise ValueError(f"expected a JSON object, got {line!r}")
+    if "pid" not in record:
+        raise ValueError("missing columns: pid")
+    arrival_time = record.get("arrival_time")
+    pid, burst_time, arrival_time = validate(
+        record["pid"],
+        record.get("burst_time"),
+        0.0 if arrival_time is None else arrival_time,
+    )
+    if record.get("arrival_time") is None:
+        arrival_time = None
+    return pid, burst_time, arrival_time
+
+
+class ProcessIngestor(object):
+    """Feed processes received on sockets or stdin into a simulation.
+
+    Parameters
+    ----------
+    batch_size: optional, int
+        Maximum number of processes handed over to the simulation at once.
+
+    max_pending: optional, int
+        Maximum number of batches waiting for the simulation.
+
+    flush_interval: optional, float
+        Seconds after which an incomplete batch is handed over anyway.
+    """
+
+    def __init__(self, batch_size=256, max_pending=64, flush_interval=0.05):
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.batches = deque()
+        self.received = 0
+        self.errors = []
+        self.closed = False
+        self._available = threading.Event()
+
+        # The readers waiting for room in `batches` wait on `_room`, on
+        # the event loop. The simulation thread wakes them up through
+        # `call_soon_threadsafe`.
+        self._loop = None
+        self._room = None
+
+    async def put(self, batch):
+        """Hand a batch over to the simulation, waiting while
+        `max_pending` batches are already waiting. The batch is
+        dropped if the ingestor is closed in the meantime."""
+        self._loop = asyncio.get_running_loop()
+        while True:
+            # Wait on the event created before checking for room, so that
+            # a batch drained in between wakes us up.
+            if self._room is None or self._room.is_set():
+                self._room = asyncio.Event()
+            room = self._room
+            if len(self.batches) < self.max_pending or self.closed:
+                break
+            await room.wait()
+        if self.closed:
+            return
+        self.batches.append(batch)
+        self.received += len(batch)
+        self._available.set()
+
+    def _wake_readers(self):
+        # Called from any thread.
+        loop = self._loop
+        room = self._room
+        if loop is None or room is None or room.is_set():
+            return
+        try:
+            loop.call_soon_threadsafe(room.set)
+        except RuntimeError:
+            # The event loop is closed, nobody is waiting anymore.
+            pass
+
+    async def read(self, reader, name):
+        """Read processes from an `asyncio.StreamReader` until EOF."""
+        batch = []
+        line_number = 0
+        while not self.closed:
+            try:
+                if batch:
+                    line = await asyncio.wait_for(
+                        reader.readline(), self.flush_interval
+                    )
+                else:
+                    line = await reader.readline()
+            except asyncio.TimeoutError:
+                await self.put(batch)
+                batch = []
+                continue
+            if not line:
+                break
+            line_number += 1
+            text = line.decode(errors="replace")
+            if not text.strip():
+                continue
+            try:
+                batch.append(parse_record(text))
+            except ValueError as e:
+                self.errors.append(RowError(line_number, f"{name}: {e}"))
+                continue
+            if len(batch) >= self.batch_size:
+                await self.put(batch)
+                batch = []
+        if batch:
+            await self.put(batch)
+
+    async def _handle_connection(self, reader, writer):
+        peer = writer.get_extra_info("peername") or "unix socket"
+        try:
+            await self.read(reader, str(peer))
+        finally:
+            writer.close()
+
+    async def serve_tcp(self, host="127.0.0.1", port=9000):
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def serve_unix(self, path):
+        server = await asyncio.start_unix_server(self._handle_connection, path)
+        async with server:
+            await server.serve_forever()
+
+    async def read_stdin(self):
+        """Read processes from stdin and close the ingestor at EOF."""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+        )
+        await self.read(reader, "stdin")
+        self.close()
+
+    def start(self, coroutine):
+        """Run one of the `serve_*` or `read_stdin` coroutines on
+        an event loop in a daemon thread."""
+        thread = threading.Thread(target=asyncio.run, args=(coroutine,), daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        """Stop the simulation once the pending batches are fed, and
+        stop reading. The batches the readers wait to put are dropped."""
+        self.closed = True
+        self._available.set()
+        self._wake_readers()
+
+    def _drain(self, simulation):
+        if not self.batches:
+            return
+        while self.batches:
+            batch = self.batches.popleft()
+            for pid, burst_time, arrival_time in batch:
+                if arrival_time is None:
+                    arrival_time = simulation.time_elapsed
+                simulation.add_process(Process(pid, burst_time, arrival_time))
+        self._wake_readers()
+
+    def feed(self, simulation, stop_event=None):
+        """Yield the events of `simulation`, adding the received processes
+        to it between events. When the simulation has nothing left to do,
+        wait for new processes until the ingestor is closed or
+        `stop_event` is set."""
+        while True:
+            self._drain(simulation)
+            for event in simulation.events():
+                yield event
+                if self.batches:
+                    self._drain(simulation)
+            while not self.batches:
+                if self.closed or (stop_event is not None and stop_event.is_set()):
+                    return
+                self._available.clear()
+                if not self.batches and not self.closed:
+                    self._available.wait(0.1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Schedule processes received on a socket or stdin."
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--tcp", metavar="HOST:PORT")
+    source.add_argument("--unix", metavar="PATH")
+    source.add_argument("--stdin", action="store_true")
+    parser.add_argument("--method", choices=TIME_QUANTUM_METHODS, default="Arithmetic")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--max-pending", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    ingestor = ProcessIngestor(args.batch_size, args.max_pending)
+    if args.tcp:
+        host, _, port = args.tcp.rpartition(":")
+        ingestor.start(ingestor.serve_tcp(host or "127.0.0.1", int(port)))
+    elif args.unix:
+        ingestor.start(ingestor.serve_unix(args.unix))
+    else:
+        ingestor.start(ingestor.read_stdin())
+
+    # Print the time quantum as it reacts to the load.
+    simulation = RoundRobinSimulation(
+        [], time_quantum_method=args.method, burst_estimator=BurstEstimator()
+    )
+    try:
+        for event in ingestor.feed(simulation):
+            if event.kind == DISPATCH:
+                print(
+                    f"time {event.time:.1f}  quantum {event.quantum:.1f}  "
+                    f"ready {len(simulation.tasks)}  "
+                    f"terminated {len(simulation.terminated_tasks)}"
+                )
+    except KeyboardInterrupt:
+        pass
+    for error in ingestor.errors:
+        print(f"skipped {error}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+# MIT License
+
+# Copyright (c) 2020 Tirth Patel & Tirth Hihoriya
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Instrumentation of the scheduler and the animation.
+
+`Instrumentation` keeps a counter and a cumulative timer per phase:
+
+ - `admission`: admitting arrived processes into the ready queues.
+ - `dispatch`: picking, dispatching, preempting and terminating processes.
+ - `quantum`: computing the time quantum (also counted in `dispatch`).
+ - `ui_update`: applying the updates of the animation to the widgets.
+ - `wait`: the animation thread sleeping between frames.
+ - `export`: writing the results.
+
+The time spent by the engine is measured between two consecutive
+events, so it is attributed to the phase of the event it produced.
+Timing costs two calls to `time.perf_counter` per event, which is
+cheap enough to leave on for large runs.
+
+Callbacks registered with `add_hook` are called with every event
+of the given kind and the simulation that emitted it.
+"""
+
+import json
+from contextlib import contextmanager
+from time import perf_counter
+
+from scheduler import ADMIT, DISPATCH, IDLE, PREEMPT, TERMINATE
+
+PHASES = ("admission", "dispatch", "quantum", "ui_update", "wait", "export")
+HOOK_EVENTS = (ADMIT, DISPATCH, PREEMPT, TERMINATE, IDLE)
+
+
+class Instrumentation(object):
+    """Counters, timers and hooks for the phases of a simulation."""
+
+    def __init__(self):
+        self.counts = dict.fromkeys(PHASES, 0)
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.events = dict.fromkeys(HOOK_EVENTS, 0)
+        self.hooks = {kind: [] for kind in HOOK_EVENTS}
+
+    def add(self, phase, seconds, count=1):
+        """Account `seconds` spent in `phase` over `count` calls."""
+        self.counts[phase] += count
+        self.seconds[phase] += seconds
+
+    @contextmanager
+    def timed(self, phase):
+        """Time the body of a `with` block as one call of `phase`. For
+        the coarse phases, the hot paths call `add` directly."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, perf_counter() - start)
+
+    def add_hook(self, kind, callback):
+        """Call `callback(event, simulation)` on every event of `kind`."""
+        if kind not in self.hooks:
+            raise ValueError(f"Unknown event kind: {kind}")
+        self.hooks[kind].append(callback)
+
+    def remove_hook(self, kind, callback):
+        self.hooks[kind].remove(callback)
+
+    def instrument(self, simulation):
+        """Time the time quantum computations of `simulation` until
+        `detach` is called. The instrumentation isn't saved when the
+        simulation is pickled."""
+        simulation.instrumentation = self
+        return simulation
+
+    def detach(self, simulation):
+        """Stop timing the time quantum computations of `simulation`."""
+        if simulation.instrumentation is self:
+            simulation.instrumentation = None
+        return simulation
+
+    def record(self, simulation, events=None):
+        """Yield the events of `simulation` (or of the iterable `events`
+        emitted by it), timing the engine and calling the hooks.
+        ``for event in instrumentation.record(simulation): ...``"""
+        events = iter(simulation.events() if events is None else events)
+        hooks = self.hooks
+        counts = self.events
+        # The totals are kept in locals and merged when the run ends
+        # or is abandoned, to keep the per event cost low.
+        admission_count = dispatch_count = 0
+        admission_seconds = dispatch_seconds = 0.0
+        try:
+            while True:
+                start = perf_counter()
+                try:
+                    event = next(events)
+                except StopIteration:
+                    return
+                elapsed = perf_counter() - start
+                kind = event.kind
+                if kind == ADMIT:
+                    admission_count += 1
+                    admission_seconds += elapsed
+                else:
+                    dispatch_count += 1
+                    dispatch_seconds += elapsed
+                counts[kind] += 1
+                if hooks[kind]:
+                    for callback in hooks[kind]:
+                        callback(event, simulation)
+                yield event
+        finally:
+            self.add("admission", admission_seconds, admission_count)
+            self.add("dispatch", dispatch_seconds, dispatch_count)
+
+    def to_dict(self):
+        return {
+            "phases": {
+                phase: {
+                    "count": self.counts[phase],
+                    "seconds": self.seconds[phase],
+                    "mean_us": (
+                        1e6 * self.seconds[phase] / self.counts[phase]
+                        if self.counts[phase]
+                        else 0.0
+                    ),
+                }
+                for phase in PHASES
+            },
+            "events": dict(self.events),
+        }
+
+    def save_json(self, filename):
+        with open(filename, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
@@ -0,0 +1,311 @@
+# MIT License
+
+# Copyright (c) 2020 Tirth Patel & Tirth Hihoriya
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Metrics and result export for the processes scheduled by
+`scheduler.RoundRobinSimulation`.
+
+The functions work directly on the columns of a
+`scheduler.ProcessTable`, so no `Process` objects need to be
+created even for runs with millions of processes.
+
+`StreamingMetrics` computes the same metrics online, one terminated
+process at a time, in bounded memory. Its percentiles come from a
+`QuantileSketch` and its throughput is measured over a sliding window.
+"""
+
+import csv
+import itertools
+import math
+from array import array
+from collections import deque
+
+# Columns of the results file. `turnaround_time` is measured
+# from the time a process was admitted to the ready queue.
+RESULT_COLUMNS = (
+    "pid",
+    "burst_time",
+    "arrival_time",
+    "admitted_time",
+    "terminated_time",
+    "waiting_time",
+    "turnaround_time",
+)
+
+PERCENTILES = (50, 95, 99)
+
+
+def _nearest_rank(count, q):
+    """Index of the `q`-th percentile among `count` sorted values, by the
+    nearest rank method: the smallest value that at least `q` percent of
+    the values are less than or equal to."""
+    return max(math.ceil(count * q / 100.0) - 1, 0)
+
+
+def percentile(sorted_values, q):
+    """Compute the `q`-th percentile of a sorted sequence by the nearest
+    rank method, like `QuantileSketch.quantile`, so that streamed and
+    in-memory runs report the same percentiles."""
+    if not sorted_values:
+        raise ValueError("Cannot compute the percentile of an empty sequence")
+    return sorted_values[_nearest_rank(len(sorted_values), q)]
+
+
+def _rate(count, span):
+    # A span of zero only happens if every process had a zero burst.
+    return count / span if span > 0 else math.inf
+
+
+def calculate_metrics(table, rows):
+    """Calculate the scheduling metrics of the terminated processes.
+
+    Parameters
+    ----------
+    table: ProcessTable
+        The table the processes were scheduled on.
+
+    rows: iterable
+        Rows of the terminated processes.
+
+    Returns
+    -------
+    metrics: dict
+        The number of processes, the throughput (the number of processes
+        terminated per time unit, from the first admission to the last
+        termination), and the mean, percentiles and maximum of the
+        waiting and turnaround times. The percentiles are stored under
+        keys like `p95_waiting_time`.
+    """
+    terminated_time = table.terminated_time
+    admitted_time = table.admitted_time
+    waiting_time = table.waiting_time
+
+    # Collect everything in one pass over the rows.
+    first_admitted = math.inf
+    last_terminated = -math.inf
+    waiting = array("d")
+    turnaround = array("d")
+    for row in rows:
+        first_admitted = min(first_admitted, admitted_time[row])
+        last_terminated = max(last_terminated, terminated_time[row])
+        waiting.append(waiting_time[row])
+        turnaround.append(terminated_time[row] - admitted_time[row])
+    if not waiting:
+        raise ValueError("No terminated processes to calculate the metrics of")
+
+    count = len(waiting)
+    metrics = {
+        "count": count,
+        "throughput": _rate(count, last_terminated - first_admitted),
+        "avg_turnaround_time": math.fsum(turnaround) / count,
+        "avg_waiting_time": math.fsum(waiting) / count,
+    }
+    for name, values in (("waiting_time", waiting), ("turnaround_time", turnaround)):
+        values = sorted(values)
+        for q in PERCENTILES:
+            metrics[f"p{q}_{name}"] = percentile(values, q)
+        metrics[f"max_{name}"] = values[-1]
+    return metrics
+
+
+class QuantileSketch(object):
+    """A bounded memory sketch of a distribution of non-negative values
+    to estimate its quantiles.
+
+    Values are counted in buckets whose bounds grow geometrically, so
+    every quantile is estimated within `relative_accuracy` of a value
+    of the distribution. At most `max_buckets` buckets are kept. If a
+    distribution spans more, the lowest buckets are merged, which keeps
+    the tail (the quantiles that matter for latency) accurate.
+
+    Parameters
+    ----------
+    relative_accuracy: optional, float
+        The relative error of the estimated quantiles.
+
+    max_buckets: optional, int
+        The maximum number of buckets.
+    """
+
+    # Values below this are counted as zeros.
+    MIN_VALUE = 1e-9
+
+    def __init__(self, relative_accuracy=0.01, max_buckets=2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("The relative accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value < self.MIN_VALUE:
+            self.zeros += 1
+            return
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        keys = sorted(self.buckets)
+        lowest = keys[0]
+        self.buckets[keys[1]] += self.buckets.pop(lowest)
+
+    def quantile(self, q):
+        """Estimate the `q`-th percentile (`q` between 0 and 100)."""
+        if not self.count:
+            raise ValueError("Cannot compute the quantile of an empty sketch")
+        # Nearest rank, so the tail is never underestimated.
+        rank = _nearest_rank(self.count, q)
+        seen = self.zeros
+        if seen > rank:
+            return self.min
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                value = 2 * self.gamma**key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+
+class StreamingMetrics(object):
+    """Scheduling metrics updated as each process terminates.
+
+    Memory doesn't grow with the number of processes: the means are
+    running means, the percentiles are estimated by `QuantileSketch`
+    and the throughput only remembers the terminations of the last
+    `window` time units.
+
+    Parameters
+    ----------
+    window: optional, float
+        Length of the sliding window of the throughput, in time units.
+
+    relative_accuracy: optional, float
+        The relative error of the percentiles.
+
+    start: optional, float
+        The time the simulation started at.
+    """
+
+    def __init__(self, window=100.0, relative_accuracy=0.01, start=0.0):
+        self.window = window
+        self.start = start
+        self.count = 0
+        self.now = start
+        self.terminations = deque()
+        self.avg_waiting_time = 0.0
+        self.avg_turnaround_time = 0.0
+        self.waiting_time = QuantileSketch(relative_accuracy)
+        self.turnaround_time = QuantileSketch(relative_accuracy)
+
+    def add(self, terminated_time, admitted_time, waiting_time):
+        """Record a terminated process. Processes must be added in the
+        order they terminated."""
+        turnaround_time = terminated_time - admitted_time
+        self.count += 1
+        self.now = max(self.now, terminated_time)
+        # Only the terminations inside the window are kept.
+        terminations = self.terminations
+        terminations.append(terminated_time)
+        while terminations and terminations[0] <= self.now - self.window:
+            terminations.popleft()
+        self.avg_waiting_time += (waiting_time - self.avg_waiting_time) / self.count
+        self.avg_turnaround_time += (
+            turnaround_time - self.avg_turnaround_time
+        ) / self.count
+        self.waiting_time.add(waiting_time)
+        self.turnaround_time.add(turnaround_time)
+
+    def add_row(self, table, row):
+        self.add(
+            table.terminated_time[row],
+            table.admitted_time[row],
+            table.waiting_time[row],
+        )
+
+    def throughput(self):
+        """Processes terminated per time unit in the last `window`."""
+        return _rate(len(self.terminations), min(self.window, self.now - self.start))
+
+    def summary(self):
+        """The metrics so far, with the keys of `calculate_metrics`.
+        The throughput is the one of the sliding window."""
+        if not self.count:
+            raise ValueError("No terminated processes to calculate the metrics of")
+        metrics = {
+            "count": self.count,
+            "throughput": self.throughput(),
+            "avg_turnaround_time": self.avg_turnaround_time,
+            "avg_waiting_time": self.avg_waiting_time,
+        }
+        for name in ("waiting_time", "turnaround_time"):
+            sketch = getattr(self, name)
+            for q in PERCENTILES:
+                metrics[f"p{q}_{name}"] = sketch.quantile(q)
+            metrics[f"max_{name}"] = sketch.max
+        return metrics
+
+
+def result_rows(table, rows):
+    """Yield the `RESULT_COLUMNS` of each of the given rows."""
+    for row in rows:
+        yield (
+            table.pid[row],
+            table.burst_time[row],
+            table.arrival_time[row],
+            table.admitted_time[row],
+            table.terminated_time[row],
+            table.waiting_time[row],
+            table.terminated_time[row] - table.admitted_time[row],
+        )
+
+
+def save_results(filename, table, rows, chunk_size=65536):
+    """Write the results of the terminated processes to a CSV file
+    with the `RESULT_COLUMNS` header.
+
+    The rows are written in chunks of `chunk_size` through
+    `csv.writer.writerows`.
+    """
+    write_results(filename, result_rows(table, rows), chunk_size)
+
+
+def write_results(filename, results, chunk_size=65536):
+    """Write tuples of `RESULT_COLUMNS` to a CSV file, like `save_results`."""
+    with open(filename, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(RESULT_COLUMNS)
+        results = iter(results)
+        while True:
+            chunk = list(itertools.islice(results, chunk_size))
+            if not chunk:
+                break
+            writer.writerows(chunk)
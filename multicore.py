@@ -0,0 +1,334 @@
+# MIT License
+
+# Copyright (c) 2020 Tirth Patel & Tirth Hihoriya
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Dynamic Round Robin scheduling on more than one CPU.
+
+Every CPU runs the dynamic Round Robin algorithm of
+`scheduler.RoundRobinSimulation`, computing its time quantum from
+the processes in its own ready queue. How the processes are spread
+over the CPUs is decided by the load balancing strategy:
+
+ - "global": all the CPUs share a single ready queue.
+ - "steal": every CPU has its own ready queue. Arriving processes are
+   placed on the CPUs in turn and an idle CPU steals the process at
+   the tail of the longest queue.
+ - "least-loaded": every CPU has its own ready queue and arriving
+   processes are placed on the CPU with the fewest processes.
+
+Usage::
+
+    python multicore.py trace.csv --cores 1 2 4 8 --load-balancing steal
+"""
+
+import argparse
+import math
+import sys
+from array import array
+from collections import deque
+
+from metrics import calculate_metrics
+from scheduler import (
+    DISPATCH,
+    IDLE,
+    PREEMPT,
+    TERMINATE,
+    TICK,
+    TIME_QUANTUM_METHODS,
+    BurstEstimator,
+    BurstStatistics,
+    Event,
+    RoundRobinSimulation,
+)
+from workload import load_workload
+
+LOAD_BALANCING = ("global", "steal", "least-loaded")
+
+
+class MultiCoreSimulation(RoundRobinSimulation):
+    """Discrete-event simulation of the dynamic Round Robin
+    scheduling algorithm on `cores` CPUs.
+
+    With a single CPU the simulation produces the same schedule
+    as `scheduler.RoundRobinSimulation`.
+
+    Parameters
+    ----------
+    processes: ProcessTable or iterable
+        The processes to schedule.
+
+    cores: optional, int
+        Number of CPUs. Defaults to 2.
+
+    load_balancing: optional, str
+        One of "global", "steal" or "least-loaded".
+        Defaults to "steal".
+
+    time_quantum_method: optional, str
+        One of "Arithmetic", "Geometric", "True Geometric" or "Harmonic".
+
+    time_quantum: optional, float
+        A fixed time quantum to use instead of the dynamic one.
+
+    context_switch_cost: optional, ContextSwitchCost
+        The cost of switching between processes on a CPU.
+
+    burst_estimator: optional, BurstEstimator
+        Predicts the burst times that are not known.
+
+    resolution: optional, float
+        Length of a tick, the step of the simulated clock.
+    """
+
+    def __init__(
+        self,
+        processes,
+        cores=2,
+        load_balancing="steal",
+        time_quantum_method="Arithmetic",
+        time_quantum=None,
+        context_switch_cost=None,
+        burst_estimator=None,
+        resolution=TICK,
+    ):
+        super().__init__(
+            processes,
+            time_quantum_method,
+            time_quantum,
+            context_switch_cost,
+            burst_estimator,
+            resolution,
+        )
+        if cores < 1:
+            raise ValueError(f"Need at least one CPU, got {cores}")
+        if load_balancing not in LOAD_BALANCING:
+            raise ValueError(f"Unknown load balancing strategy: {load_balancing!r}")
+        self.cores = cores
+        self.load_balancing = load_balancing
+
+        # With a global queue every CPU uses queue 0.
+        queues = 1 if load_balancing == "global" else cores
+        self.queues = [deque() for _ in range(queues)]
+        self.queue_statistics = [BurstStatistics() for _ in range(queues)]
+        self.tasks = self.queues[0]
+        self.burst_statistics = self.queue_statistics[0]
+        self._next_core = 0
+
+        # Rows currently running on each CPU.
+        self.running = [None] * cores
+        self.busy_time = [0.0] * cores
+        self.dispatches = [0] * cores
+        self.last_dispatched = [None] * cores
+
+        # The CPU each process last ran on, to count migrations.
+        self.last_core = array("i")
+        self.migrations = 0
+        self.steals = 0
+
+    def compact(self):
+        # The per-CPU queues and the running processes aren't renumbered.
+        raise TypeError(
+            "Streaming checkpoints only support RoundRobinSimulation, "
+            "multi-core simulations can't be compacted"
+        )
+
+    def _queue(self, core):
+        return 0 if self.load_balancing == "global" else core
+
+    def _enqueue(self, row):
+        if self.load_balancing == "global":
+            core = None
+        elif self.load_balancing == "steal":
+            core = self._next_core
+            self._next_core = (self._next_core + 1) % self.cores
+        else:
+            core = min(
+                range(self.cores),
+                key=lambda c: len(self.queues[c]) + (self.running[c] is not None),
+            )
+        queue = 0 if core is None else core
+        self.queues[queue].append(row)
+        self.queue_statistics[queue].add(self.planned_burst(row))
+        return core
+
+    def _steal(self, core):
+        # Steal from the tail of the longest queue, the
+        # process that would otherwise wait the longest.
+        victim = max(range(self.cores), key=lambda c: len(self.queues[c]))
+        if victim == core or not self.queues[victim]:
+            return False
+        row = self.queues[victim].pop()
+        burst_time = self.planned_burst(row)
+        self.queue_statistics[victim].remove(burst_time)
+        self.queues[core].append(row)
+        self.queue_statistics[core].add(burst_time)
+        self.steals += 1
+        return True
+
+    def events(self):
+        """Run the simulation, yielding every scheduling `Event` in the
+        order in which it happens. The `core` of each event is the CPU it
+        happened on (`None` for admissions to the global queue).
+
+        At every instant the slices ending at that instant complete
+        first, then arriving processes are admitted and finally every
+        idle CPU dispatches the process at the head of its queue.
+        """
+        table = self.table
+        grid = self.grid
+        cores = range(self.cores)
+        # The tick at which the slice running on each CPU ends.
+        finish = [0] * self.cores
+        terminating = [False] * self.cores
+        while len(self.last_core) < len(table):
+            self.last_core.append(-1)
+
+        while True:
+            now = self.now
+            time_elapsed = grid.time(now)
+
+            for core in cores:
+                row = self.running[core]
+                if row is None or finish[core] != now:
+                    continue
+                self.running[core] = None
+                table.last_preempted[row] = time_elapsed
+                if terminating[core]:
+                    table.terminated_time[row] = time_elapsed
+                    self.terminated_tasks.append(row)
+                    self.burst_terminated(row)
+                    yield Event(time_elapsed, TERMINATE, row, None, core)
+                else:
+                    queue = self._queue(core)
+                    self.queues[queue].append(row)
+                    self.queue_statistics[queue].add(self.planned_burst(row))
+                    yield Event(time_elapsed, PREEMPT, row, None, core)
+
+            yield from self.get_new_tasks(now)
+            while len(self.last_core) < len(table):
+                self.last_core.append(-1)
+
+            for core in cores:
+                if self.running[core] is not None:
+                    continue
+                queue = self._queue(core)
+                if not self.queues[queue]:
+                    if self.load_balancing != "steal" or not self._steal(core):
+                        continue
+                statistics = self.queue_statistics[queue]
+                quantum = self.quantum_ticks(statistics)
+                row = self.queues[queue].popleft()
+                planned_burst = self.planned_burst(row)
+                statistics.remove(planned_burst)
+                start = now
+                if row != self.last_dispatched[core]:
+                    start += self.charge_context_switch(row)
+                self.last_dispatched[core] = row
+                table.waiting_time[row] += grid.time(start) - table.last_preempted[row]
+                if self.last_core[row] not in (-1, core):
+                    self.migrations += 1
+                self.last_core[row] = core
+                self.dispatches[core] += 1
+                yield Event(time_elapsed, DISPATCH, row, grid.time(quantum), core)
+
+                remaining = self.remaining_ticks(row, planned_burst)
+                terminating[core] = remaining <= quantum
+                runtime = remaining if terminating[core] else quantum
+                table.runtime[row] = grid.time(grid.round(table.runtime[row]) + runtime)
+                self.busy_time[core] += grid.time(runtime)
+                finish[core] = start + runtime
+                self.running[core] = row
+
+            upcoming = [
+                finish[core] for core in cores if self.running[core] is not None
+            ]
+            arrival_time = self.next_arrival_time()
+            if arrival_time is not None:
+                upcoming.append(max(grid.ceil(arrival_time), now))
+            if not upcoming:
+                break
+            if all(row is None for row in self.running):
+                yield Event(time_elapsed, IDLE, None, None)
+            self.now = min(upcoming)
+
+    def core_report(self):
+        """Per-CPU utilisation of the simulation.
+
+        Returns
+        -------
+        report: list
+            One dict per CPU with its `core`, `busy_time`,
+            `utilisation` (busy time over the total simulated time)
+            and number of `dispatches`.
+        """
+        return [
+            {
+                "core": core,
+                "busy_time": self.busy_time[core],
+                "utilisation": (
+                    self.busy_time[core] / self.time_elapsed
+                    if self.time_elapsed > 0
+                    else 0.0
+                ),
+                "dispatches": self.dispatches[core],
+            }
+            for core in range(self.cores)
+        ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Size the number of CPUs needed for a workload."
+    )
+    parser.add_argument("workload", help="CSV or JSON lines workload")
+    parser.add_argument("--cores", nargs="+", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--load-balancing", choices=LOAD_BALANCING, default="steal")
+    parser.add_argument("--method", choices=TIME_QUANTUM_METHODS, default="Arithmetic")
+    args = parser.parse_args(argv)
+
+    workload, errors = load_workload(args.workload)
+    for error in errors:
+        print(f"{args.workload}: skipped {error}", file=sys.stderr)
+    # Only unknown burst times are predicted.
+    unknown_bursts = any(map(math.isnan, workload.burst_time))
+    print("cores  avg. waiting  p95 waiting  avg. turnaround  utilisation  migrations")
+    for cores in args.cores:
+        simulation = MultiCoreSimulation(
+            workload.copy(),
+            cores,
+            args.load_balancing,
+            args.method,
+            burst_estimator=BurstEstimator() if unknown_bursts else None,
+        )
+        rows = simulation.run()
+        metrics = calculate_metrics(simulation.table, rows)
+        report = simulation.core_report()
+        utilisation = sum(core["utilisation"] for core in report) / cores
+        print(
+            f"{cores:<5}  {metrics['avg_waiting_time']:<12.4f}  "
+            f"{metrics['p95_waiting_time']:<11.4f}  "
+            f"{metrics['avg_turnaround_time']:<15.4f}  "
+            f"{utilisation:<11.2%}  {simulation.migrations}"
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
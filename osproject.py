@@ -26,99 +26,161 @@ like Google Colab and Amazon AWS to schedule the server
 requests.
 """
 
-import time
-from threading import Thread
-import re
-import os
+import queue
+from threading import Condition, Event, Thread
 import math
-import statistics
+import os
+import shutil
+import tempfile
+from collections import deque
 import tkinter as tk
+import tkinter.font as tkfont
 import tkinter.messagebox as msg
 
-# import numpy as np
-# import matplotlib
-# import matplotlib.pyplot as plt
-# from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2TkAgg
-# from matplotlib.figure import Figure
-# matplotlib.use("TkAgg")
+from instrument import Instrumentation
+from metrics import StreamingMetrics, calculate_metrics, save_results
+from scheduler import (
+    ADMIT,
+    DISPATCH,
+    IDLE,
+    PREEMPT,
+    TERMINATE,
+    TICK,
+    Process,
+    TIME_QUANTUM_METHODS,
+    BurstEstimator,
+    RoundRobinSimulation,
+)
+from schedtrace import TraceReader, TraceWriter
+from workload import RowError, parse_process
+
+# The animation thread never touches the widgets. It queues updates
+# that the Tk main loop applies `FRAME_RATE` times per second.
+FRAME_RATE = 30
+STATUS = "status"
+
+# Playback speeds of the animation, in simulated time units per second
+# of wall clock time. "Max" replays the schedule as fast as possible.
+PLAYBACK_SPEEDS = {
+    "0.1x": 0.1,
+    "0.5x": 0.5,
+    "1x": 1.0,
+    "2x": 2.0,
+    "5x": 5.0,
+    "10x": 10.0,
+    "100x": 100.0,
+    "1000x": 1000.0,
+    "Max": None,
+}
+
+
+class TaskListView(object):
+    """A virtualized list of tasks drawn on a canvas.
+
+    Only the rows that are inside the visible part of the canvas are
+    drawn. Their canvas items are recycled as the list scrolls or
+    changes and the alternating colors are computed from the index of
+    each row, so a redraw costs O(visible rows) however long the list is.
 
-# We are subclassing Tkinkter's `Label` object
-# to implement the less than (`<`) opertor which
-# is a neccessary method to push/pop object of
-# type `tk.Label` in a `heapq` heap.
-class Label(tk.Label):
-    def __init__(self, process_object, *args, **kwargs):
-        self.process_object = process_object
-        super().__init__(*args, **kwargs)
-
-    def __lt__(self, other):
-        # Get the text object of both labels and
-        # split them using .split method. The last
-        # element in the list is the arrival time
-        # against which we want to compare
-        fat = self.process_object.arrival_time
-        sat = other.process_object.arrival_time
-        return fat < sat
+    Parameters
+    ----------
+    canvas: tk.Canvas
+        The canvas to draw the rows on.
 
+    scrollbar: tk.Scrollbar
+        The scrollbar of the canvas.
 
-# Alias the subclassed object back to the tkinter's label
-tk.Label = Label
+    color_schemes: list
+        The `bg` and `fg` colors the rows alternate between.
 
+    describe: callable
+        Returns the text to display for an item of the list.
 
-class Process(object):
-    """Initialize a process control block.
+    font: optional, tuple
+        Font of the text of the rows.
 
-    Parameters
-    ----------
-    pid: int
-        The process id
-
-    burst_time: float
-        The burst time of the process. If not known,
-        pass `None` and the burst time will be inferred
-        during runtime
-
-    arrival_time: float
-        The arrival time of the process.
+    lines: optional, int
+        Number of lines of text in a row.
     """
 
-    def __init__(self, pid, burst_time, arrival_time):
-        self.pid = pid
-        self.burst_time = burst_time
-        self.arrival_time = arrival_time
-
-        # Attributes to do some book-keeping
-        # during scheduling
-        self.admitted_time = None
-        self.last_preempted = None
-        self.terminated_time = None
-        self.waiting_time = None
-        self.runtime = None
-
-    def get_meta(self):
-        msg = (
-            f"Burst time:   \t{self.burst_time}\n"
-            f"Total Runtime:\t{self.runtime}\n"
-            # f"Waiting Time: \t{self.waiting_time:.1f}\n"
-            f"Terminated:   \t{self.terminated_time}"
+    def __init__(
+        self, canvas, scrollbar, color_schemes, describe, font=("Verdana", 12), lines=3
+    ):
+        self.canvas = canvas
+        self.scrollbar = scrollbar
+        self.color_schemes = color_schemes
+        self.describe = describe
+        self.font = font
+        self.line_height = tkfont.Font(root=canvas, font=font).metrics("linespace")
+        self.row_height = self.line_height * lines + 20
+        self.items = []
+
+        # Pool of (rectangle, text) canvas items that are
+        # recycled to draw the visible rows.
+        self.pool = []
+
+        # Redraw the visible rows whenever the canvas is scrolled.
+        self.canvas.configure(yscrollcommand=self.on_scroll)
+
+    def set_items(self, items, lines=None):
+        self.items = items
+        if lines is not None:
+            self.row_height = self.line_height * lines + 20
+        self.refresh()
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.redraw()
+
+    def index_at(self, y):
+        """Index of the item at the window coordinate `y`, `None`
+        if there is no item there."""
+        index = int(self.canvas.canvasy(y) // self.row_height)
+        return index if 0 <= index < len(self.items) else None
+
+    def refresh(self):
+        # The scroll region covers the whole list even though only
+        # the visible rows are drawn.
+        width = self.canvas.winfo_width()
+        self.canvas.configure(
+            scrollregion=(0, 0, width, len(self.items) * self.row_height)
         )
-        return msg
-
-    def __repr__(self):
-        # We return a message of the form
-        # PID: <process.id>
-        # Burst Time: <process.burst_time>
-        # Arrival Time: <process.arrival_time>
-        msg = f"PID:\t\t{self.pid}\n"
-        msg += f"Burst Time:\t{self.burst_time:.1f}\n"
-        msg += f"Arrival Time:\t{self.arrival_time:.1f}"
-        if self.terminated_time is not None:
-            msg += "\n"
-            msg += self.get_meta()
-        return msg
+        self.redraw()
+
+    def redraw(self):
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        top = self.canvas.canvasy(0)
+        first = max(int(top // self.row_height), 0)
+        last = min(len(self.items), int((top + height) // self.row_height) + 1)
+
+        while len(self.pool) < last - first:
+            self.pool.append(
+                (
+                    self.canvas.create_rectangle(0, 0, 0, 0, width=0),
+                    self.canvas.create_text(0, 0, font=self.font, justify=tk.LEFT),
+                )
+            )
 
-    def __str__(self):
-        return self.__repr__()
+        for offset, (rectangle, text) in enumerate(self.pool):
+            index = first + offset
+            if index >= last:
+                self.canvas.itemconfigure(rectangle, state=tk.HIDDEN)
+                self.canvas.itemconfigure(text, state=tk.HIDDEN)
+                continue
+            color_scheme = self.color_schemes[(index + 1) % 2]
+            y = index * self.row_height
+            self.canvas.coords(rectangle, 0, y, width, y + self.row_height)
+            self.canvas.itemconfigure(
+                rectangle, fill=color_scheme["bg"], state=tk.NORMAL
+            )
+            self.canvas.coords(text, width / 2, y + self.row_height / 2)
+            self.canvas.itemconfigure(
+                text,
+                text=self.describe(self.items[index]),
+                fill=color_scheme["fg"],
+                state=tk.NORMAL,
+            )
 
 
 class RoundRobin(tk.Tk):
@@ -128,25 +190,36 @@ class RoundRobin(tk.Tk):
     Parameters
     ----------
     tasks: optional, list
-        A list of tasks to be inserted at runtime.
-        The list must contain `tk.Label` objects with
-        the text field of each label containing
-        `Process` objects.
+        A list of `Process` objects to be inserted at runtime.
+
+    ingestor: optional, ingest.ProcessIngestor
+        Feeds the processes it receives into the running animation.
+
+    trace_filename: optional, str
+        Keep the binary trace of the last run in this file. By default
+        it is written to a temporary directory removed on exit.
+
+    profile_filename: optional, str
+        Save the time spent in each phase of a run to this JSON file.
+        Not saved by default.
     """
 
-    def __init__(self, filename="process_meta.csv", tasks=None):
+    def __init__(
+        self,
+        filename="process_meta.csv",
+        tasks=None,
+        ingestor=None,
+        trace_filename=None,
+        profile_filename=None,
+    ):
         super().__init__()
 
         self.filename = filename
+        self.ingestor = ingestor
 
-        # We create a seperate canvas to put all
-        # our tasks related widgets in.
-        self.tasks_canvas = tk.Canvas(self)
-
-        # We now create a tasks frame to place all
-        # our tasks label on and display them using the
-        # `tasks_canvas` we made.
-        self.tasks_frame = tk.Frame(self.tasks_canvas)
+        # We create a seperate canvas to draw all
+        # our tasks on.
+        self.tasks_canvas = tk.Canvas(self, highlightthickness=0)
 
         # A seperate `text_frame` to take the user input
         self.text_frame = tk.Frame(self)
@@ -158,16 +231,15 @@ class RoundRobin(tk.Tk):
             self.tasks_canvas, orient="vertical", command=self.tasks_canvas.yview
         )
 
-        # We set the scrollbar to the `tasks_canvas`
-        self.tasks_canvas.configure(yscrollcommand=self.scrollbar.set)
-
         # We start of by first initializing the list
-        # of tasks. Here, the list of tasks contain
-        # instances of the labels we wnat to display.
+        # of tasks. Before the animation starts, the list
+        # contains the `Process` objects entered by the user.
+        # While it runs, it contains the rows of the processes
+        # in the simulation's table.
         if not tasks:
             self.tasks = []
         else:
-            self.tasks = tasks
+            self.tasks = list(tasks)
 
         # This is the title of our app.
         self.title("Round Robin Algorithm")
@@ -181,158 +253,325 @@ class RoundRobin(tk.Tk):
         # `text_frame`
         self.task_create = tk.Text(self.text_frame, height=2, bg="white", fg="black")
 
-        # We place the `tasks_canvas` and `scrollbar` on the root
-        self.tasks_canvas.pack(side=tk.TOP, fill="both", expand=1)
-        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-        # We create a new window to display the `tasks_canvas`.
-        # We will not pack (place) the `tasks_frame` now as the
-        # window already has put it for us. (see `window` parameter).
-        self.canvas_frame = self.tasks_canvas.create_window(
-            (0, 0), window=self.tasks_frame, anchor="n"
-        )
-
-        # We now pack rest of the widgets
-        self.task_create.pack(side=tk.BOTTOM, fill=tk.X)
-        self.text_frame.pack(side=tk.BOTTOM, fill=tk.X)
-        self.task_create.focus_set()
-
         # Initialize the initial label that defines the
-        # format of input.
+        # format of input. It stays on top of the tasks.
         self.placeholder_text = tk.Label(
-            None,
-            self.tasks_frame,
+            self,
             text="Add process here. The process must have the form:\n"
-            "<pid (int)> ; <arrival time (float)> ; <burst time (float)> ; ...",
+            "<pid (int)> ; <arrival time (float)> ; <burst time (float)>",
             bg="lightgrey",
             fg="black",
             pady=10,
             font=("Verdana", 12),
         )
-
-        # We then bind the delete button with the placeholder and
-        # pack it onto our canvas
-        self.placeholder_text.bind("<Button-1>", self.remove_task)
         self.placeholder_text.pack(side=tk.TOP, fill=tk.X)
 
-        # place each task at the top of our canvas
-        for task in self.tasks:
-            task.pack(side=tk.TOP, fill=tk.X)
+        # We place the `tasks_canvas` and `scrollbar` on the root
+        self.tasks_canvas.pack(side=tk.TOP, fill="both", expand=1)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # We now pack rest of the widgets
+        self.task_create.pack(side=tk.BOTTOM, fill=tk.X)
+        self.text_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        self.task_create.focus_set()
+
+        # The color schemes that we are going to use in the canvas.
+        self.color_schemes = [
+            {"bg": "lightgrey", "fg": "black"},
+            {"bg": "grey", "fg": "white"},
+        ]
+
+        # The tasks are drawn on the `tasks_canvas` by a virtualized
+        # list view, which only draws the tasks that are visible.
+        self.task_view = TaskListView(
+            self.tasks_canvas,
+            self.scrollbar,
+            self.color_schemes,
+            self.describe_task,
+        )
+        self.task_view.set_items(self.tasks)
 
         # This big block of bind does the following:
         #  - First, the `<Return>` command triggers the add_tasks method
-        #  - the `<Configure>` command is triggered whenever the size.
-        #    of the window is changed and it triggers `on_frame_configure`.
-        #    and task_width methods that set the width of the `tasks_canvas`.
-        #    and the frame width accordingly!
+        #  - the `<Configure>` command is triggered whenever the size
+        #    of the `tasks_canvas` is changed and it triggers `task_width`,
+        #    that redraws the visible tasks to the new width.
         #  - Button-1 is the left mouse click which triggers `remove_task`.
         #  - `Button-4`, `Button-5` and `MouseWheel` trigger `mouse_scroll` method.
         self.bind("<Return>", self.add_task)
-        self.bind("<Configure>", self.on_frame_configure)
         self.bind_all("<MouseWheel>", self.mouse_scroll)
         self.bind_all("<Button-4>", self.mouse_scroll)
         self.bind_all("<Button-5>", self.mouse_scroll)
         self.tasks_canvas.bind("<Configure>", self.task_width)
+        self.tasks_canvas.bind("<Button-1>", self.remove_task)
 
-        # The color schemes that we are going to use in the canvas.
-        self.color_schemes = [
-            {"bg": "lightgrey", "fg": "black"},
-            {"bg": "grey", "fg": "white"},
-        ]
-
-        # We have interfaced the animation as follows. We create a stop_bit
+        # We have interfaced the animation as follows. We create a stop_event
         # which records if the user has interrupted using a `Stop` button.
         # Both start and stop button are represented by a
         # `self.start_animation` tk widget. This button widget triggers the
         # `self.manage_animation_thread` method that launches a thread for
         # animation. For further details, refer the method `self.manage_animation_thread`
         # Finally we pack the button onto our root.
-        self.stop_bit = 0
+        self.stop_event = Event()
+        self.updates = queue.SimpleQueue()
+        self.update_job = None
+        self.controls_frame = tk.Frame(self)
         self.start_animation = tk.Button(
-            self, text="Start", command=self.manage_animation_thread
+            self.controls_frame, text="Start", command=self.manage_animation_thread
+        )
+        self.start_animation.pack(side=tk.LEFT)
+
+        # The `Pause` button pauses and resumes the animation and the `Step`
+        # button advances a paused animation to the next scheduling event.
+        # The animation thread waits on `self.playback` while paused.
+        self.playback = Condition()
+        self.paused = False
+        self.steps = 0
+        self.pause_animation = tk.Button(
+            self.controls_frame, text="Pause", command=self.toggle_pause
         )
-        self.start_animation.pack(side=tk.TOP)
+        self.pause_animation.pack(side=tk.LEFT)
+        self.step_animation = tk.Button(
+            self.controls_frame, text="Step", command=self.step
+        )
+        self.step_animation.pack(side=tk.LEFT)
+
+        # The playback speed is read by the animation thread, so we keep
+        # a plain copy of it rather than reading the `tk.StringVar`.
+        self.speed = tk.StringVar(self)
+        self.speed.set("1x")
+        self.playback_speed = PLAYBACK_SPEEDS["1x"]
+        self.speed_menu = tk.OptionMenu(
+            self.controls_frame, self.speed, *PLAYBACK_SPEEDS, command=self.set_speed
+        )
+        self.speed_menu.pack(side=tk.LEFT)
+        self.controls_frame.pack(side=tk.TOP)
+
         self.time_quantum_method = tk.StringVar(self)
         self.time_quantum_method.set("Arithmetic")
-        methods = {"Arithmetic", "Geometric", "Harmonic"}
-        self.methods_menu = tk.OptionMenu(self, self.time_quantum_method, *methods)
+        self.methods_menu = tk.OptionMenu(
+            self, self.time_quantum_method, *TIME_QUANTUM_METHODS
+        )
         self.methods_menu.pack(side=tk.TOP)
 
+        # Every run is recorded to a binary trace. After `Stop`, the
+        # scrubber jumps to any point in time of the run by seeking in
+        # the memory-mapped trace.
+        self.trace_directory = None
+        if trace_filename is None:
+            self.trace_directory = tempfile.mkdtemp(prefix="roundrobin-")
+            trace_filename = os.path.join(self.trace_directory, "run.trace")
+        self.trace_filename = trace_filename
+        self.profile_filename = profile_filename
+        self.trace = None
+        self.scrubber = tk.Scale(
+            self,
+            orient=tk.HORIZONTAL,
+            resolution=TICK,
+            showvalue=0,
+            command=self.scrub,
+        )
+
     def manage_animation_thread(self):
         """Manages the animation thread. It is triggers to start and stop
         the animation. It is done in the following way:
          - If the widget `text` contains `Start`, it creates and launches a
            thread that runs the method `self.run_animation`. Before we actually
-           do that, we need to set stop_bit=0 to indicate that the animation
+           do that, we need to clear the stop_event to indicate that the animation
            hasn't been interruped yet. Then, we change the text of the widget
            from `Start` to `Stop`. Then, we need to finalize the tasks list
            by calling the method `self.finalize_tasks_list`. We then start the
-           animation.
-         - If the widget `text` contains `Stop`, it sets the stop_bit=1, waits for
-           the thread to complete its task (by calling a `join()` on it) and finally
-           we clean the `self.tasks_canvas` by removing all the tasks. Finally, the text
-           of the widget is changed to `Start` so the user can restart the animation.
+           animation and the loop that applies its updates to the widgets.
+         - If the widget `text` contains `Stop`, it sets the stop_event, waits for
+           the thread to complete its task (by calling a `join()` on it). As the
+           thread never waits on the widgets, this returns within a tick. We then
+           apply the last updates of the thread and show the results. Finally,
+           the text of the widget is changed to `Start` so the user can restart
+           the animation.
         """
         if self.start_animation["text"] == "Start":
-            self.thread_for_animation = Thread(target=self.run_animation)
-            self.stop_bit = 0
+            self.thread_for_animation = Thread(target=self.run_animation, daemon=True)
+            self.stop_event.clear()
+            with self.playback:
+                self.paused = False
+                self.steps = 0
+            self.pause_animation.config(text="Pause")
             self.start_animation.config(text="Stop")
+            self.close_trace()
             self.finalize_tasks_list()
             self.thread_for_animation.start()
+            self.schedule_updates()
         elif self.start_animation["text"] == "Stop":
-            self.stop_bit = 1
+            self.stop_event.set()
+            with self.playback:
+                # Wake up the thread if the animation is paused.
+                self.playback.notify_all()
             self.thread_for_animation.join()
+            self.trace_writer.close()
+            if self.update_job is not None:
+                self.after_cancel(self.update_job)
+                self.update_job = None
+            with self.instrumentation.timed("ui_update"):
+                self.apply_updates()
             self.start_animation.config(text="Start")
-            self.tasks = self.terminated_tasks
+            self.tasks = list(self.terminated_rows)
             self.save_results()
             self.display_results()
             self.calculate_metrics()
-            self.new_tasks.clear()
+            self.open_trace()
+            if self.profile_filename is not None:
+                self.instrumentation.save_json(self.profile_filename)
+
+    def destroy(self):
+        self.close_trace()
+        if self.trace_directory is not None:
+            shutil.rmtree(self.trace_directory, ignore_errors=True)
+            self.trace_directory = None
+        super().destroy()
+
+    def open_trace(self):
+        self.trace = TraceReader(self.trace_filename)
+        if not len(self.trace):
+            return
+        end = self.trace.time(len(self.trace) - 1)
+        self.scrubber.config(from_=0.0, to=end)
+        self.scrubber.set(end)
+        self.scrub(end)
+        self.scrubber.pack(side=tk.TOP, fill=tk.X)
+
+    def close_trace(self):
+        self.scrubber.pack_forget()
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+
+    def scrub(self, value):
+        # Show what the CPU was doing at the time the scrubber points to.
+        if self.trace is None:
+            return
+        time_elapsed = float(value)
+        record = self.trace.running_at(time_elapsed)
+        if record is None:
+            text = f"Time {time_elapsed:.1f}: CPU Idle"
+        else:
+            text = (
+                f"Time {time_elapsed:.1f}: Process {record.pid} running "
+                f"since {record.time:.1f} (quantum {record.quantum})"
+            )
+        self.scrubber.config(label=text)
+
+    def set_speed(self, speed):
+        self.playback_speed = PLAYBACK_SPEEDS[speed]
+
+    def toggle_pause(self):
+        with self.playback:
+            self.paused = not self.paused
+            self.playback.notify_all()
+        self.pause_animation.config(text="Resume" if self.paused else "Pause")
+
+    def step(self):
+        # Stepping a running animation pauses it first.
+        with self.playback:
+            self.paused = True
+            self.steps += 1
+            self.playback.notify_all()
+        self.pause_animation.config(text="Resume")
+
+    def wait_while_paused(self):
+        """Blocks the animation thread while the animation is paused.
+        Returns `True` if the user asked for a single step."""
+        with self.playback:
+            while self.paused and not self.steps and not self.stop_event.is_set():
+                self.playback.wait()
+            if self.paused and self.steps:
+                self.steps -= 1
+                return True
+        return False
+
+    def post_update(self, kind, value=None):
+        # Called by the animation thread. Tk is not thread safe, so
+        # the thread queues its updates instead of applying them.
+        self.updates.put((kind, value))
+
+    def apply_updates(self):
+        """Apply all the queued updates of the animation thread. The
+        intermediate states are merged, so the widgets are redrawn
+        at most once however many updates were queued."""
+        status = None
+        tasks_changed = False
+        terminated = False
+        while True:
+            try:
+                kind, value = self.updates.get_nowait()
+            except queue.Empty:
+                break
+            if kind == STATUS:
+                status = value
+            elif kind == ADMIT or kind == PREEMPT:
+                self.tasks.append(value)
+                tasks_changed = True
+            elif kind == DISPATCH:
+                self.tasks.popleft()
+                tasks_changed = True
+            elif kind == TERMINATE:
+                self.terminated_rows.append(value)
+                self.live_metrics.add_row(self.simulation.table, value)
+                terminated = True
+        if status is not None:
+            self.status = status
+        if status is not None or terminated:
+            self.placeholder_text.config(text=self.status + self.describe_metrics())
+        if tasks_changed:
+            self.task_view.refresh()
+
+    def describe_metrics(self):
+        # The metrics of the processes terminated so far, shown
+        # below the status while the animation runs.
+        if not self.live_metrics.count:
+            return ""
+        metrics = self.live_metrics.summary()
+        return (
+            f"\nThroughput: {metrics['throughput']:.4f} / time unit\n"
+            f"Avg. Waiting: {metrics['avg_waiting_time']:.2f}  "
+            f"Avg. TurnAround: {metrics['avg_turnaround_time']:.2f}\n"
+            f"Waiting P50 / P95 / P99: {metrics['p50_waiting_time']:.2f} / "
+            f"{metrics['p95_waiting_time']:.2f} / {metrics['p99_waiting_time']:.2f}"
+        )
+
+    def schedule_updates(self):
+        # Check whether the thread is alive before draining the queue
+        # so that the last updates of a finished thread aren't missed.
+        alive = self.thread_for_animation.is_alive()
+        with self.instrumentation.timed("ui_update"):
+            self.apply_updates()
+        if alive:
+            self.update_job = self.after(1000 // FRAME_RATE, self.schedule_updates)
+        else:
+            self.update_job = None
 
     def calculate_metrics(self):
         """Calculates throughput, average turnaround time and average waiting time"""
-        self.throughput = statistics.mean(
-            [
-                float(task.process_object.terminated_time)
-                for task in self.terminated_tasks
-            ]
-        )
-        self.avg_turnaround_time = statistics.mean(
-            [
-                float(
-                    task.process_object.terminated_time
-                    - task.process_object.admitted_time
-                )
-                for task in self.terminated_tasks
-            ]
-        )
-        self.avg_waiting_time = statistics.mean(
-            [float(task.process_object.waiting_time) for task in self.terminated_tasks]
-        )
+        if not self.terminated_rows:
+            self.placeholder_text.config(text="No process terminated before 'Stop'.")
+            return
+        self.metrics = calculate_metrics(self.simulation.table, self.terminated_rows)
+        self.throughput = self.metrics["throughput"]
+        self.avg_turnaround_time = self.metrics["avg_turnaround_time"]
+        self.avg_waiting_time = self.metrics["avg_waiting_time"]
         self.placeholder_text.config(
             text=f"Throughput           :   {self.throughput:.4f}\n"
             f"Avg. TurnAround Time :   {self.avg_turnaround_time:.4f}\n"
             f"Avg. Waiting Time    :   {self.avg_waiting_time:.4f}\n"
-            f"No latency assumed. So, time to context switch is 0."
+            f"P95 Waiting Time     :   {self.metrics['p95_waiting_time']:.4f}\n"
+            f"Max Waiting Time     :   {self.metrics['max_waiting_time']:.4f}\n"
+            f"Context Switches     :   {self.simulation.context_switches}\n"
+            f"Switch Overhead      :   {self.simulation.switch_overhead:.4f}"
         )
 
     def save_results(self):
         try:
-            with open(self.filename, "w") as f:
-                f.write(
-                    "pid,burst_time,arrival_time,admitted_time,terminated_time,waiting_time,turnaround_time\n"
-                )
-                for task in self.terminated_tasks:
-                    task_object = task.process_object
-                    f.write(
-                        f"{task_object.pid}"
-                        f",{task_object.burst_time}"
-                        f",{task_object.arrival_time}"
-                        f",{task_object.admitted_time}"
-                        f",{task_object.terminated_time}"
-                        f",{task_object.waiting_time}"
-                        f",{task_object.terminated_time-task_object.admitted_time}\n"
-                    )
+            with self.instrumentation.timed("export"):
+                save_results(self.filename, self.simulation.table, self.terminated_rows)
         except Exception as e:
             print(e.with_traceback())
             msg.showerror(
@@ -342,93 +581,85 @@ class RoundRobin(tk.Tk):
             raise e
 
     def display_results(self):
-        for i, task in enumerate(self.terminated_tasks):
-            task.bind("<Button-1>", self.remove_task)
-            task.pack(side=tk.TOP, fill=tk.X)
-            task.config(text=task.process_object.__repr__())
-        self.recolor_tasks()
+        # The results have more lines than the tasks in the queue.
+        self.task_view.set_items(self.tasks, lines=6)
+
+    def describe_task(self, task):
+        # A task is either a `Process` entered by the user or
+        # the row of a process in the simulation's table.
+        if isinstance(task, Process):
+            return repr(task)
+        return repr(self.simulation.table.process(task))
 
     def make_task(self, text):
         # Input is always in the form "PID; ARRIVAL_TIME; BURST_TIME"
-        # We need to parse it so an `Process` object can be created
-        try:
-            re_ex = r" *; *"
-            pattern = re.compile(re_ex)
-            attr = pattern.split(text)
-            task = Process(
-                pid=int(attr[0]), arrival_time=int(attr[1]), burst_time=int(attr[2])
-            )
-            return task
-        except Exception as e:
-            msg.showerror(
-                title="Invalid input",
-                message="You have entered a invalid input. Please check and try again!",
-            )
-            raise e
+        # We need to parse it so an `Process` object can be created.
+        # Raises a `ValueError` if the input is invalid.
+        return parse_process(text)
 
     def add_task(self, event=None):
         # print("Event recorded: ", event)
         # We will first `get` the input that the user entered
-        # in the `task_create` text box.
+        # in the `task_create` text box. Several processes can
+        # be pasted at once, one per line.
         task_text = self.task_create.get(1.0, tk.END).strip()
 
-        if len(task_text) > 0:
-            # Create a new task as a `Label` to be placed
-            # at the top of the canvas
+        errors = []
+        invalid_lines = []
+        for line, text in enumerate(task_text.splitlines(), 1):
+            if not text.strip():
+                continue
             # Parse the task just arrived and create a process
-            arrived_task = self.make_task(task_text)
-            new_task = tk.Label(
-                arrived_task,
-                self.tasks_frame,
-                text=arrived_task,
-                pady=10,
-                font=("Verdana", 12),
-            )
-
-            self.set_task_color(len(self.tasks) + 1, new_task)
-
-            # Place the new task onto the canvas.
-            new_task.bind("<Button-1>", self.remove_task)
-            new_task.pack(side=tk.TOP, fill=tk.X)
+            try:
+                arrived_task = self.make_task(text)
+            except ValueError as e:
+                errors.append(RowError(line, str(e)))
+                invalid_lines.append(text)
+                continue
 
             # heapq.heappush(self.tasks, new_task)
-            self.tasks.append(new_task)
+            self.tasks.append(arrived_task)
+
+        # Draw the new tasks onto the canvas.
+        self.task_view.refresh()
 
         # Delete method of `tk.Text` deletes the text
         # from the first argument to the second argument.
+        # We keep the invalid lines so the user can fix them.
         self.task_create.delete(1.0, tk.END)
+        if errors:
+            self.task_create.insert(1.0, "\n".join(invalid_lines))
+            self.show_input_errors(errors)
+
+    def show_input_errors(self, errors, limit=10):
+        # Report all the invalid rows in a single dialog
+        # instead of one dialog per row.
+        message = "\n".join(str(error) for error in errors[:limit])
+        if len(errors) > limit:
+            message += f"\n... and {len(errors) - limit} more"
+        msg.showerror(
+            title="Invalid input",
+            message=f"{len(errors)} process(es) could not be added:\n{message}",
+        )
 
     def remove_task(self, event):
         # print("Event recorded: ", event)
-        task = event.widget
+        # Tasks can't be removed while the animation is running
+        # as the scheduler already owns them.
+        if self.start_animation["text"] == "Stop":
+            return
+        index = self.task_view.index_at(event.y)
+        if index is None:
+            return
+        task = self.describe_task(self.tasks[index])
         message = "Are you sure you want to delete"
-        if msg.askyesno("Confirm!", message + ' "' + task.cget("text") + '"?'):
-            self.tasks.remove(event.widget)
-            event.widget.destroy()
-            self.recolor_tasks()
-
-    def recolor_tasks(self):
-        for index, task in enumerate(self.tasks):
-            self.set_task_color(index + 1, task)
-
-    def set_task_color(self, index, new_task):
-        _, text_color_scheme = divmod(index, 2)
-
-        my_color_choice = self.color_schemes[text_color_scheme]
-
-        # Configure is used to change particular fields of the
-        # object on the canvas. You can change the label text,
-        # bg, fg, padx, pady, etc...
-        new_task.configure(bg=my_color_choice["bg"])
-        new_task.configure(fg=my_color_choice["fg"])
-
-    def on_frame_configure(self, event=None):
-        self.tasks_canvas.configure(scrollregion=self.tasks_canvas.bbox("all"))
+        if msg.askyesno("Confirm!", message + ' "' + task + '"?'):
+            del self.tasks[index]
+            self.task_view.refresh()
 
     def task_width(self, event):
         # print("Event recorded: ", event)
-        canvas_width = event.width
-        self.tasks_canvas.itemconfig(self.canvas_frame, width=canvas_width)
+        self.task_view.refresh()
 
     def mouse_scroll(self, event):
         # print("Event recorded: ", event)
@@ -443,44 +674,29 @@ class RoundRobin(tk.Tk):
             self.tasks_canvas.yview_scroll(move, "units")
 
     def finalize_tasks_list(self):
-        tmp_tasks = sorted(self.tasks)
-        for task in self.tasks:
-            task.pack_forget()
-        self.tasks.clear()
-        self.new_tasks = []
-        self.terminated_tasks = []
-        for task in tmp_tasks:
-            self.new_tasks.append(task)
-
-    def get_time_quantum(self):
-        method = self.time_quantum_method.get()
-        if method == "Arithmetic":
-            tq = statistics.mean(
-                [task.process_object.burst_time for task in self.tasks]
-            )
-        elif method == "Geometric":
-            tq = math.sqrt(sum([task.process_object.burst_time for task in self.tasks]))
-        elif method == "Harmonic":
-            tq = 1.0 / statistics.mean(
-                [1.0 / task.process_object.burst_time for task in self.tasks]
-            )
-        return round(tq, 1)
-
-    def get_new_tasks(self, time_elapsed):
-        while (
-            self.new_tasks
-            and self.new_tasks[0].process_object.arrival_time <= time_elapsed
-        ):
-            task = self.new_tasks.pop(0)
-            task.process_object.last_preempted = time_elapsed
-            task.process_object.waiting_time = (
-                time_elapsed - task.process_object.arrival_time
-            )
-            task.process_object.admitted_time = time_elapsed
-            task.process_object.runtime = 0.0
-            self.set_task_color(len(self.tasks) + 1, task)
-            task.pack(side=tk.TOP, fill=tk.X)
-            self.tasks.append(task)
+        # The engine works on a table of processes and refers to them
+        # by their row. After a run, the tasks are rows of the previous
+        # simulation's table, so a restart replays the same processes.
+        tasks = [
+            task if isinstance(task, Process) else self.simulation.table.process(task)
+            for task in self.tasks
+        ]
+        # Processes whose burst time is left empty run for a burst
+        # time predicted from the processes that terminated before.
+        self.simulation = RoundRobinSimulation(
+            tasks,
+            time_quantum_method=self.time_quantum_method.get(),
+            burst_estimator=BurstEstimator(),
+        )
+        # The ready queue shown on screen mirrors the engine's deque.
+        self.tasks = deque()
+        self.terminated_rows = []
+        self.live_metrics = StreamingMetrics()
+        self.instrumentation = Instrumentation()
+        self.instrumentation.instrument(self.simulation)
+        self.status = ""
+        self.task_view.set_items(self.tasks, lines=3)
+        self.trace_writer = TraceWriter(self.trace_filename, self.simulation.table)
 
     def run_animation(self):
         """The core animation method. All the animation magic happens here.
@@ -527,78 +743,103 @@ class RoundRobin(tk.Tk):
              Geometric, and Harmonic Mean for Dynamic Round Robin
              Scheduling
         """
-        time_quantum = 1.0
+        # The schedule itself is computed by the headless engine in
+        # `scheduler.py`. Here we only replay its events, moving the
+        # clock forward one tick at a time so the user can follow along.
+        table = self.simulation.table
         time_elapsed = 0.0
-        while True:
-            if not self.tasks and not self.new_tasks:
-                self.placeholder_text.config(
-                    text=f"Finished! Press 'Stop' to stop the animation."
+        running = None
+        stepping = False
+        events = self.simulation.events()
+        if self.ingestor is not None:
+            # Keep running while processes come in from the ingestor.
+            events = self.ingestor.feed(self.simulation, self.stop_event)
+        events = self.instrumentation.record(self.simulation, events)
+        for event in self.trace_writer.record(events):
+            while time_elapsed < event.time:
+                if not stepping:
+                    stepping = self.wait_while_paused()
+                if self.stop_event.is_set():
+                    return
+                speed = self.playback_speed
+                if running is None or speed is None or stepping:
+                    # Skip straight to the next event when the CPU is idle,
+                    # when playing as fast as possible or when stepping.
+                    time_elapsed = event.time
+                    break
+                runtime = round(time_elapsed - dispatched_time, 1)
+                self.post_update(
+                    STATUS,
+                    f"Time Elapsed:\t{time_elapsed:.1f}\n"
+                    f"Running Process\t{table.pid[running]}\n"
+                    f"Runtime in this cycle: {runtime:.1f}\n"
+                    f"Burst time:   \t{burst_time}\n"
+                    f"Total Runtime:\t{round(initial_runtime + runtime, 1)}",
                 )
-                break
-            if self.stop_bit == 1:
-                break
-            self.get_new_tasks(time_elapsed)
-            PREEMTED_OR_TERMINATED = 0
-            if not self.tasks:
-                self.placeholder_text.config(
-                    text=f"Time Elapsed: {time_elapsed:.1f}\nCPU Idle"
+                # Fast playback moves the clock by several ticks per
+                # frame instead of waking up more often than we redraw.
+                delay = max(TICK / speed, 1.0 / FRAME_RATE)
+                ticks = max(1, round(delay * speed / TICK))
+                # Waiting on the event instead of sleeping lets
+                # the `Stop` button interrupt the animation at once.
+                with self.instrumentation.timed("wait"):
+                    self.stop_event.wait(delay)
+                time_elapsed = min(round(time_elapsed + ticks * TICK, 1), event.time)
+            if self.stop_event.is_set():
+                return
+
+            if event.kind == DISPATCH:
+                running = event.row
+                dispatched_time = event.time
+                initial_runtime = table.runtime[running]
+                burst_time = table.burst_time[running]
+                if math.isnan(burst_time):
+                    burst_time = f"{self.simulation.planned_burst(running)} (predicted)"
+            elif event.kind == PREEMPT:
+                running = None
+                self.post_update(
+                    STATUS,
+                    f"Time Elapsed: {time_elapsed:.1f}\n"
+                    f"Process {table.pid[event.row]} Preempted",
                 )
-            elif self.tasks[0].process_object.arrival_time > time_elapsed:
-                self.placeholder_text.config(
-                    text=f"Time Elapsed: {time_elapsed:.1f}\nCPU Idle"
+            elif event.kind == TERMINATE:
+                running = None
+                self.post_update(
+                    STATUS,
+                    f"Time Elapsed: {time_elapsed:.1f}\n"
+                    f"Process {table.pid[event.row]} Terminated",
                 )
+            if event.kind == IDLE:
+                self.post_update(STATUS, f"Time Elapsed: {time_elapsed:.1f}\nCPU Idle")
             else:
-                time_quantum = self.get_time_quantum()
-                task = self.tasks.pop(0)
-                task_object = task.process_object
-                task_object.waiting_time += time_elapsed - task_object.last_preempted
-                task.pack_forget()
-                self.recolor_tasks()
-                # if task_object.admitted_time is None:
-                #     task_object.admitted_time = time_elapsed
-                #     task_object.runtime = 0.
-                runtime = 0.0
-                while True:
-                    if task_object.runtime == task_object.burst_time:
-                        # time_elapsed -= task_object.runtime - task_object.burst_time
-                        self.placeholder_text.config(
-                            text=f"Time Elapsed: {time_elapsed:.1f}\n"
-                            f"Process {task_object.pid} Terminated"
-                        )
-                        task_object.terminated_time = time_elapsed
-                        task_object.last_preempted = time_elapsed
-                        self.terminated_tasks.append(task)
-                        task.pack_forget()
-                        PREEMTED_OR_TERMINATED = 1
-                        break
-                    elif runtime == time_quantum:
-                        task_object.last_preempted = time_elapsed
-                        self.set_task_color(len(self.tasks) + 1, task)
-                        task.pack(side=tk.TOP, fill=tk.X)
-                        self.tasks.append(task)
-                        self.placeholder_text.config(
-                            text=f"Time Elapsed: {time_elapsed:.1f}\n"
-                            f"Process {task_object.pid} Preempted"
-                        )
-                        PREEMTED_OR_TERMINATED = 1
-                        break
-                    self.placeholder_text.config(
-                        text=f"Time Elapsed:\t{time_elapsed:.1f}\n"
-                        f"Running Process\t{task_object.pid}\n"
-                        f"Runtime in this cycle: {runtime:.1f}\n"
-                        f"{task_object.get_meta()}"
-                    )
-                    runtime = round(runtime + 0.1, 1)
-                    task_object.runtime = round(task_object.runtime + 0.1, 1)
-                    self.get_new_tasks(time_elapsed)
-                    time_elapsed = round(time_elapsed + 0.1, 1)
-                    time.sleep(0.1)
-            if not PREEMTED_OR_TERMINATED:
-                self.get_new_tasks(time_elapsed)
-                time_elapsed = round(time_elapsed + 0.1, 1)
-            time.sleep(0.1)
+                self.post_update(event.kind, event.row)
+            stepping = False
+
+        self.post_update(STATUS, "Finished! Press 'Stop' to stop the animation.")
 
 
 if __name__ == "__main__":
-    todo = RoundRobin()
+    import argparse
+
+    from ingest import ProcessIngestor
+
+    parser = argparse.ArgumentParser(description="Animate round robin scheduling.")
+    parser.add_argument("--tcp", metavar="HOST:PORT", help="accept processes on TCP")
+    parser.add_argument("--unix", metavar="PATH", help="accept processes on a socket")
+    parser.add_argument("--trace", metavar="FILE", help="keep the trace of the run")
+    parser.add_argument("--profile", metavar="FILE", help="save the time profile")
+    args = parser.parse_args()
+
+    ingestor = None
+    if args.tcp or args.unix:
+        ingestor = ProcessIngestor()
+        if args.tcp:
+            host, _, port = args.tcp.rpartition(":")
+            ingestor.start(ingestor.serve_tcp(host or "127.0.0.1", int(port)))
+        else:
+            ingestor.start(ingestor.serve_unix(args.unix))
+
+    todo = RoundRobin(
+        ingestor=ingestor, trace_filename=args.trace, profile_filename=args.profile
+    )
     todo.mainloop()
@@ -0,0 +1,604 @@
+# MIT License
+
+# Copyright (c) 2020 Tirth Patel & Tirth Hihoriya
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Pluggable scheduling policies.
+
+A `Policy` owns the ready queue: it decides which process runs next
+and for how long. `PolicySimulation` runs any policy with the same
+event loop, arrivals, context switch costs and burst time prediction
+as `scheduler.RoundRobinSimulation`, so every policy emits the same
+events and can be measured with the same metrics.
+
+The policies shipped are first come first served, shortest job first,
+shortest remaining time first, Round Robin with a fixed quantum, a
+multilevel feedback queue, weighted fair share and the dynamic Round
+Robin with each of the time quantum methods of `scheduler`.
+
+Usage::
+
+    python policies.py trace.csv --quantum 4
+"""
+
+import argparse
+import copy
+import heapq
+import itertools
+import math
+import sys
+from collections import deque
+
+from metrics import calculate_metrics
+from scheduler import (
+    DISPATCH,
+    IDLE,
+    PREEMPT,
+    TERMINATE,
+    TICK,
+    TIME_QUANTUM_METHODS,
+    BurstEstimator,
+    BurstStatistics,
+    Event,
+    RoundRobinSimulation,
+)
+from workload import load_workload
+
+
+class Policy(object):
+    """Base class of the scheduling policies.
+
+    A policy keeps the processes that are ready to run, referred to
+    by their row in the simulation's table. The simulation calls
+    `admit` for every admitted process, `select` to dispatch a process
+    and `preempted` or `terminated` when its slice ends.
+    """
+
+    name = None
+
+    # Whether the arrival of a process can preempt the running one.
+    # If set, `should_preempt` is called after every arrival.
+    preemptive = False
+
+    def bind(self, simulation):
+        """Attach the policy to the simulation that runs it."""
+        self.simulation = simulation
+        self.table = simulation.table
+
+    def remaining(self, row):
+        """The (possibly predicted) ticks `row` still has to run."""
+        simulation = self.simulation
+        return simulation.remaining_ticks(row, simulation.planned_burst(row))
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def admit(self, row):
+        """A process is ready to run for the first time."""
+        raise NotImplementedError
+
+    def select(self, time):
+        """Remove the next process to run from the ready queue.
+
+        Returns
+        -------
+        row: int
+            The row of the process.
+
+        quantum: float
+            How long it may run, `None` to run it to completion. The
+            simulation rounds it to its grid, to at least one tick.
+        """
+        raise NotImplementedError
+
+    def preempted(self, row, runtime):
+        """`row` ran for `runtime` ticks and is ready to run again. By default
+        it is queued like a newly admitted process."""
+        self.admit(row)
+
+    def terminated(self, row, runtime):
+        """`row` ran for `runtime` ticks and terminated."""
+
+    def should_preempt(self, row, remaining):
+        """Whether the running process `row`, with `remaining` ticks to
+        run, is preempted by the processes that just arrived."""
+        return False
+
+
+class FirstComeFirstServed(Policy):
+    """Run the processes to completion in the order they arrive."""
+
+    name = "FCFS"
+
+    def __init__(self):
+        self.queue = deque()
+
+    def __len__(self):
+        return len(self.queue)
+
+    def admit(self, row):
+        self.queue.append(row)
+
+    def select(self, time):
+        return self.queue.popleft(), None
+
+
+class ShortestJobFirst(Policy):
+    """Run the process with the shortest burst time to completion."""
+
+    name = "SJF"
+
+    def __init__(self):
+        self.heap = []
+        self.counter = itertools.count()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def admit(self, row):
+        # Ties are broken by arrival order.
+        heapq.heappush(self.heap, (self.remaining(row), next(self.counter), row))
+
+    def select(self, time):
+        return heapq.heappop(self.heap)[2], None
+
+
+class ShortestRemainingTimeFirst(ShortestJobFirst):
+    """Run the process with the shortest remaining time, preempting it
+    as soon as a process with a shorter remaining time arrives."""
+
+    name = "SRTF"
+    preemptive = True
+
+    def should_preempt(self, row, remaining):
+        return bool(self.heap) and self.heap[0][0] < remaining
+
+
+class RoundRobin(Policy):
+    """Round Robin with a fixed time quantum.
+
+    Parameters
+    ----------
+    quantum: optional, float
+        The time quantum.
+    """
+
+    name = "RR"
+
+    def __init__(self, quantum=4.0):
+        if quantum <= 0:
+            raise ValueError(f"The time quantum must be positive, got {quantum}")
+        self.quantum = quantum
+        self.queue = deque()
+
+    def __len__(self):
+        return len(self.queue)
+
+    def admit(self, row):
+        self.queue.append(row)
+
+    def select(self, time):
+        return self.queue.popleft(), self.quantum
+
+
+class DynamicRoundRobin(RoundRobin):
+    """Round Robin whose time quantum is a mean of the burst times
+    of the ready processes, as in `scheduler.RoundRobinSimulation`.
+
+    Parameters
+    ----------
+    method: optional, str
+        One of `scheduler.TIME_QUANTUM_METHODS`.
+    """
+
+    def __init__(self, method="Arithmetic"):
+        if method not in TIME_QUANTUM_METHODS:
+            raise ValueError(f"Unknown time quantum method: {method!r}")
+        self.name = f"RR ({method})"
+        self.method = method
+        self.queue = deque()
+        self.statistics = BurstStatistics()
+
+    def admit(self, row):
+        self.queue.append(row)
+        self.statistics.add(self.simulation.planned_burst(row))
+
+    def select(self, time):
+        # The quantum includes the burst time of the dispatched process.
+        quantum = self.statistics.time_quantum(self.method, digits=None)
+        row = self.queue.popleft()
+        self.statistics.remove(self.simulation.planned_burst(row))
+        return row, quantum
+
+
+class MultilevelFeedbackQueue(Policy):
+    """A multilevel feedback queue.
+
+    New processes enter the highest priority queue. A process that
+    uses up its quantum moves down a level, where the quantum is
+    longer. Every `boost_interval` time units all the processes move
+    back to the highest priority to avoid starvation. The running
+    process isn't preempted by arrivals.
+
+    Parameters
+    ----------
+    quanta: optional, tuple
+        The time quantum of each level, from the highest priority.
+
+    boost_interval: optional, float
+        Time between two priority boosts. `None` to never boost.
+    """
+
+    name = "MLFQ"
+
+    def __init__(self, quanta=(2.0, 4.0, 8.0), boost_interval=100.0):
+        self.quanta = tuple(quanta)
+        self.boost_interval = boost_interval
+        self.queues = [deque() for _ in self.quanta]
+        self.level = {}
+        self.last_boost = 0.0
+
+    def __len__(self):
+        return sum(map(len, self.queues))
+
+    def admit(self, row):
+        self.level[row] = 0
+        self.queues[0].append(row)
+
+    def select(self, time):
+        if (
+            self.boost_interval is not None
+            and time - self.last_boost >= self.boost_interval
+        ):
+            self.last_boost = time
+            for queue in self.queues[1:]:
+                for row in queue:
+                    self.level[row] = 0
+                self.queues[0].extend(queue)
+                queue.clear()
+        for level, queue in enumerate(self.queues):
+            if queue:
+                return queue.popleft(), self.quanta[level]
+
+    def preempted(self, row, runtime):
+        level = min(self.level[row] + 1, len(self.quanta) - 1)
+        self.level[row] = level
+        self.queues[level].append(row)
+
+    def terminated(self, row, runtime):
+        del self.level[row]
+
+
+class WeightedFairShare(Policy):
+    """Share the CPU between groups of processes in proportion
+    to their weights.
+
+    Each group is charged the time its processes run divided by its
+    weight, and the group that was charged the least runs next. Within
+    a group the processes take turns like in Round Robin. A group that
+    becomes active again after being idle starts from the least charge
+    of the active groups, so idling doesn't earn it a burst of CPU time
+    later. The group of the running process counts as active.
+
+    Parameters
+    ----------
+    quantum: optional, float
+        The time quantum of every slice.
+
+    weights: optional, dict
+        The weight of each group. Groups not in it have a weight of 1.
+
+    group: optional, callable
+        Maps the pid of a process to its group. Defaults to the pid,
+        which shares the CPU equally between the processes.
+    """
+
+    name = "Fair Share"
+
+    def __init__(self, quantum=4.0, weights=None, group=None):
+        self.quantum = quantum
+        self.weights = weights or {}
+        self.group = group
+        self.queues = {}
+        self.charge = {}
+        self.active = []
+        # The group of the process being run, which may have no
+        # other process in `active`.
+        self.running = None
+        self.counter = itertools.count()
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _group(self, row):
+        pid = self.table.pid[row]
+        return pid if self.group is None else self.group(pid)
+
+    def _push(self, row):
+        group = self._group(row)
+        queue = self.queues.get(group)
+        if not queue:
+            if queue is None:
+                queue = self.queues[group] = deque()
+            charge = self.charge.get(group, 0.0)
+            if group != self.running:
+                charges = [c for c, _, _ in self.active[:1]]
+                if self.running is not None:
+                    charges.append(self.charge[self.running])
+                charge = max(charge, min(charges, default=0.0))
+                self.charge[group] = charge
+            heapq.heappush(self.active, (charge, next(self.counter), group))
+        queue.append(row)
+        self.count += 1
+
+    def admit(self, row):
+        self._push(row)
+
+    def select(self, time):
+        charge, _, group = heapq.heappop(self.active)
+        queue = self.queues[group]
+        row = queue.popleft()
+        self.count -= 1
+        if queue:
+            heapq.heappush(self.active, (charge, next(self.counter), group))
+        self.running = group
+        return row, self.quantum
+
+    def _charge(self, row, runtime):
+        group = self._group(row)
+        self.charge[group] += runtime / self.weights.get(group, 1.0)
+        if self.queues[group]:
+            # Move the group to its new place among the active groups.
+            self.active = [
+                (self.charge[g] if g == group else c, n, g) for c, n, g in self.active
+            ]
+            heapq.heapify(self.active)
+
+    def preempted(self, row, runtime):
+        # The group was active while its process ran, it doesn't
+        # catch up with the least charge.
+        self._charge(row, runtime)
+        self._push(row)
+        self.running = None
+
+    def terminated(self, row, runtime):
+        self._charge(row, runtime)
+        self.running = None
+        group = self._group(row)
+        if not self.queues[group]:
+            del self.queues[group]
+
+
+class PolicySimulation(RoundRobinSimulation):
+    """Discrete-event simulation of a scheduling `Policy`.
+
+    Parameters
+    ----------
+    processes: ProcessTable or iterable
+        The processes to schedule.
+
+    policy: Policy
+        The scheduling policy. A policy instance runs one simulation.
+
+    context_switch_cost: optional, ContextSwitchCost
+        The cost of switching between processes.
+
+    burst_estimator: optional, BurstEstimator
+        Predicts the burst times that are not known.
+
+    resolution: optional, float
+        Length of a tick, the step of the simulated clock.
+    """
+
+    def __init__(
+        self,
+        processes,
+        policy,
+        context_switch_cost=None,
+        burst_estimator=None,
+        resolution=TICK,
+    ):
+        super().__init__(
+            processes,
+            context_switch_cost=context_switch_cost,
+            burst_estimator=burst_estimator,
+            resolution=resolution,
+        )
+        self.policy = policy
+        policy.bind(self)
+
+    def _enqueue(self, row):
+        self.policy.admit(row)
+
+    def compact(self):
+        # The rows held by the policy aren't renumbered.
+        raise TypeError(
+            "Streaming checkpoints only support RoundRobinSimulation, "
+            "policy simulations can't be compacted"
+        )
+
+    def events(self):
+        """Run the simulation, yielding every scheduling `Event`
+        in the order in which it happens. Processes arriving while
+        another one runs are admitted before it is preempted, except
+        the ones arriving at the very instant of the preemption."""
+        table = self.table
+        grid = self.grid
+        policy = self.policy
+        while len(policy) or self.has_pending_arrivals():
+            yield from self.get_new_tasks(self.now)
+            if not len(policy):
+                yield Event(grid.time(self.now), IDLE, None, None)
+                self.now = grid.ceil(self.next_arrival_time())
+                continue
+
+            row, time_quantum = policy.select(grid.time(self.now))
+            quantum = None
+            if time_quantum is not None:
+                quantum = self.quantum_ticks(time_quantum=time_quantum)
+                time_quantum = grid.time(quantum)
+            start = self.now
+            if row != self._last_dispatched:
+                start += self.charge_context_switch(row)
+            self._last_dispatched = row
+            table.waiting_time[row] += grid.time(start) - table.last_preempted[row]
+            yield Event(grid.time(self.now), DISPATCH, row, time_quantum)
+
+            remaining = policy.remaining(row)
+            terminated = quantum is None or remaining <= quantum
+            runtime = remaining if terminated else quantum
+            finish = start + runtime
+            if policy.preemptive:
+                # Admit the arrivals one instant at a time, so the
+                # policy can preempt the process as soon as one arrives.
+                while self.has_pending_arrivals():
+                    instant = max(grid.ceil(self.next_arrival_time()), self.now)
+                    if instant >= finish:
+                        break
+                    yield from self.get_new_tasks(instant)
+                    ran = instant - start
+                    if ran > 0 and policy.should_preempt(row, remaining - ran):
+                        terminated = False
+                        runtime = ran
+                        finish = instant
+                        break
+            else:
+                yield from self.get_new_tasks(finish, inclusive=False)
+
+            self.now = finish
+            finish_time = grid.time(finish)
+            table.runtime[row] = grid.time(grid.round(table.runtime[row]) + runtime)
+            table.last_preempted[row] = finish_time
+            if terminated:
+                table.terminated_time[row] = finish_time
+                self.terminated_tasks.append(row)
+                self.burst_terminated(row)
+                policy.terminated(row, runtime)
+                yield Event(finish_time, TERMINATE, row, None)
+            else:
+                policy.preempted(row, runtime)
+                yield Event(finish_time, PREEMPT, row, None)
+
+
+def default_policies(quantum=4.0):
+    """One instance of every policy, the fixed ones using `quantum`."""
+    return [
+        FirstComeFirstServed(),
+        ShortestJobFirst(),
+        ShortestRemainingTimeFirst(),
+        RoundRobin(quantum),
+        MultilevelFeedbackQueue(),
+        WeightedFairShare(quantum),
+    ] + [DynamicRoundRobin(method) for method in TIME_QUANTUM_METHODS]
+
+
+def compare(workload, policies, context_switch_cost=None, burst_estimator=None):
+    """Run every policy on a copy of the same workload.
+
+    Every policy gets its own copy of the context switch cost and of
+    the burst estimator, so the random overheads and the predictions
+    don't depend on the policies that ran before it.
+
+    Parameters
+    ----------
+    workload: ProcessTable
+        The processes to schedule.
+
+    policies: iterable
+        `Policy` instances.
+
+    context_switch_cost: optional, ContextSwitchCost
+        The cost of a context switch.
+
+    burst_estimator: optional, BurstEstimator
+        Predicts the burst times that are not known. Defaults to a
+        `BurstEstimator` with its default parameters if any isn't known.
+
+    Returns
+    -------
+    results: list
+        The metrics of `metrics.calculate_metrics` for each policy, with
+        its `policy` name and number of `context_switches`.
+    """
+    if burst_estimator is None and any(map(math.isnan, workload.burst_time)):
+        burst_estimator = BurstEstimator()
+    results = []
+    for policy in policies:
+        simulation = PolicySimulation(
+            workload.copy(),
+            policy,
+            context_switch_cost=copy.deepcopy(context_switch_cost),
+            burst_estimator=copy.deepcopy(burst_estimator),
+        )
+        rows = simulation.run()
+        result = {"policy": policy.name}
+        result.update(calculate_metrics(simulation.table, rows))
+        result["context_switches"] = simulation.context_switches
+        results.append(result)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare scheduling policies on a workload."
+    )
+    parser.add_argument("workload", help="CSV or JSON lines workload")
+    parser.add_argument(
+        "--quantum",
+        type=float,
+        default=4.0,
+        help="time quantum of the fixed quantum policies (default: 4)",
+    )
+    args = parser.parse_args(argv)
+
+    workload, errors = load_workload(args.workload)
+    for error in errors:
+        print(f"{args.workload}: skipped {error}", file=sys.stderr)
+    header = (
+        "policy",
+        "throughput",
+        "avg. waiting",
+        "p95 waiting",
+        "p99 waiting",
+        "avg. turnaround",
+        "p99 turnaround",
+        "switches",
+    )
+    lines = [
+        (
+            result["policy"],
+            f"{result['throughput']:.4f}",
+            f"{result['avg_waiting_time']:.4f}",
+            f"{result['p95_waiting_time']:.4f}",
+            f"{result['p99_waiting_time']:.4f}",
+            f"{result['avg_turnaround_time']:.4f}",
+            f"{result['p99_turnaround_time']:.4f}",
+            str(result["context_switches"]),
+        )
+        for result in compare(workload, default_policies(args.quantum))
+    ]
+    widths = [max(len(row[i]) for row in [header] + lines) for i in range(len(header))]
+    for row in [header] + lines:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+# MIT License
+
+# Copyright (c) 2020 Tirth Patel & Tirth Hihoriya
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Command line interface of the Round Robin scheduler.
+
+Schedules a workload with one time quantum method and writes the
+results of the processes as CSV or JSON. It doesn't need a display:
+no GUI module is imported unless `--animate` is given.
+
+Usage::
+
+    python -m roundrobin trace.csv --method Harmonic --output results.csv
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+
+from metrics import RESULT_COLUMNS, calculate_metrics, result_rows, write_results
+from scheduler import (
+    SWITCH_COST_DISTRIBUTIONS,
+    TICK,
+    TIME_QUANTUM_METHODS,
+    BurstEstimator,
+    ContextSwitchCost,
+    ProcessTable,
+    RoundRobinSimulation,
+)
+from workload import iter_workload, load_workload
+
+
+def json_metrics(metrics):
+    """The metrics with `null` for the values JSON can't represent, like
+    the infinite throughput of processes that all had a zero burst."""
+    return {
+        name: None if isinstance(value, float) and not math.isfinite(value) else value
+        for name, value in metrics.items()
+    }
+
+
+def save_json(filename, metrics, results):
+    """Write the metrics and tuples of `RESULT_COLUMNS` to a JSON file."""
+    with open(filename, "w") as f:
+        json.dump(
+            {
+                "metrics": json_metrics(metrics),
+                "results": [dict(zip(RESULT_COLUMNS, result)) for result in results],
+            },
+            f,
+            allow_nan=False,
+        )
+
+
+def report_no_processes(workload, errors):
+    """Report the skipped rows of a workload without any valid process.
+    Returns the exit status."""
+    for error in errors:
+        print(f"{workload}: skipped {error}", file=sys.stderr)
+    print(f"{workload}: no valid processes", file=sys.stderr)
+    return 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="roundrobin",
+        description="Schedule a workload with dynamic Round Robin.",
+    )
+    parser.add_argument("workload", help="CSV or JSON lines workload")
+    parser.add_argument(
+        "--method",
+        choices=TIME_QUANTUM_METHODS,
+        default=TIME_QUANTUM_METHODS[0],
+        help=f"time quantum method (default: {TIME_QUANTUM_METHODS[0]})",
+    )
+    parser.add_argument(
+        "--quantum", type=float, help="fixed time quantum to use instead"
+    )
+    parser.add_argument(
+        "--resolution",
+        type=float,
+        default=TICK,
+        help=f"length of a tick of the simulated clock (default: {TICK})",
+    )
+    parser.add_argument(
+        "--switch-overhead",
+        type=float,
+        default=0.0,
+        help="(mean) time to switch between processes (default: 0)",
+    )
+    parser.add_argument(
+        "--switch-distribution",
+        choices=SWITCH_COST_DISTRIBUTIONS,
+        default="constant",
+        help="distribution of the switch overhead (default: constant)",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=float,
+        default=0.0,
+        help="cache warmup penalty when resuming a preempted process",
+    )
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=0.5,
+        help="weight of the last burst when predicting unknown burst times",
+    )
+    parser.add_argument(
+        "--output",
+        help="write the results to this file, as JSON if it ends "
+        "with .json and as CSV otherwise",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="DIRECTORY",
+        help="reuse the results of an identical earlier run from this directory",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        metavar="FILE",
+        help="save the state of the simulation to this file periodically",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=60.0,
+        metavar="SECONDS",
+        help="wall clock time between checkpoints (default: 60)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue from the checkpoint, if there is one",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="read the workload as the clock reaches it and append the results "
+        "to the CSV output as processes terminate, in bounded memory. The "
+        "throughput is then the one of the last 100 time units",
+    )
+    parser.add_argument(
+        "--animate",
+        action="store_true",
+        help="open the workload in the animation instead (needs tkinter)",
+    )
+    args = parser.parse_args(argv)
+    if args.stream and (not args.output or args.output.lower().endswith(".json")):
+        parser.error("--stream needs a CSV --output")
+    if args.resume and not args.checkpoint:
+        parser.error("--resume needs a --checkpoint")
+    if args.cache and (args.stream or args.checkpoint):
+        parser.error("--cache can't be combined with --stream or --checkpoint")
+
+    errors = []
+    resuming = args.resume and os.path.exists(args.checkpoint)
+    if args.stream and not args.animate:
+        # The processes are read as the clock reaches them.
+        table = ProcessTable()
+        arrivals = iter_workload(args.workload, errors)
+    elif resuming and not args.animate:
+        # The processes are in the checkpoint.
+        table = arrivals = None
+    else:
+        table, errors = load_workload(args.workload)
+        arrivals = None
+
+    if args.animate:
+        # tkinter is only imported for the animation.
+        from osproject import RoundRobin
+
+        for error in errors:
+            print(f"{args.workload}: skipped {error}", file=sys.stderr)
+        tasks = [table.process(row) for row in range(len(table))]
+        RoundRobin(args.output or "process_meta.csv", tasks).mainloop()
+        return
+    if table is not None and arrivals is None and not len(table):
+        return report_no_processes(args.workload, errors)
+
+    context_switch_cost = None
+    if args.switch_overhead or args.warmup:
+        context_switch_cost = ContextSwitchCost(
+            args.switch_overhead, args.switch_distribution, args.warmup
+        )
+    # Only unknown burst times are predicted. A streamed workload
+    # isn't read in advance, so it may always have some.
+    burst_estimator = None
+    if arrivals is not None or (
+        table is not None and any(map(math.isnan, table.burst_time))
+    ):
+        burst_estimator = BurstEstimator(args.alpha)
+    parameters = dict(
+        time_quantum_method=args.method,
+        time_quantum=args.quantum,
+        context_switch_cost=context_switch_cost,
+        burst_estimator=burst_estimator,
+        resolution=args.resolution,
+    )
+    if args.cache:
+        from cache import ResultCache
+
+        result = ResultCache(args.cache).run(table, **parameters)
+        # The cached metrics are shared, so they are copied.
+        metrics = dict(result.metrics)
+        results = result.rows()
+        context_switches = result.context_switches
+        switch_overhead = result.switch_overhead
+    elif args.checkpoint or args.stream:
+        from checkpoint import Checkpointer
+
+        streamed = args.output if args.stream else None
+        if resuming:
+            # The settings the run was started with are in the checkpoint.
+            checkpointer = Checkpointer.resume(
+                args.checkpoint, arrivals, streamed, args.checkpoint_interval
+            )
+        else:
+            checkpointer = Checkpointer(
+                RoundRobinSimulation(table, arrivals=arrivals, **parameters),
+                args.checkpoint,
+                args.checkpoint_interval,
+                streamed,
+            )
+        simulation = checkpointer.simulation
+        with checkpointer:
+            for _ in checkpointer.record(simulation.events()):
+                pass
+        if args.stream:
+            if not checkpointer.metrics.count:
+                return report_no_processes(args.workload, errors)
+            metrics = checkpointer.metrics.summary()
+            results = None
+        else:
+            rows = simulation.terminated_tasks
+            metrics = calculate_metrics(simulation.table, rows)
+            results = result_rows(simulation.table, rows)
+        context_switches = simulation.context_switches
+        switch_overhead = simulation.switch_overhead
+    else:
+        simulation = RoundRobinSimulation(table, **parameters)
+        rows = simulation.run()
+        metrics = calculate_metrics(table, rows)
+        results = result_rows(table, rows)
+        context_switches = simulation.context_switches
+        switch_overhead = simulation.switch_overhead
+    metrics["context_switches"] = context_switches
+    metrics["switch_overhead"] = switch_overhead
+
+    for error in errors:
+        print(f"{args.workload}: skipped {error}", file=sys.stderr)
+    # Streamed results are already written.
+    if results is not None and args.output:
+        if args.output.lower().endswith(".json"):
+            save_json(args.output, metrics, results)
+        else:
+            write_results(args.output, results)
+    json.dump(json_metrics(metrics), sys.stdout, indent=2, allow_nan=False)
+    print()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
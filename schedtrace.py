@@ -0,0 +1,311 @@
+# MIT License
+
+# Copyright (c) 2020 Tirth Patel & Tirth Hihoriya
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Compact binary traces of scheduling events.
+
+Every event emitted by the scheduler is stored as a fixed-width
+32 byte record holding its time, the time quantum in effect, the pid
+of the process, the CPU and the kind of the event. The records are
+read back through a memory map, so a trace of any size can be opened
+instantly and scrubbed to any point in time.
+
+Alongside the trace, a sparse time index with the time of every
+`INDEX_INTERVAL`-th record is written to `<trace>.idx`. Seeking to a
+time bisects the index and then the records of a single block, which
+is O(log n) and touches only a handful of pages of the trace.
+
+Usage::
+
+    python schedtrace.py run.trace --start 120 --end 125
+"""
+
+import argparse
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+from scheduler import ADMIT, DISPATCH, IDLE, PREEMPT, TERMINATE
+
+MAGIC = b"RRTRACE\0"
+VERSION = 1
+
+# magic, version, record size
+HEADER = struct.Struct("<8sII")
+
+# time, quantum, pid, core, kind and 5 bytes of padding
+RECORD = struct.Struct("<ddqhB5x")
+
+INDEX_INTERVAL = 4096
+
+EVENT_KINDS = (ADMIT, DISPATCH, PREEMPT, TERMINATE, IDLE)
+_KIND_CODES = {kind: code for code, kind in enumerate(EVENT_KINDS)}
+
+
+class TraceRecord(
+    namedtuple("TraceRecord", ["time", "kind", "pid", "quantum", "core"])
+):
+    """A scheduling event read back from a trace.
+
+    Parameters
+    ----------
+    time: float
+        The simulated time of the event.
+
+    kind: str
+        One of `ADMIT`, `DISPATCH`, `PREEMPT`, `TERMINATE` or `IDLE`.
+
+    pid: int
+        The pid of the process. `None` for `IDLE` events.
+
+    quantum: float
+        The time quantum in effect. `None` if not a `DISPATCH` event.
+
+    core: int
+        The CPU of the event. `None` for single CPU simulations.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def unpack(cls, time, quantum, pid, core, kind):
+        return cls(
+            time,
+            EVENT_KINDS[kind],
+            None if pid < 0 else pid,
+            None if math.isnan(quantum) else quantum,
+            None if core < 0 else core,
+        )
+
+
+def index_filename(filename):
+    return filename + ".idx"
+
+
+class TraceWriter(object):
+    """Write scheduling events to a binary trace.
+
+    Parameters
+    ----------
+    filename: str
+        Path of the trace. The time index is written to `<filename>.idx`.
+
+    table: ProcessTable
+        The table the events refer to, to look up the pids.
+
+    index_interval: optional, int
+        Number of records between two entries of the time index.
+    """
+
+    def __init__(self, filename, table, index_interval=INDEX_INTERVAL):
+        self.filename = filename
+        self.table = table
+        self.index_interval = index_interval
+        self.count = 0
+        self.index = array("d")
+        self.file = open(filename, "wb", buffering=1 << 20)
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+
+    def write(self, event):
+        if self.count % self.index_interval == 0:
+            self.index.append(event.time)
+        self.file.write(
+            RECORD.pack(
+                event.time,
+                math.nan if event.quantum is None else event.quantum,
+                -1 if event.row is None else self.table.pid[event.row],
+                -1 if event.core is None else event.core,
+                _KIND_CODES[event.kind],
+            )
+        )
+        self.count += 1
+
+    def record(self, events):
+        """Write every event of an iterable of events and yield it
+        on, e.g. ``for event in writer.record(simulation.events())``."""
+        for event in events:
+            self.write(event)
+            yield event
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.close()
+        with open(index_filename(self.filename), "wb") as f:
+            f.write(struct.pack("<I", self.index_interval))
+            self.index.tofile(f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def record_trace(simulation, filename):
+    """Run a simulation to completion and write its trace.
+
+    Returns
+    -------
+    count: int
+        Number of events in the trace.
+    """
+    with TraceWriter(filename, simulation.table) as writer:
+        for _ in writer.record(simulation.events()):
+            pass
+    return writer.count
+
+
+class TraceReader(object):
+    """Read a binary trace through a memory map.
+
+    The reader behaves as a sequence of `TraceRecord` objects.
+
+    Parameters
+    ----------
+    filename: str
+        Path of the trace.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, "rb") as f:
+            magic, version, record_size = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{filename} is not a scheduling trace")
+            if version != VERSION or record_size != RECORD.size:
+                raise ValueError(
+                    f"{filename}: unsupported trace version {version} "
+                    f"with records of {record_size} bytes"
+                )
+            size = os.fstat(f.fileno()).st_size
+            self.count = (size - HEADER.size) // RECORD.size
+            self.mmap = None
+            if self.count:
+                self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.index = None
+        self.index_interval = None
+        if os.path.exists(index_filename(filename)):
+            with open(index_filename(filename), "rb") as f:
+                (self.index_interval,) = struct.unpack("<I", f.read(4))
+                self.index = array("d")
+                self.index.frombytes(f.read())
+
+    def __len__(self):
+        return self.count
+
+    def time(self, i):
+        """The time of the `i`-th record, without decoding the rest."""
+        return struct.unpack_from("<d", self.mmap, HEADER.size + i * RECORD.size)[0]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.count))]
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("trace record index out of range")
+        return TraceRecord.unpack(
+            *RECORD.unpack_from(self.mmap, HEADER.size + i * RECORD.size)
+        )
+
+    def __iter__(self):
+        if not self.count:
+            return
+        for fields in RECORD.iter_unpack(memoryview(self.mmap)[HEADER.size :]):
+            yield TraceRecord.unpack(*fields)
+
+    def seek(self, time):
+        """Index of the first record at or after `time`. Equal to
+        `len(self)` if every record happened before `time`."""
+        lo, hi = 0, self.count
+        if self.index is not None:
+            block = bisect_left(self.index, time)
+            lo = max(0, (block - 1) * self.index_interval)
+            hi = min(self.count, block * self.index_interval)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.time(mid) < time:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def between(self, start, end):
+        """The records with `start <= time < end`."""
+        return self[self.seek(start) : self.seek(end)]
+
+    def running_at(self, time):
+        """The `DISPATCH` record of the process running at `time`,
+        `None` if the CPU is idle at that time. Only meaningful for
+        single CPU traces."""
+        i = self.seek(time)
+        # Walk back over the events of this instant to the last
+        # event that changed what the CPU is doing.
+        while i < self.count and self.time(i) == time:
+            i += 1
+        for j in range(i - 1, -1, -1):
+            record = self[j]
+            if record.kind == DISPATCH:
+                return record
+            if record.kind in (PREEMPT, TERMINATE, IDLE):
+                return None
+        return None
+
+    def close(self):
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the events of a trace.")
+    parser.add_argument("trace", help="path of the trace")
+    parser.add_argument("--start", type=float, default=-math.inf)
+    parser.add_argument("--end", type=float, default=math.inf)
+    args = parser.parse_args(argv)
+
+    with TraceReader(args.trace) as trace:
+        for record in trace.between(args.start, args.end):
+            fields = [f"{record.time:.1f}", record.kind]
+            if record.pid is not None:
+                fields.append(f"pid={record.pid}")
+            if record.quantum is not None:
+                fields.append(f"quantum={record.quantum}")
+            if record.core is not None:
+                fields.append(f"core={record.core}")
+            print(" ".join(fields))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1031 @@
+# MIT License
+
+# Copyright (c) 2020 Tirth Patel & Tirth Hihoriya
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Headless discrete-event engine for the dynamic Round Robin
+scheduling algorithm.
+
+The engine does not depend on tkinter. Instead of advancing the
+clock one tick at a time it jumps straight from one event (an
+arrival, a quantum expiry or a termination) to the next, so large
+workloads can be evaluated in seconds. The animation in
+`osproject.py` replays the events emitted by this engine.
+"""
+
+import heapq
+import itertools
+import math
+import random
+from array import array
+from collections import deque, namedtuple
+from time import perf_counter
+
+# Simulated time advances on a grid of `TICK` time units. This is
+# the same step the animation uses to move the clock forward, so
+# every admission, preemption and termination happens on this grid.
+# Simulations can use a finer grid through their `resolution`.
+TICK = 0.1
+
+# Kinds of events emitted by `RoundRobinSimulation.events`.
+ADMIT = "admit"
+DISPATCH = "dispatch"
+PREEMPT = "preempt"
+TERMINATE = "terminate"
+IDLE = "idle"
+
+TIME_QUANTUM_METHODS = ("Arithmetic", "Geometric", "True Geometric", "Harmonic")
+
+SWITCH_COST_DISTRIBUTIONS = ("constant", "uniform", "exponential")
+
+
+class Event(
+    namedtuple("Event", ["time", "kind", "row", "quantum", "core"], defaults=(None,))
+):
+    """A scheduling event.
+
+    Parameters
+    ----------
+    time: float
+        The simulated time at which the event happened.
+
+    kind: str
+        One of `ADMIT`, `DISPATCH`, `PREEMPT`, `TERMINATE` or `IDLE`.
+
+    row: int
+        The row of the process in the simulation's `ProcessTable`.
+        `None` for `IDLE` events.
+
+    quantum: float
+        The time quantum in effect. Only set for `DISPATCH` events.
+
+    core: optional, int
+        The CPU the event happened on, for simulations
+        with more than one CPU. `None` otherwise.
+    """
+
+    __slots__ = ()
+
+
+class Process(object):
+    """Initialize a process control block.
+
+    Parameters
+    ----------
+    pid: int
+        The process id
+
+    burst_time: float
+        The burst time of the process. If not known,
+        pass `None` and the burst time will be predicted
+        during runtime by a `BurstEstimator`
+
+    arrival_time: float
+        The arrival time of the process.
+    """
+
+    __slots__ = (
+        "pid",
+        "burst_time",
+        "arrival_time",
+        "admitted_time",
+        "last_preempted",
+        "terminated_time",
+        "waiting_time",
+        "runtime",
+    )
+
+    def __init__(self, pid, burst_time, arrival_time):
+        self.pid = pid
+        self.burst_time = burst_time
+        self.arrival_time = arrival_time
+
+        # Attributes to do some book-keeping
+        # during scheduling
+        self.admitted_time = None
+        self.last_preempted = None
+        self.terminated_time = None
+        self.waiting_time = None
+        self.runtime = None
+
+    def get_meta(self):
+        msg = (
+            f"Burst time:   \t{self.burst_time}\n"
+            f"Total Runtime:\t{self.runtime}\n"
+            # f"Waiting Time: \t{self.waiting_time:.1f}\n"
+            f"Terminated:   \t{self.terminated_time}"
+        )
+        return msg
+
+    def __repr__(self):
+        # We return a message of the form
+        # PID: <process.id>
+        # Burst Time: <process.burst_time>
+        # Arrival Time: <process.arrival_time>
+        msg = f"PID:\t\t{self.pid}\n"
+        if self.burst_time is None:
+            msg += "Burst Time:\tunknown\n"
+        else:
+            msg += f"Burst Time:\t{self.burst_time:.1f}\n"
+        msg += f"Arrival Time:\t{self.arrival_time:.1f}"
+        if self.terminated_time is not None:
+            msg += "\n"
+            msg += self.get_meta()
+        return msg
+
+    def __str__(self):
+        return self.__repr__()
+
+
+class ProcessTable(object):
+    """A compact, column oriented table of process control blocks.
+
+    Instead of one `Process` object per process, every attribute is
+    stored in its own `array` column and a process is identified by
+    its row in the table. A row takes 64 bytes, so a table of ten
+    million processes fits in about 640 MB.
+
+    Times that are not known yet (e.g. the terminated time of a
+    process that is still running, or a burst time that is `None`)
+    are stored as `nan`.
+    """
+
+    columns = (
+        "pid",
+        "burst_time",
+        "arrival_time",
+        "admitted_time",
+        "last_preempted",
+        "terminated_time",
+        "waiting_time",
+        "runtime",
+    )
+
+    def __init__(self):
+        self.pid = array("q")
+        self.burst_time = array("d")
+        self.arrival_time = array("d")
+        self.admitted_time = array("d")
+        self.last_preempted = array("d")
+        self.terminated_time = array("d")
+        self.waiting_time = array("d")
+        self.runtime = array("d")
+
+    @classmethod
+    def from_processes(cls, processes):
+        """Create a table from an iterable of `Process` objects."""
+        table = cls()
+        for process in processes:
+            table.append(process.pid, process.burst_time, process.arrival_time)
+        return table
+
+    def __len__(self):
+        return len(self.pid)
+
+    def copy(self):
+        """Return a copy of the table, e.g. to schedule the same
+        workload more than once."""
+        table = ProcessTable()
+        for name in self.columns:
+            setattr(table, name, getattr(self, name)[:])
+        return table
+
+    def append(self, pid, burst_time, arrival_time):
+        """Append a process that hasn't been admitted yet.
+
+        Returns
+        -------
+        row: int
+            The row of the new process.
+        """
+        self.pid.append(pid)
+        self.burst_time.append(math.nan if burst_time is None else burst_time)
+        self.arrival_time.append(arrival_time)
+        for column in (
+            self.admitted_time,
+            self.last_preempted,
+            self.terminated_time,
+            self.waiting_time,
+            self.runtime,
+        ):
+            column.append(math.nan)
+        return len(self.pid) - 1
+
+    def process(self, row):
+        """Materialize a `Process` object from a row of the table."""
+        burst_time = self.burst_time[row]
+        if math.isnan(burst_time):
+            burst_time = None
+        process = Process(self.pid[row], burst_time, self.arrival_time[row])
+        return self.update_process(row, process)
+
+    def update_process(self, row, process):
+        """Copy the book-keeping attributes of a row onto `process`."""
+        for name in self.columns[3:]:
+            value = getattr(self, name)[row]
+            setattr(process, name, None if math.isnan(value) else value)
+        return process
+
+
+class _ExactSum(object):
+    """A running sum of floats that supports removing terms, kept
+    exactly. Every finite float is a whole multiple of 2**-1074, so the
+    sum is an integer number of those units and adding and removing
+    millions of terms never loses a bit.
+    """
+
+    __slots__ = ("units",)
+
+    # Smallest exponent of a finite float.
+    SHIFT = 1074
+
+    def __init__(self):
+        self.units = 0
+
+    def add(self, value):
+        numerator, denominator = value.as_integer_ratio()
+        self.units += numerator << (self.SHIFT + 1 - denominator.bit_length())
+
+    def remove(self, value):
+        numerator, denominator = value.as_integer_ratio()
+        self.units -= numerator << (self.SHIFT + 1 - denominator.bit_length())
+
+    def value(self, count=1):
+        """The sum divided by `count`, correctly rounded to a float like
+        `statistics.mean` does."""
+        return self.units / (count << self.SHIFT)
+
+
+class BurstStatistics(object):
+    """Running aggregates over the burst times of the processes
+    in the ready queue.
+
+    The aggregates are updated as processes enter and leave the
+    ready queue so that each of the time quantum methods can be
+    computed in O(1) on every dispatch.
+
+    Parameters
+    ----------
+    burst_times: optional, iterable
+        Burst times to initialize the aggregates with.
+    """
+
+    __slots__ = ("count", "total", "reciprocal_total", "log_total", "zeros")
+
+    def __init__(self, burst_times=()):
+        self.clear()
+        for burst_time in burst_times:
+            self.add(burst_time)
+
+    def clear(self):
+        self.count = 0
+        self.total = _ExactSum()
+        self.reciprocal_total = _ExactSum()
+        self.log_total = _ExactSum()
+        # Number of processes with a zero burst time. Their reciprocal
+        # and logarithm are not defined, so we count them separately.
+        self.zeros = 0
+
+    def add(self, burst_time):
+        self.count += 1
+        self.total.add(burst_time)
+        if burst_time > 0:
+            self.reciprocal_total.add(1.0 / burst_time)
+            self.log_total.add(math.log(burst_time))
+        else:
+            self.zeros += 1
+
+    def remove(self, burst_time):
+        self.count -= 1
+        if self.count == 0:
+            # Start afresh once the queue drains.
+            self.clear()
+            return
+        self.total.remove(burst_time)
+        if burst_time > 0:
+            self.reciprocal_total.remove(1.0 / burst_time)
+            self.log_total.remove(math.log(burst_time))
+        else:
+            self.zeros -= 1
+
+    def time_quantum(self, method="Arithmetic", digits=1):
+        """Compute the time quantum using the running aggregates.
+
+        Parameters
+        ----------
+        method: str
+            One of "Arithmetic", "Geometric", "True Geometric" or "Harmonic".
+            "Geometric" is the square root of the sum of the burst times
+            as implemented in the first versions of this project and is
+            kept to reproduce old results. "True Geometric" is the
+            geometric mean of the burst times.
+
+        digits: optional, int
+            Number of decimal places to round the time quantum to.
+            `None` to not round it.
+
+        Returns
+        -------
+        time_quantum: float
+            The time quantum rounded to `digits` decimal places.
+        """
+        if method not in TIME_QUANTUM_METHODS:
+            raise ValueError(f"Unknown time quantum method: {method!r}")
+        if self.count == 0:
+            raise ValueError("Cannot compute the time quantum of an empty queue")
+        if method == "Arithmetic":
+            tq = self.total.value(self.count)
+        elif method == "Geometric":
+            tq = math.sqrt(self.total.value())
+        elif self.zeros:
+            # Any zero burst time pulls both the geometric
+            # and the harmonic mean down to zero.
+            tq = 0.0
+        elif method == "True Geometric":
+            tq = math.exp(self.log_total.value(self.count))
+        elif method == "Harmonic":
+            tq = 1.0 / self.reciprocal_total.value(self.count)
+        return tq if digits is None else round(tq, digits)
+
+
+def time_quantum(burst_times, method="Arithmetic"):
+    """Compute the dynamic time quantum of a ready queue.
+
+    Parameters
+    ----------
+    burst_times: list
+        Burst times of all the processes in the ready queue.
+
+    method: str
+        One of "Arithmetic", "Geometric", "True Geometric" or "Harmonic".
+
+    Returns
+    -------
+    time_quantum: float
+        The time quantum rounded to one decimal place.
+    """
+    return BurstStatistics(burst_times).time_quantum(method)
+
+
+class TimeGrid(object):
+    """Conversions between time units and integer ticks.
+
+    The simulations keep their clock, the slices the processes run for
+    and the time quanta as integer numbers of ticks, so preemption and
+    termination are exact comparisons between integers. Only the
+    times stored in the table and the events are in time units.
+
+    Parameters
+    ----------
+    resolution: optional, float
+        Length of a tick in time units, e.g. 0.001 for a millisecond grid
+        if a time unit is a second. One time unit must be a whole
+        number of ticks.
+    """
+
+    def __init__(self, resolution=TICK):
+        scale = round(1 / resolution) if resolution > 0 else 0
+        if scale < 1 or not math.isclose(scale * resolution, 1.0, rel_tol=1e-9):
+            raise ValueError(
+                f"A time unit must be a whole number of ticks, got {resolution}"
+            )
+        self.resolution = resolution
+        self.scale = scale
+        # Decimal grids round durations to their number of decimal
+        # places, like `round(t, 1)` on the default grid.
+        digits = math.log10(scale)
+        self.digits = round(digits) if math.isclose(digits, round(digits)) else None
+
+    def ceil(self, t):
+        """The first tick at or after the time `t`."""
+        return math.ceil(round(t * self.scale, 9))
+
+    def round(self, t):
+        """The duration `t` rounded to the nearest number of ticks."""
+        if self.digits is not None:
+            return round(round(t, self.digits) * self.scale)
+        return round(t * self.scale)
+
+    def time(self, ticks):
+        """The time of `ticks`, in time units."""
+        return ticks / self.scale
+
+
+GRID = TimeGrid()
+
+
+def to_grid(t):
+    """Round `t` up to the next instant on the `TICK` grid."""
+    return GRID.time(GRID.ceil(t))
+
+
+class ContextSwitchCost(object):
+    """The time it takes the CPU to switch from one process to another.
+
+    Parameters
+    ----------
+    overhead: optional, float
+        The (mean) time spent saving and restoring the state
+        of the processes on every context switch.
+
+    distribution: optional, str
+        How the overhead of each switch is drawn.
+         - "constant": always `overhead`.
+         - "uniform": uniformly between 0 and twice `overhead`.
+         - "exponential": exponentially with a mean of `overhead`.
+
+    warmup: optional, float
+        Extra time spent warming up the caches when a process that
+        was preempted earlier is resumed.
+
+    seed: optional, int
+        Seed of the random number generator used by
+        the "uniform" and "exponential" distributions.
+    """
+
+    def __init__(self, overhead=0.0, distribution="constant", warmup=0.0, seed=0):
+        if distribution not in SWITCH_COST_DISTRIBUTIONS:
+            raise ValueError(f"Unknown switch cost distribution: {distribution!r}")
+        if overhead < 0 or warmup < 0:
+            raise ValueError("The context switch costs can't be negative")
+        self.overhead = overhead
+        self.distribution = distribution
+        self.warmup = warmup
+        self.rng = random.Random(seed)
+
+    def sample(self, resumed):
+        """Draw the cost of a switch to a process.
+
+        Parameters
+        ----------
+        resumed: bool
+            Whether the process has already run before.
+
+        Returns
+        -------
+        overhead: float
+            The switch overhead. The simulation rounds it to its grid.
+
+        warmup: float
+            The cache warmup penalty. The simulation rounds it to its grid.
+        """
+        if self.distribution == "constant" or self.overhead == 0:
+            overhead = self.overhead
+        elif self.distribution == "uniform":
+            overhead = self.rng.uniform(0, 2 * self.overhead)
+        else:
+            overhead = self.rng.expovariate(1.0 / self.overhead)
+        warmup = self.warmup if resumed else 0.0
+        return overhead, warmup
+
+
+class BurstEstimator(object):
+    """Predict the burst time of processes by exponential averaging.
+
+    The prediction for the next burst of a key is::
+
+        prediction = alpha * observed + (1 - alpha) * prediction
+
+    where `observed` is the last burst time observed for that key. The
+    predictions are cached per key, which is the pid of the process
+    or the job class returned by `key`.
+
+    Parameters
+    ----------
+    alpha: optional, float
+        Weight of the last observed burst time, between 0 and 1.
+
+    initial: optional, float
+        Prediction for a key that hasn't been observed yet.
+
+    key: optional, callable
+        Maps the pid of a process to its job class. Defaults to the pid.
+
+    blind: optional, bool
+        If set, the time quantum is computed from the predicted burst
+        times of all the processes, even of the ones whose burst time
+        is known. The processes still run for their actual burst time.
+        This evaluates the time quantum methods as if the burst
+        times weren't known in advance.
+    """
+
+    def __init__(self, alpha=0.5, initial=5.0, key=None, blind=False):
+        if not 0 < alpha <= 1:
+            raise ValueError(f"alpha must be between 0 and 1, got {alpha}")
+        if initial <= 0:
+            raise ValueError(f"The initial prediction must be positive, got {initial}")
+        self.alpha = alpha
+        self.initial = initial
+        self.key = key
+        self.blind = blind
+        self.predictions = {}
+
+    def predict(self, pid):
+        """The predicted burst time of a process. The simulation
+        rounds it to its grid, to at least one tick."""
+        key = pid if self.key is None else self.key(pid)
+        return self.predictions.get(key, self.initial)
+
+    def observe(self, pid, burst_time):
+        """Update the prediction with the burst time of a terminated process."""
+        key = pid if self.key is None else self.key(pid)
+        prediction = self.predictions.get(key, self.initial)
+        self.predictions[key] = self.alpha * burst_time + (1 - self.alpha) * prediction
+
+    def forget(self, pids):
+        """Drop the predictions of `pids`, to bound the memory used by
+        long runs. Predictions per job class are shared by many pids,
+        so they are kept."""
+        if self.key is not None:
+            return
+        for pid in pids:
+            self.predictions.pop(pid, None)
+
+
+class RoundRobinSimulation(object):
+    """Discrete-event simulation of the dynamic Round Robin
+    scheduling algorithm.
+
+    The admitted, terminated and waiting times produced by the
+    simulation are the same as the ones produced by stepping the
+    clock through every tick like the animation does.
+
+    Parameters
+    ----------
+    processes: ProcessTable or iterable
+        The processes to schedule. A `ProcessTable` is scheduled in
+        place, any other iterable of `Process` objects is first copied
+        into a new table.
+
+    time_quantum_method: optional, str
+        One of "Arithmetic", "Geometric", "True Geometric" or "Harmonic".
+        Defaults to "Arithmetic".
+
+    time_quantum: optional, float
+        A fixed time quantum to use instead of the dynamic one.
+        If given, `time_quantum_method` is ignored.
+
+    context_switch_cost: optional, ContextSwitchCost
+        The cost of switching between processes. The CPU spends it
+        before the dispatched process starts running and it counts
+        towards the waiting time of the process. Switches are free
+        if not given.
+
+    burst_estimator: optional, BurstEstimator
+        Predicts the burst times that are not known (`nan` in the table).
+        Such a process is scheduled and runs for its predicted burst
+        time, which becomes its burst time when it terminates. The
+        actual burst times of the other processes update the
+        predictions as they terminate. Required if any burst
+        time isn't known.
+
+    resolution: optional, float
+        Length of a tick, the step of the simulated clock. Arrivals are
+        admitted at the next tick and the time quanta, burst times and
+        context switch costs are rounded to the nearest tick.
+
+    arrivals: optional, iterable
+        More processes, sorted by arrival time, that are read one at a
+        time as the clock reaches them instead of being loaded up front.
+        A process that arrives before the one read before it is admitted
+        late, like with `add_process`.
+    """
+
+    def __init__(
+        self,
+        processes,
+        time_quantum_method="Arithmetic",
+        time_quantum=None,
+        context_switch_cost=None,
+        burst_estimator=None,
+        resolution=TICK,
+        arrivals=None,
+    ):
+        if time_quantum_method not in TIME_QUANTUM_METHODS:
+            raise ValueError(f"Unknown time quantum method: {time_quantum_method!r}")
+        if time_quantum is not None and time_quantum <= 0:
+            raise ValueError(f"The time quantum must be positive, got {time_quantum}")
+        if not isinstance(processes, ProcessTable):
+            processes = ProcessTable.from_processes(processes)
+        self.table = processes
+        self.grid = TimeGrid(resolution)
+        self.time_quantum_method = time_quantum_method
+        # Rounded to the grid by `quantum_ticks`, like the dynamic one.
+        self.time_quantum = time_quantum
+
+        # The simulated clock, in ticks.
+        self.now = 0
+
+        # The ready queue is a deque of rows so that dispatching the
+        # process at its head and preempting it to its tail are both O(1).
+        self.tasks = deque()
+        self.burst_statistics = BurstStatistics()
+
+        # The processes in the table are admitted through a cursor over
+        # the rows sorted by arrival time. Traces usually come sorted
+        # already, in which case we don't need to sort at all.
+        arrival_time = self.table.arrival_time
+        if all(
+            arrival_time[i] <= arrival_time[i + 1] for i in range(len(arrival_time) - 1)
+        ):
+            self._arrival_order = range(len(arrival_time))
+        else:
+            self._arrival_order = array(
+                "q", sorted(range(len(arrival_time)), key=arrival_time.__getitem__)
+            )
+        self._cursor = 0
+
+        # Processes added while the simulation runs are kept in a heap
+        # keyed on their arrival time. The counter breaks ties between
+        # equal arrival times so processes are admitted in insertion order.
+        self._arrival_counter = itertools.count()
+        self.new_tasks = []
+
+        # Rows of the terminated processes in the order they terminated.
+        self.terminated_tasks = array("q")
+
+        self.context_switch_cost = context_switch_cost
+        self.context_switches = 0
+        self.switch_overhead_ticks = 0
+        self.warmup_overhead_ticks = 0
+        self._last_dispatched = None
+
+        # The burst times the processes in the ready queues are
+        # planned with, when they are predicted.
+        self.burst_estimator = burst_estimator
+        self._predicted_bursts = {}
+        if burst_estimator is None and any(map(math.isnan, self.table.burst_time)):
+            raise ValueError("Unknown burst times need a burst estimator")
+
+        # An `instrument.Instrumentation` timing the time quantum
+        # computations, set by `Instrumentation.instrument`.
+        self.instrumentation = None
+
+        # The last process read from `arrivals` stays in the heap of new
+        # tasks until it is admitted, so the heap always holds the next
+        # arrival and the rest of the iterable is read no earlier than
+        # the clock gets there.
+        self._arrivals = None
+        self._last_read = None
+        self.arrivals_read = 0
+        if arrivals is not None:
+            self.resume_arrivals(arrivals)
+
+    def __getstate__(self):
+        # The iterable of arrivals is left out of checkpoints. It is
+        # passed to `resume_arrivals` again after they are loaded.
+        state = self.__dict__.copy()
+        state["_arrivals"] = None
+        # Its hooks are usually closures, which can't be pickled.
+        state["instrumentation"] = None
+        # The counter itself can't be pickled on every version of Python.
+        state["_arrival_counter"] = next(self._arrival_counter)
+        self._arrival_counter = itertools.count(state["_arrival_counter"])
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._arrival_counter = itertools.count(state["_arrival_counter"])
+
+    @property
+    def time_elapsed(self):
+        """The simulated clock, in time units."""
+        return self.grid.time(self.now)
+
+    @time_elapsed.setter
+    def time_elapsed(self, time):
+        self.now = self.grid.ceil(time)
+
+    @property
+    def switch_overhead(self):
+        """Total time spent switching between processes."""
+        return self.grid.time(self.switch_overhead_ticks)
+
+    @property
+    def warmup_overhead(self):
+        """Part of `switch_overhead` spent warming up caches."""
+        return self.grid.time(self.warmup_overhead_ticks)
+
+    def add_process(self, process):
+        """Add a process to the arrival queue in O(log n). This may be
+        called while the simulation is running. A process whose arrival
+        time has already passed is admitted at the next event.
+
+        Returns
+        -------
+        row: int
+            The row of the process in `table`.
+        """
+        if process.burst_time is None and self.burst_estimator is None:
+            raise ValueError("Unknown burst times need a burst estimator")
+        row = self.table.append(process.pid, process.burst_time, process.arrival_time)
+        heapq.heappush(
+            self.new_tasks, (process.arrival_time, next(self._arrival_counter), row)
+        )
+        return row
+
+    def resume_arrivals(self, arrivals):
+        """Read the processes of `arrivals` lazily, skipping the
+        `arrivals_read` processes that were already read from it
+        before the simulation was checkpointed."""
+        self._arrivals = itertools.islice(iter(arrivals), self.arrivals_read, None)
+        if self._last_read is None:
+            self._read_arrival()
+
+    def _read_arrival(self):
+        for process in self._arrivals:
+            self.arrivals_read += 1
+            self._last_read = self.add_process(process)
+            return
+        self._arrivals = None
+        self._last_read = None
+
+    def has_pending_arrivals(self):
+        return self._cursor < len(self._arrival_order) or bool(self.new_tasks)
+
+    def next_arrival_time(self):
+        """Arrival time of the next process to be admitted, `None` if
+        every process has already been admitted."""
+        if self._cursor < len(self._arrival_order):
+            arrival_time = self.table.arrival_time[self._arrival_order[self._cursor]]
+            if self.new_tasks and self.new_tasks[0][0] < arrival_time:
+                return self.new_tasks[0][0]
+            return arrival_time
+        if self.new_tasks:
+            return self.new_tasks[0][0]
+        return None
+
+    def _pop_arrival(self):
+        # Rows loaded up front win ties over the ones added later on.
+        if self._cursor < len(self._arrival_order):
+            row = self._arrival_order[self._cursor]
+            if (
+                not self.new_tasks
+                or self.table.arrival_time[row] <= self.new_tasks[0][0]
+            ):
+                self._cursor += 1
+                return row
+        row = heapq.heappop(self.new_tasks)[2]
+        if row == self._last_read:
+            self._last_read = None
+            if self._arrivals is not None:
+                self._read_arrival()
+        return row
+
+    def charge_context_switch(self, row):
+        """Count a context switch to `row` and return the ticks it costs."""
+        self.context_switches += 1
+        if self.context_switch_cost is None:
+            return 0
+        overhead, warmup = self.context_switch_cost.sample(self.table.runtime[row] > 0)
+        overhead = self.grid.round(overhead)
+        warmup = self.grid.round(warmup)
+        self.switch_overhead_ticks += overhead + warmup
+        self.warmup_overhead_ticks += warmup
+        return overhead + warmup
+
+    def planned_burst(self, row):
+        """The burst time the scheduler plans `row` with: its burst
+        time, or its predicted burst time if it isn't known (or if the
+        estimator is blind). A prediction is made once per process."""
+        burst_time = self.table.burst_time[row]
+        estimator = self.burst_estimator
+        if estimator is None:
+            return burst_time
+        predicted = self._predicted_bursts.get(row)
+        if predicted is None:
+            if not estimator.blind and not math.isnan(burst_time):
+                return burst_time
+            predicted = estimator.predict(self.table.pid[row])
+            predicted = self.grid.time(max(self.grid.round(predicted), 1))
+            self._predicted_bursts[row] = predicted
+        return predicted
+
+    def burst_terminated(self, row):
+        """Record the burst time of a terminated process."""
+        if self.burst_estimator is None:
+            return
+        self._predicted_bursts.pop(row, None)
+        burst_time = self.table.burst_time[row]
+        if math.isnan(burst_time):
+            self.table.burst_time[row] = self.table.runtime[row]
+        else:
+            self.burst_estimator.observe(self.table.pid[row], burst_time)
+
+    def remaining_ticks(self, row, planned_burst):
+        """The ticks `row` has left to run. A process whose burst time
+        isn't known runs for its predicted burst time."""
+        burst_time = self.table.burst_time[row]
+        if math.isnan(burst_time):
+            burst_time = planned_burst
+        return self.grid.round(burst_time) - self.grid.round(self.table.runtime[row])
+
+    def get_time_quantum(self, statistics=None):
+        """The time quantum of the ready queue whose burst times
+        are summarized by `statistics` (by default, the only one),
+        before it is rounded to the grid."""
+        if self.time_quantum is not None:
+            return self.time_quantum
+        if statistics is None:
+            statistics = self.burst_statistics
+        return statistics.time_quantum(self.time_quantum_method, digits=None)
+
+    def quantum_ticks(self, statistics=None, time_quantum=None):
+        """The time quantum rounded to the nearest tick, in ticks. A
+        quantum that rounds down to zero would never let the process
+        make progress, so it is a tick at least.
+
+        Every engine converts its quanta here, so that the same quantum
+        lands on the same tick whichever engine runs it.
+
+        Parameters
+        ----------
+        statistics: optional, BurstStatistics
+            The ready queue to compute the time quantum of, as in
+            `get_time_quantum`.
+
+        time_quantum: optional, float
+            A time quantum to convert instead, e.g. the one chosen
+            by a policy.
+        """
+        if time_quantum is None:
+            if self.instrumentation is None:
+                time_quantum = self.get_time_quantum(statistics)
+            else:
+                # Timed inline, this runs on every dispatch.
+                start = perf_counter()
+                time_quantum = self.get_time_quantum(statistics)
+                self.instrumentation.add("quantum", perf_counter() - start)
+        return max(self.grid.round(time_quantum), 1)
+
+    def get_new_tasks(self, until, inclusive=True):
+        """Admit the processes that arrive before the tick `until` into
+        the ready queue. The processes arriving exactly at `until`
+        are only admitted if `inclusive` is set.
+
+        A process is admitted at the first tick at or after its
+        arrival and an `ADMIT` event is yielded for each
+        admitted process.
+        """
+        table = self.table
+        grid = self.grid
+        while True:
+            arrival_time = self.next_arrival_time()
+            if arrival_time is None:
+                break
+            admitted = max(grid.ceil(arrival_time), self.now)
+            if admitted > until or (admitted == until and not inclusive):
+                break
+            admitted_time = grid.time(admitted)
+            row = self._pop_arrival()
+            table.last_preempted[row] = admitted_time
+            table.waiting_time[row] = admitted_time - arrival_time
+            table.admitted_time[row] = admitted_time
+            table.runtime[row] = 0.0
+            core = self._enqueue(row)
+            yield Event(admitted_time, ADMIT, row, None, core)
+
+    def _enqueue(self, row):
+        """Put a newly admitted process in the ready queue. Returns the
+        CPU the process was placed on, `None` for a single CPU."""
+        self.tasks.append(row)
+        self.burst_statistics.add(self.planned_burst(row))
+
+    def events(self):
+        """Run the simulation, yielding every scheduling `Event`
+        in the order in which it happens.
+
+        A process whose remaining burst fits in the time quantum runs
+        to termination, else it runs for one quantum and is preempted
+        to the back of the ready queue. Processes arriving while
+        another one runs are queued ahead of the preempted process,
+        except the ones arriving at the very instant of the preemption.
+        """
+        table = self.table
+        grid = self.grid
+        while self.tasks or self.has_pending_arrivals():
+            yield from self.get_new_tasks(self.now)
+            if not self.tasks:
+                # Nothing to run. Jump straight to the next arrival.
+                yield Event(grid.time(self.now), IDLE, None, None)
+                self.now = grid.ceil(self.next_arrival_time())
+                continue
+
+            quantum = self.quantum_ticks()
+            row = self.tasks.popleft()
+            planned_burst = self.planned_burst(row)
+            self.burst_statistics.remove(planned_burst)
+
+            # Resuming the process that was just preempted,
+            # with nothing in between, is not a context switch.
+            start = self.now
+            if row != self._last_dispatched:
+                start += self.charge_context_switch(row)
+            self._last_dispatched = row
+            table.waiting_time[row] += grid.time(start) - table.last_preempted[row]
+            yield Event(grid.time(self.now), DISPATCH, row, grid.time(quantum))
+
+            remaining = self.remaining_ticks(row, planned_burst)
+            terminated = remaining <= quantum
+            runtime = remaining if terminated else quantum
+            finish = start + runtime
+            yield from self.get_new_tasks(finish, inclusive=False)
+
+            self.now = finish
+            finish_time = grid.time(finish)
+            table.runtime[row] = grid.time(grid.round(table.runtime[row]) + runtime)
+            table.last_preempted[row] = finish_time
+            if terminated:
+                table.terminated_time[row] = finish_time
+                self.terminated_tasks.append(row)
+                self.burst_terminated(row)
+                yield Event(finish_time, TERMINATE, row, None)
+            else:
+                self.tasks.append(row)
+                self.burst_statistics.add(planned_burst)
+                yield Event(finish_time, PREEMPT, row, None)
+
+    def compact(self):
+        """Evict the terminated processes from the table to free memory.
+
+        The other processes are renumbered, so the rows of the events
+        yielded so far and of `terminated_tasks` are no longer valid.
+        `terminated_tasks` is emptied. Save the results of the
+        terminated processes before.
+
+        The simulation can be compacted between the events it yields,
+        except between a `DISPATCH` event and the event that ends it.
+
+        The burst estimator forgets the predictions of the pids that
+        were evicted and have no process left in the system. A pid that
+        arrives again later is predicted afresh.
+
+        Returns
+        -------
+        evicted: int
+            The number of processes evicted.
+        """
+        table = self.table
+        keep = [
+            row for row in range(len(table)) if math.isnan(table.terminated_time[row])
+        ]
+        evicted = len(table) - len(keep)
+        if not evicted:
+            return 0
+        if self.burst_estimator is not None:
+            live = set(map(table.pid.__getitem__, keep))
+            self.burst_estimator.forget(
+                pid for pid in set(table.pid) if pid not in live
+            )
+        new_row = dict(zip(keep, range(len(keep))))
+        # The columns are updated in place, as running
+        # event generators hold on to the table.
+        for name in table.columns:
+            column = getattr(table, name)
+            column[:] = array(column.typecode, map(column.__getitem__, keep))
+        self.tasks = deque(map(new_row.__getitem__, self.tasks))
+        # Renumbering doesn't change the keys, so the heap stays a heap.
+        self.new_tasks = [
+            (arrival_time, counter, new_row[row])
+            for arrival_time, counter, row in self.new_tasks
+        ]
+        self._arrival_order = array(
+            "q", map(new_row.__getitem__, self._arrival_order[self._cursor :])
+        )
+        self._cursor = 0
+        self._predicted_bursts = {
+            new_row[row]: burst for row, burst in self._predicted_bursts.items()
+        }
+        self._last_dispatched = new_row.get(self._last_dispatched)
+        self._last_read = new_row.get(self._last_read)
+        del self.terminated_tasks[:]
+        return evicted
+
+    def run(self):
+        """Run the simulation to completion.
+
+        Returns
+        -------
+        terminated_tasks: array
+            The rows of the processes in the order in which they terminated.
+        """
+        for _ in self.events():
+            pass
+        return self.terminated_tasks
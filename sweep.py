@@ -0,0 +1,389 @@
+# MIT License
+
+# Copyright (c) 2020 Tirth Patel & Tirth Hihoriya
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Parameter sweeps over workloads and time quantum methods.
+
+Every combination of a workload with a time quantum method (or a
+fixed time quantum) is an independent simulation, so the sweep fans
+them out over a pool of processes and collects the metrics of each
+one into a comparison table.
+
+Usage::
+
+    python sweep.py trace1.csv trace2.jsonl --quanta 2 5 --workers 8
+"""
+
+import argparse
+import copy
+import csv
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from cache import ResultCache
+from metrics import calculate_metrics
+from scheduler import (
+    SWITCH_COST_DISTRIBUTIONS,
+    TICK,
+    TIME_QUANTUM_METHODS,
+    BurstEstimator,
+    ContextSwitchCost,
+    ProcessTable,
+    RoundRobinSimulation,
+)
+from workload import load_workload
+
+SWEEP_COLUMNS = (
+    "workload",
+    "method",
+    "time_quantum",
+    "processes",
+    "skipped",
+    "throughput",
+    "avg_waiting_time",
+    "avg_turnaround_time",
+    "context_switches",
+    "switch_overhead",
+)
+
+
+def run_cell(
+    workload,
+    method,
+    time_quantum=None,
+    name=None,
+    context_switch_cost=None,
+    burst_estimator=None,
+    resolution=TICK,
+    cache=None,
+):
+    """Run one cell of a sweep.
+
+    Parameters
+    ----------
+    workload: str or ProcessTable
+        Path of a workload file or a table of processes. The
+        table is copied, so it can be shared between cells.
+
+    method: str
+        The time quantum method. Ignored if `time_quantum` is given.
+
+    time_quantum: optional, float
+        A fixed time quantum.
+
+    name: optional, str
+        Name of the workload in the results. Defaults to the path
+        of the workload file.
+
+    context_switch_cost: optional, ContextSwitchCost
+        The cost of a context switch. Switches are free if not given.
+
+    burst_estimator: optional, BurstEstimator
+        Predicts the burst times, e.g. a blind one to compute the time
+        quanta as if the burst times weren't known. If not given, a
+        default one predicts the burst times that aren't known.
+
+    resolution: optional, float
+        Length of a tick of the simulated clock.
+
+    cache: optional, cache.ResultCache
+        Cache of the results. A cell that was run before with the same
+        processes and parameters isn't run again.
+
+    Returns
+    -------
+    result: dict
+        The `SWEEP_COLUMNS` of the cell.
+    """
+    if isinstance(workload, ProcessTable):
+        table, errors = workload.copy(), []
+    else:
+        table, errors = load_workload(workload)
+        if name is None:
+            name = workload
+    if burst_estimator is None and any(map(math.isnan, table.burst_time)):
+        burst_estimator = BurstEstimator()
+    if cache is not None:
+        result = cache.run(
+            table,
+            method,
+            time_quantum,
+            context_switch_cost,
+            burst_estimator,
+            resolution,
+        )
+        metrics = result.metrics
+        context_switches = result.context_switches
+        switch_overhead = result.switch_overhead
+    else:
+        # Both are stateful, so each cell runs on its own copy.
+        simulation = RoundRobinSimulation(
+            table,
+            time_quantum_method=method,
+            time_quantum=time_quantum,
+            context_switch_cost=copy.deepcopy(context_switch_cost),
+            burst_estimator=copy.deepcopy(burst_estimator),
+            resolution=resolution,
+        )
+        rows = simulation.run()
+        metrics = calculate_metrics(table, rows)
+        context_switches = simulation.context_switches
+        switch_overhead = simulation.switch_overhead
+    return {
+        "workload": name,
+        "method": "Fixed" if time_quantum is not None else method,
+        "time_quantum": time_quantum,
+        "processes": metrics["count"],
+        "skipped": len(errors),
+        "throughput": metrics["throughput"],
+        "avg_waiting_time": metrics["avg_waiting_time"],
+        "avg_turnaround_time": metrics["avg_turnaround_time"],
+        "context_switches": context_switches,
+        "switch_overhead": switch_overhead,
+    }
+
+
+def _run_cell(cell):
+    return run_cell(*cell)
+
+
+def sweep(
+    workloads,
+    methods=TIME_QUANTUM_METHODS,
+    quanta=(),
+    max_workers=None,
+    context_switch_cost=None,
+    burst_estimator=None,
+    resolution=TICK,
+    cache=None,
+):
+    """Run every workload with every time quantum method and
+    every fixed time quantum.
+
+    Parameters
+    ----------
+    workloads: iterable
+        Paths of workload files, `ProcessTable` objects, or
+        `(name, ProcessTable)` pairs.
+
+    methods: optional, iterable
+        The time quantum methods to run. Defaults to all of them.
+
+    quanta: optional, iterable
+        Fixed time quanta to run on top of the dynamic methods.
+
+    max_workers: optional, int
+        Number of worker processes. Defaults to the number of CPUs.
+        With `max_workers=1` the cells are run in this process.
+
+    context_switch_cost: optional, ContextSwitchCost
+        The cost of a context switch. Every cell starts from a copy
+        of it, so random switch costs are the same in every cell.
+
+    burst_estimator: optional, BurstEstimator
+        Predicts the burst times. Every cell starts from a copy of it.
+
+    resolution: optional, float
+        Length of a tick of the simulated clock.
+
+    cache: optional, cache.ResultCache
+        Cache of the results. Worker processes share the
+        cache directory, but not the results kept in memory.
+
+    Returns
+    -------
+    results: list
+        One dict with the `SWEEP_COLUMNS` per cell, workload by
+        workload, in the order the methods and quanta were given.
+    """
+    cells = []
+    for index, workload in enumerate(workloads):
+        if isinstance(workload, tuple):
+            name, workload = workload
+        elif isinstance(workload, ProcessTable):
+            name = f"workload-{index}"
+        else:
+            name = workload
+        for method in methods:
+            cells.append(
+                (
+                    workload,
+                    method,
+                    None,
+                    name,
+                    context_switch_cost,
+                    burst_estimator,
+                    resolution,
+                    cache,
+                )
+            )
+        for time_quantum in quanta:
+            cells.append(
+                (
+                    workload,
+                    TIME_QUANTUM_METHODS[0],
+                    time_quantum,
+                    name,
+                    context_switch_cost,
+                    burst_estimator,
+                    resolution,
+                    cache,
+                )
+            )
+
+    if max_workers == 1 or len(cells) <= 1:
+        return [_run_cell(cell) for cell in cells]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_run_cell, cells))
+
+
+def format_table(results):
+    """Format the results of a sweep as a plain text table."""
+    header = (
+        "workload",
+        "method",
+        "quantum",
+        "processes",
+        "throughput",
+        "avg. waiting",
+        "avg. turnaround",
+        "switches",
+        "overhead",
+    )
+    lines = [
+        (
+            str(result["workload"]),
+            result["method"],
+            "" if result["time_quantum"] is None else f"{result['time_quantum']:g}",
+            str(result["processes"]),
+            f"{result['throughput']:.4f}",
+            f"{result['avg_waiting_time']:.4f}",
+            f"{result['avg_turnaround_time']:.4f}",
+            str(result["context_switches"]),
+            f"{result['switch_overhead']:.1f}",
+        )
+        for result in results
+    ]
+    widths = [max(len(row[i]) for row in [header] + lines) for i in range(len(header))]
+    return "\n".join(
+        "  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+        for row in [header] + lines
+    )
+
+
+def save_sweep(filename, results):
+    with open(filename, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SWEEP_COLUMNS)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare time quantum methods over many workloads."
+    )
+    parser.add_argument("workloads", nargs="+", help="CSV or JSON lines workloads")
+    parser.add_argument(
+        "--methods",
+        nargs="*",
+        default=list(TIME_QUANTUM_METHODS),
+        choices=TIME_QUANTUM_METHODS,
+        help="time quantum methods to run (default: all)",
+    )
+    parser.add_argument(
+        "--quanta",
+        nargs="*",
+        type=float,
+        default=[],
+        help="fixed time quanta to run as well",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--switch-overhead",
+        type=float,
+        default=0.0,
+        help="(mean) time to switch between processes (default: 0)",
+    )
+    parser.add_argument(
+        "--switch-distribution",
+        choices=SWITCH_COST_DISTRIBUTIONS,
+        default="constant",
+        help="distribution of the switch overhead (default: constant)",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=float,
+        default=0.0,
+        help="cache warmup penalty when resuming a preempted process",
+    )
+    parser.add_argument(
+        "--predict-bursts",
+        type=float,
+        metavar="ALPHA",
+        help="compute the time quanta from burst times predicted by "
+        "exponential averaging with this weight, as if they weren't known",
+    )
+    parser.add_argument(
+        "--resolution",
+        type=float,
+        default=TICK,
+        help=f"length of a tick of the simulated clock (default: {TICK})",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="DIRECTORY",
+        help="reuse the results of cells that were run before from this directory",
+    )
+    parser.add_argument("--output", help="also write the results to this CSV file")
+    args = parser.parse_args(argv)
+
+    context_switch_cost = None
+    if args.switch_overhead or args.warmup:
+        context_switch_cost = ContextSwitchCost(
+            args.switch_overhead, args.switch_distribution, args.warmup
+        )
+    burst_estimator = None
+    if args.predict_bursts is not None:
+        burst_estimator = BurstEstimator(args.predict_bursts, blind=True)
+    results = sweep(
+        args.workloads,
+        args.methods,
+        args.quanta,
+        max_workers=args.workers,
+        context_switch_cost=context_switch_cost,
+        burst_estimator=burst_estimator,
+        resolution=args.resolution,
+        cache=args.cache and ResultCache(args.cache),
+    )
+    print(format_table(results))
+    if args.output:
+        save_sweep(args.output, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+import csv
+
+import pytest
+
+from workload import generate_workload
+
+
+@pytest.fixture
+def unknown_bursts(tmp_path):
+    """A CSV workload where the burst time of every third process is empty."""
+    table = generate_workload(100, seed=30)
+    filename = tmp_path / "unknown_bursts.csv"
+    with open(filename, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("pid", "burst_time", "arrival_time"))
+        for pid, burst_time, arrival_time in zip(
+            table.pid, table.burst_time, table.arrival_time
+        ):
+            writer.writerow((pid, "" if pid % 3 == 0 else burst_time, arrival_time))
+    return str(filename)
@@ -0,0 +1,80 @@
+import json
+import math
+
+import pytest
+
+import benchmark
+from scheduler import TIME_QUANTUM_METHODS
+from workload import ARRIVAL_PATTERNS, BURST_DISTRIBUTIONS, generate_workload
+
+
+def test_run_benchmarks_measures_every_phase():
+    workloads = [("poisson", "pareto"), ("zero", "uniform")]
+    results = benchmark.run_benchmarks((50, 120), workloads, ("Harmonic",))
+    assert [(r["benchmark"], r["size"], r["arrivals"]) for r in results] == [
+        (name, size, arrivals)
+        for size in (50, 120)
+        for arrivals, _ in workloads
+        for name in ("generate", "dispatch", "quantum", "metrics", "export")
+    ]
+    for result in results:
+        assert result["seconds"] >= 0
+        assert result["method"] == (
+            "Harmonic" if result["benchmark"] in ("dispatch", "quantum") else None
+        )
+    quantum = [r for r in results if r["benchmark"] == "quantum"]
+    assert all(r["ops_per_second"] is None or r["ops_per_second"] > 0 for r in quantum)
+
+
+def test_dispatch_counts_the_events_of_a_full_run():
+    table = generate_workload(200, seed=25)
+    _, events, simulation = benchmark.bench_dispatch(table, "Arithmetic")
+    # Every process is admitted, dispatched and terminated at least once.
+    assert events >= 3 * len(table)
+    assert len(simulation.terminated_tasks) == len(table)
+    # The benchmark runs on a copy.
+    assert all(map(math.isnan, table.terminated_time))
+
+
+def test_main_writes_a_json_report(tmp_path):
+    output = tmp_path / "bench.json"
+    benchmark.main(
+        [
+            "--sizes",
+            "40",
+            "--arrivals",
+            "batch",
+            "--bursts",
+            "lognormal",
+            "--label",
+            "smoke",
+            "--output",
+            str(output),
+        ]
+    )
+    with open(output) as f:
+        report = json.load(f)
+    assert report["label"] == "smoke"
+    assert {r["method"] for r in report["results"]} == {None} | set(
+        TIME_QUANTUM_METHODS
+    )
+
+
+@pytest.mark.parametrize("bursts", BURST_DISTRIBUTIONS)
+@pytest.mark.parametrize("arrivals", ARRIVAL_PATTERNS)
+def test_generated_workloads_follow_their_pattern(arrivals, bursts):
+    table = generate_workload(1000, arrivals, bursts, seed=26, batch_size=50)
+    assert list(table.pid) == list(range(1000))
+    assert min(table.burst_time) >= 0.1
+    assert sum(table.burst_time) / len(table) == pytest.approx(5.0, rel=0.25)
+    distinct = len(set(table.arrival_time))
+    if arrivals == "zero":
+        assert set(table.arrival_time) == {0.0}
+    elif arrivals == "batch":
+        assert distinct <= 1000 // 50
+        assert all(
+            len(set(table.arrival_time[start : start + 50])) == 1
+            for start in range(0, 1000, 50)
+        )
+    else:
+        assert distinct > 900
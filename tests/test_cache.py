@@ -0,0 +1,101 @@
+import math
+import os
+
+import pytest
+
+from cache import EXTENSION, ResultCache, cache_key
+from metrics import calculate_metrics, result_rows
+from scheduler import BurstEstimator, ContextSwitchCost, RoundRobinSimulation
+from workload import generate_workload
+
+
+@pytest.fixture
+def table():
+    return generate_workload(200, seed=13)
+
+
+def test_cached_run_matches_simulation(table):
+    cache = ResultCache()
+    result = cache.run(table, "Harmonic", context_switch_cost=ContextSwitchCost(0.1))
+    simulation = RoundRobinSimulation(
+        table.copy(), "Harmonic", context_switch_cost=ContextSwitchCost(0.1)
+    )
+    rows = simulation.run()
+    assert list(result.rows()) == list(result_rows(simulation.table, rows))
+    assert result.metrics == calculate_metrics(simulation.table, rows)
+    assert result.context_switches == simulation.context_switches
+    assert result.switch_overhead == simulation.switch_overhead
+    # Neither the table nor the arguments are used up.
+    assert all(map(math.isnan, table.terminated_time))
+    again = cache.run(table, "Harmonic", context_switch_cost=ContextSwitchCost(0.1))
+    assert again is result
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_depends_on_every_input(table):
+    key = cache_key(table, "Arithmetic")
+    assert cache_key(table.copy(), "Arithmetic") == key
+    keys = {key}
+    for column in ("pid", "burst_time", "arrival_time"):
+        changed = table.copy()
+        getattr(changed, column)[17] += 1
+        keys.add(cache_key(changed, "Arithmetic"))
+    shorter = generate_workload(199, seed=13)
+    keys.add(cache_key(shorter, "Arithmetic"))
+    keys.add(cache_key(table, "Harmonic"))
+    for parameters in (
+        {"time_quantum": 2.0},
+        {"time_quantum": 2.5},
+        {"resolution": 0.01},
+        {"context_switch_cost": ContextSwitchCost(0.1)},
+        {"context_switch_cost": ContextSwitchCost(0.2)},
+        {"context_switch_cost": ContextSwitchCost(0.1, "exponential", seed=1)},
+        {"context_switch_cost": ContextSwitchCost(0.1, "exponential", seed=2)},
+        {"burst_estimator": BurstEstimator(0.5)},
+        {"burst_estimator": BurstEstimator(0.6)},
+        {"burst_estimator": BurstEstimator(0.5, blind=True)},
+    ):
+        keys.add(cache_key(table, "Arithmetic", **parameters))
+    assert len(keys) == 16
+
+
+def test_results_are_shared_through_the_directory(tmp_path, table):
+    result = ResultCache(tmp_path).run(table, "Arithmetic")
+    other = ResultCache(tmp_path)
+    assert other.run(table, "Arithmetic") == result
+    assert (other.hits, other.misses) == (1, 0)
+
+    # A truncated file is a miss, not an error.
+    (path,) = tmp_path.glob("*" + EXTENSION)
+    path.write_bytes(path.read_bytes()[:10])
+    third = ResultCache(tmp_path)
+    assert third.run(table, "Arithmetic") == result
+    assert (third.hits, third.misses) == (0, 1)
+
+
+def test_memory_keeps_the_most_recently_used(table):
+    cache = ResultCache(max_entries=2)
+    for method in ("Arithmetic", "Harmonic", "Arithmetic", "Geometric"):
+        cache.run(table, method)
+    assert cache.hits == 1
+    assert len(cache.memory) == 2
+    cache.run(table, "Harmonic")
+    assert cache.misses == 4
+
+
+def test_directory_is_trimmed_to_its_size_cap(tmp_path, table):
+    cache = ResultCache(tmp_path, max_entries=0)
+    cache.run(table, "Arithmetic")
+    (first,) = tmp_path.glob("*" + EXTENSION)
+    size = first.stat().st_size
+    # Two files fit. Using a file makes it the most recently used one.
+    cache.max_bytes = 2 * size + size // 2
+    os.utime(first, (1, 1))
+    cache.run(table, "Harmonic")
+    second = next(path for path in tmp_path.glob("*" + EXTENSION) if path != first)
+    os.utime(second, (2, 2))
+    cache.run(table, "Arithmetic")
+    cache.run(table, "True Geometric")
+    remaining = set(tmp_path.glob("*" + EXTENSION))
+    assert len(remaining) == 2
+    assert first in remaining and second not in remaining
@@ -0,0 +1,150 @@
+import csv
+import json
+import random
+
+import pytest
+
+import roundrobin
+from checkpoint import Checkpointer, load_checkpoint
+from metrics import result_rows
+from multicore import MultiCoreSimulation
+from policies import PolicySimulation, RoundRobin
+from scheduler import (
+    BurstEstimator,
+    ContextSwitchCost,
+    RoundRobinSimulation,
+)
+from workload import generate_workload
+
+
+@pytest.fixture(scope="module")
+def processes():
+    table = generate_workload(1500, seed=15)
+    processes = [table.process(row) for row in range(len(table))]
+    for process in processes[::13]:
+        process.burst_time = None
+    return processes
+
+
+def parameters():
+    return dict(
+        time_quantum_method="Harmonic",
+        context_switch_cost=ContextSwitchCost(0.3, "uniform", 0.1, seed=2),
+        burst_estimator=BurstEstimator(0.4),
+    )
+
+
+def expected_results(processes):
+    simulation = RoundRobinSimulation(processes, **parameters())
+    rows = simulation.run()
+    return [tuple(map(str, row)) for row in result_rows(simulation.table, rows)]
+
+
+def read_results(filename):
+    with open(filename, newline="") as f:
+        return [tuple(row) for row in csv.reader(f)][1:]
+
+
+def test_streaming_matches_in_memory_run(tmp_path, processes):
+    results = str(tmp_path / "results.csv")
+    simulation = RoundRobinSimulation([], arrivals=iter(processes), **parameters())
+    largest = 0
+    with Checkpointer(simulation, None, results=results, batch_size=50) as checkpointer:
+        for _ in checkpointer.record(simulation.events()):
+            largest = max(largest, len(simulation.table))
+            # Only the pids in the system keep a prediction.
+            assert len(simulation.burst_estimator.predictions) <= len(simulation.table)
+            # Neither do the terminations outside of the throughput window.
+            assert len(checkpointer.metrics.terminations) <= 1000
+    assert read_results(results) == expected_results(processes)
+    assert checkpointer.metrics.count == len(processes)
+    assert largest < len(processes) // 4
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_resume_after_crashes(tmp_path, processes, seed):
+    rng = random.Random(seed)
+    filename = str(tmp_path / "run.checkpoint")
+    results = str(tmp_path / "results.csv")
+    simulation = RoundRobinSimulation([], arrivals=iter(processes), **parameters())
+    checkpointer = Checkpointer(
+        simulation, filename, interval=0.0, results=results, batch_size=7
+    )
+    crashes = 0
+    while True:
+        events = checkpointer.record(checkpointer.simulation.events())
+        stop = rng.randrange(100, 2000)
+        for i, _ in enumerate(events):
+            if i == stop:
+                break
+        else:
+            checkpointer.close()
+            break
+        # Crash without closing, then start over from the last checkpoint.
+        checkpointer.results.close()
+        crashes += 1
+        checkpointer = Checkpointer.resume(
+            filename,
+            arrivals=iter(processes),
+            results=results,
+            interval=0.0,
+            batch_size=rng.choice([1, 7, 100]),
+        )
+    assert crashes > 0
+    assert read_results(results) == expected_results(processes)
+    assert checkpointer.metrics.count == len(processes)
+
+
+def test_simulations_that_cant_be_compacted(processes):
+    known = [process for process in processes if process.burst_time is not None]
+    for simulation in (
+        MultiCoreSimulation(known[:50]),
+        PolicySimulation(known[:50], RoundRobin()),
+    ):
+        with pytest.raises(TypeError, match="only support RoundRobinSimulation"):
+            simulation.compact()
+
+
+def test_cli_resumes_without_reloading_the_workload(
+    tmp_path, capsys, monkeypatch, processes
+):
+    workload = tmp_path / "trace.jsonl"
+    workload.write_text(
+        "".join(
+            json.dumps(
+                {
+                    "pid": p.pid,
+                    "burst_time": p.burst_time,
+                    "arrival_time": p.arrival_time,
+                }
+            )
+            + "\n"
+            for p in processes
+        )
+    )
+    checkpoint = str(tmp_path / "run.checkpoint")
+    args = [str(workload), "--checkpoint", checkpoint]
+    roundrobin.main(args)
+    expected = json.loads(capsys.readouterr().out)
+    # Only unknown burst times are predicted.
+    assert load_checkpoint(checkpoint)["simulation"].burst_estimator is not None
+
+    def load_workload(*args, **kwargs):
+        raise AssertionError("the workload was loaded again")
+
+    monkeypatch.setattr(roundrobin, "load_workload", load_workload)
+    roundrobin.main(args + ["--resume"])
+    assert json.loads(capsys.readouterr().out) == expected
+
+
+def test_cli_attaches_an_estimator_only_for_unknown_bursts(tmp_path, capsys):
+    table = generate_workload(100, seed=16)
+    workload = tmp_path / "trace.csv"
+    with open(workload, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("pid", "burst_time", "arrival_time"))
+        writer.writerows(zip(table.pid, table.burst_time, table.arrival_time))
+    checkpoint = str(tmp_path / "run.checkpoint")
+    roundrobin.main([str(workload), "--checkpoint", checkpoint])
+    capsys.readouterr()
+    assert load_checkpoint(checkpoint)["simulation"].burst_estimator is None
@@ -0,0 +1,111 @@
+import random
+from bisect import bisect_left, bisect_right
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+from graphing import MERGED, IntervalPyramid, ScheduleData, SeriesPyramid  # noqa: E402
+from multicore import MultiCoreSimulation  # noqa: E402
+from workload import generate_workload  # noqa: E402
+
+
+def build_interval_levels(starts, ends, owners, base):
+    # Merges every level from scratch, like the pyramid did before
+    # it was extended incrementally.
+    levels = [list(zip(starts, ends, owners))]
+    gap = base
+    while len(levels[-1]) > 1:
+        merged = []
+        for start, end, owner in levels[-1]:
+            if (
+                merged
+                and start - merged[-1][1] < gap
+                and (
+                    owner == merged[-1][2]
+                    or end - start < gap
+                    or merged[-1][1] - merged[-1][0] < gap
+                )
+            ):
+                merged[-1][1] = max(merged[-1][1], end)
+                if merged[-1][2] != owner:
+                    merged[-1][2] = MERGED
+            else:
+                merged.append([start, end, owner])
+        levels.append([tuple(interval) for interval in merged])
+        gap *= 2
+    return levels
+
+
+def build_series_levels(values):
+    levels = [(values, values)]
+    while len(levels[-1][0]) > 1:
+        lows, highs = levels[-1]
+        levels.append(
+            (
+                [min(lows[i : i + 2]) for i in range(0, len(lows), 2)],
+                [max(highs[i : i + 2]) for i in range(0, len(highs), 2)],
+            )
+        )
+    return levels
+
+
+def random_slices(rng, count):
+    time = 0.0
+    for _ in range(count):
+        time += rng.choice([0.0, 0.0, 0.1, 0.3, 2.0, 9.0])
+        length = rng.choice([0.1, 0.2, 0.5, 1.0, 4.0, 30.0])
+        yield time, time + length, rng.randrange(6)
+        time += length
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_interval_pyramid_matches_full_build(seed):
+    rng = random.Random(seed)
+    pyramid = IntervalPyramid(base=0.1)
+    slices = []
+    for start, end, owner in random_slices(rng, 600):
+        pyramid.append(start, end, owner)
+        slices.append((start, end, owner))
+        if rng.random() < 0.1 or len(slices) < 20:
+            expected = build_interval_levels(*zip(*slices), base=0.1)
+            span = slices[-1][1]
+            for pixels in (1, 7, 50, 800, 10**6):
+                lo, hi = rng.uniform(0, span), rng.uniform(0, span)
+                lo, hi = min(lo, hi), max(lo, hi)
+                level = pyramid.level_for((hi - lo) / pixels)
+                intervals = expected[level]
+                first = bisect_left([i[1] for i in intervals], lo)
+                last = bisect_right([i[0] for i in intervals], hi)
+                assert pyramid.view(lo, hi, pixels) == intervals[first:last]
+            assert len(pyramid._levels()) == len(expected)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 8, 9, 100, 1025])
+def test_series_pyramid_matches_full_build(size):
+    rng = random.Random(size)
+    pyramid = SeriesPyramid()
+    values = []
+    for i in range(size):
+        values.append(float(rng.randrange(50)))
+        pyramid.append(float(i), values[-1])
+    expected = build_series_levels(values)
+    assert len(pyramid.levels) == len(expected)
+    for level, ((times, lows, highs), (expected_lows, expected_highs)) in enumerate(
+        zip(pyramid.levels, expected)
+    ):
+        assert list(times) == [float(i) for i in range(0, size, 2**level)]
+        assert list(lows) == expected_lows
+        assert list(highs) == expected_highs
+
+
+def test_views_are_bounded():
+    table = generate_workload(3000, seed=12)
+    simulation = MultiCoreSimulation(table, cores=2)
+    data = ScheduleData.from_events(simulation.events(), table)
+    for lane in data.lanes.values():
+        assert len(lane.view(0.0, data.end, 100)) <= 400
+    times, values = data.queue_length.view(0.0, data.end, 100)
+    assert 0 < len(times) <= 2 * (200 + 2)
+    times, values = data.queue_length.view(0.0, data.end, 10**6)
+    assert len(times) == len(data.queue_length)
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from ingest import ProcessIngestor, parse_record
+from metrics import result_rows
+from scheduler import BurstEstimator, RoundRobinSimulation
+from workload import generate_workload
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_parse_record():
+    assert parse_record("3 ; 1.5 ; 2\n") == (3, 2.0, 1.5)
+    line = json.dumps({"pid": 3, "burst_time": 2.0, "arrival_time": 1.5})
+    assert parse_record(line) == (3, 2.0, 1.5)
+    # Missing times are predicted and taken from the clock.
+    pid, burst_time, arrival_time = parse_record('{"pid": 4}')
+    assert (pid, burst_time, arrival_time) == (4, None, None)
+
+
+@pytest.mark.parametrize(
+    "line", ["{", "[1, 2]", '{"burst_time": 1}', '{"pid": 1, "burst_time": -1}', "1;2"]
+)
+def test_parse_record_rejects_invalid_lines(line):
+    with pytest.raises(ValueError):
+        parse_record(line)
+
+
+def test_read_batches_and_reports_errors():
+    ingestor = ProcessIngestor(batch_size=3)
+
+    async def read():
+        reader = asyncio.StreamReader()
+        lines = ["1 ; 0 ; 2", "oops", "", '{"pid": 2, "burst_time": 1}']
+        lines += [f"{pid} ; 0 ; 1" for pid in range(3, 7)]
+        reader.feed_data("\n".join(lines).encode() + b"\n")
+        reader.feed_eof()
+        await ingestor.read(reader, "test")
+
+    asyncio.run(read())
+    assert [len(batch) for batch in ingestor.batches] == [3, 3]
+    assert ingestor.received == 6
+    assert [(error.line, error.message) for error in ingestor.errors] == [
+        (2, "test: " + str(_error("oops")))
+    ]
+
+
+def _error(line):
+    try:
+        parse_record(line)
+    except ValueError as e:
+        return e
+
+
+def test_back_pressure_waits_for_the_simulation():
+    ingestor = ProcessIngestor(max_pending=1)
+    simulation = RoundRobinSimulation([])
+
+    async def put():
+        await ingestor.put([(1, 1.0, 0.0)])
+        second = asyncio.ensure_future(ingestor.put([(2, 1.0, 0.0)]))
+        await asyncio.sleep(0.1)
+        assert not second.done()
+        ingestor._drain(simulation)
+        await asyncio.wait_for(second, 5)
+
+    asyncio.run(put())
+    assert len(ingestor.batches) == 1
+    assert ingestor.received == 2
+
+
+def send(path, lines):
+    with socket.socket(socket.AF_UNIX) as client:
+        client.connect(path)
+        client.sendall("".join(line + "\n" for line in lines).encode())
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    # Unix socket paths are limited to about a hundred characters.
+    return str(tmp_path / "s")
+
+
+def test_unix_socket_matches_offline_run(socket_path):
+    table = generate_workload(500, seed=28)
+    processes = [table.process(row) for row in range(len(table))]
+    ingestor = ProcessIngestor(batch_size=64, max_pending=100)
+    ingestor.start(ingestor.serve_unix(socket_path))
+    wait_for(lambda: _connectable(socket_path))
+    send(
+        socket_path, [f"{p.pid} ; {p.arrival_time} ; {p.burst_time}" for p in processes]
+    )
+    wait_for(lambda: ingestor.received == len(processes))
+    ingestor.close()
+
+    simulation = RoundRobinSimulation([], "Harmonic")
+    list(ingestor.feed(simulation))
+    expected = RoundRobinSimulation(processes, "Harmonic")
+    expected_rows = expected.run()
+    assert list(result_rows(simulation.table, simulation.terminated_tasks)) == list(
+        result_rows(expected.table, expected_rows)
+    )
+
+
+def test_processes_arrive_while_the_simulation_runs(socket_path):
+    ingestor = ProcessIngestor(batch_size=8, flush_interval=0.01)
+    ingestor.start(ingestor.serve_unix(socket_path))
+    wait_for(lambda: _connectable(socket_path))
+    simulation = RoundRobinSimulation([], burst_estimator=BurstEstimator(initial=2.0))
+    events = []
+    thread = threading.Thread(target=lambda: events.extend(ingestor.feed(simulation)))
+    thread.start()
+    for start in range(0, 100, 25):
+        send(
+            socket_path,
+            [
+                json.dumps({"pid": pid, "burst_time": 0.5})
+                for pid in range(start, start + 25)
+            ],
+        )
+        wait_for(lambda: ingestor.received == start + 25)
+    send(socket_path, [json.dumps({"pid": 100})])
+    wait_for(lambda: ingestor.received == 101)
+    ingestor.close()
+    thread.join(10)
+    assert not thread.is_alive()
+    assert len(simulation.terminated_tasks) == 101
+    assert sorted(simulation.table.pid) == list(range(101))
+    # The new pid ran for the initial prediction.
+    row = list(simulation.table.pid).index(100)
+    assert simulation.table.burst_time[row] == pytest.approx(2.0)
+
+
+def _connectable(path):
+    try:
+        with socket.socket(socket.AF_UNIX) as client:
+            client.connect(path)
+    except OSError:
+        return False
+    return True
+
+
+def test_close_wakes_the_blocked_readers():
+    ingestor = ProcessIngestor(max_pending=1)
+
+    async def put():
+        await ingestor.put([(1, 1.0, 0.0)])
+        await ingestor.put([(2, 1.0, 0.0)])
+
+    thread = ingestor.start(put())
+    wait_for(lambda: ingestor._room is not None)
+    assert thread.is_alive()
+    ingestor.close()
+    thread.join(5)
+    assert not thread.is_alive()
+    # The batch that didn't fit is dropped, the pending one is still fed.
+    assert ingestor.received == 1
+    simulation = RoundRobinSimulation([])
+    assert len(list(ingestor.feed(simulation))) > 0
+    assert list(simulation.table.pid) == [1]
+
+
+def test_blocked_readers_dont_keep_the_interpreter_alive():
+    code = (
+        "import asyncio, time\n"
+        "from ingest import ProcessIngestor\n"
+        "ingestor = ProcessIngestor(max_pending=1)\n"
+        "async def put():\n"
+        "    await ingestor.put([(1, 1.0, 0.0)])\n"
+        "    await ingestor.put([(2, 1.0, 0.0)])\n"
+        "ingestor.start(put())\n"
+        "time.sleep(0.2)\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, timeout=30
+    )
+    assert completed.returncode == 0, completed.stderr
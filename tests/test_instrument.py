@@ -0,0 +1,49 @@
+import pickle
+
+from instrument import Instrumentation
+from scheduler import DISPATCH, TERMINATE, RoundRobinSimulation
+from workload import generate_workload
+
+
+def test_instrumented_run_is_unchanged_and_counted():
+    table = generate_workload(300, seed=1)
+    expected = list(RoundRobinSimulation(table.copy()).events())
+
+    instrumentation = Instrumentation()
+    terminated = []
+    instrumentation.add_hook(
+        TERMINATE, lambda event, simulation: terminated.append(event.row)
+    )
+    simulation = instrumentation.instrument(RoundRobinSimulation(table.copy()))
+    events = list(instrumentation.record(simulation))
+
+    assert events == expected
+    assert terminated == list(simulation.terminated_tasks)
+    dispatches = sum(event.kind == DISPATCH for event in events)
+    assert instrumentation.events[DISPATCH] == dispatches
+    assert instrumentation.counts["quantum"] == dispatches
+    assert instrumentation.counts["admission"] + instrumentation.counts[
+        "dispatch"
+    ] == len(events)
+
+
+def test_instrumented_simulation_pickles_and_detaches():
+    instrumentation = Instrumentation()
+    instrumentation.add_hook(DISPATCH, lambda event, simulation: None)
+    simulation = instrumentation.instrument(
+        RoundRobinSimulation(generate_workload(50, seed=1))
+    )
+    events = simulation.events()
+    for _ in range(20):
+        next(events)
+
+    copy = pickle.loads(pickle.dumps(simulation))
+    assert copy.instrumentation is None
+    assert simulation.instrumentation is instrumentation
+
+    instrumentation.detach(simulation)
+    counted = instrumentation.counts["quantum"]
+    for _ in events:
+        pass
+    assert simulation.instrumentation is None
+    assert instrumentation.counts["quantum"] == counted
@@ -0,0 +1,99 @@
+import csv
+import random
+import statistics
+
+import pytest
+
+from metrics import (
+    PERCENTILES,
+    RESULT_COLUMNS,
+    QuantileSketch,
+    StreamingMetrics,
+    calculate_metrics,
+    percentile,
+    result_rows,
+    save_results,
+)
+from scheduler import RoundRobinSimulation
+from workload import generate_workload, load_workload
+
+
+def test_percentile_is_nearest_rank():
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert percentile(values, 0) == 1.0
+    assert percentile(values, 50) == 2.0
+    assert percentile(values, 51) == 3.0
+    assert percentile(values, 100) == 4.0
+
+
+@pytest.mark.parametrize("relative_accuracy", [0.01, 0.05])
+def test_sketch_within_relative_accuracy(relative_accuracy):
+    rng = random.Random(4)
+    values = [rng.lognormvariate(1.0, 1.5) for _ in range(20000)]
+    values += [0.0] * 500
+    sketch = QuantileSketch(relative_accuracy)
+    for value in values:
+        sketch.add(value)
+    values.sort()
+    for q in (0, 1, 10, 25, 50, 75, 90, 95, 99, 99.9, 100):
+        exact = percentile(values, q)
+        assert sketch.quantile(q) == pytest.approx(exact, rel=relative_accuracy)
+
+
+def test_streaming_metrics_match_calculate_metrics():
+    table = generate_workload(2000, seed=8)
+    rows = RoundRobinSimulation(table).run()
+    exact = calculate_metrics(table, rows)
+    streaming = StreamingMetrics(window=float("inf"))
+    for row in rows:
+        streaming.add_row(table, row)
+    streamed = streaming.summary()
+    assert streamed["count"] == exact["count"]
+    for name in ("waiting_time", "turnaround_time"):
+        assert streamed[f"avg_{name}"] == pytest.approx(exact[f"avg_{name}"])
+        assert streamed[f"max_{name}"] == exact[f"max_{name}"]
+        for q in PERCENTILES:
+            key = f"p{q}_{name}"
+            assert streamed[key] == pytest.approx(exact[key], rel=0.01)
+
+
+def test_calculate_metrics_matches_a_naive_computation():
+    table = generate_workload(1000, seed=20)
+    rows = RoundRobinSimulation(table).run()
+    metrics = calculate_metrics(table, rows)
+    waiting = [table.waiting_time[row] for row in rows]
+    turnaround = [table.terminated_time[row] - table.admitted_time[row] for row in rows]
+    span = max(table.terminated_time) - min(table.admitted_time)
+    assert metrics["count"] == len(rows)
+    assert metrics["throughput"] == pytest.approx(len(rows) / span)
+    assert metrics["avg_waiting_time"] == pytest.approx(statistics.mean(waiting))
+    assert metrics["avg_turnaround_time"] == pytest.approx(statistics.mean(turnaround))
+    assert metrics["max_waiting_time"] == max(waiting)
+    assert metrics["p50_turnaround_time"] == sorted(turnaround)[len(rows) // 2 - 1]
+
+
+def test_save_results_in_chunks(tmp_path):
+    table = generate_workload(250, seed=21)
+    rows = RoundRobinSimulation(table).run()
+    filename = str(tmp_path / "results.csv")
+    save_results(filename, table, rows, chunk_size=16)
+    with open(filename, newline="") as f:
+        lines = list(csv.reader(f))
+    assert tuple(lines[0]) == RESULT_COLUMNS
+    assert lines[1:] == [
+        [str(value) for value in row] for row in result_rows(table, rows)
+    ]
+    # The results can be loaded back as a workload.
+    loaded, errors = load_workload(filename)
+    assert not errors
+    assert list(loaded.pid) == [table.pid[row] for row in rows]
+
+
+def test_streaming_metrics_memory_is_bounded_by_the_window():
+    streaming = StreamingMetrics(window=10.0)
+    for i in range(20000):
+        streaming.add(i * 0.1, 0.0, 0.0)
+        # Without ever asking for the throughput.
+        assert len(streaming.terminations) <= 101
+    assert streaming.throughput() == pytest.approx(100 / 10.0, abs=0.1)
+    assert streaming.count == 20000
@@ -0,0 +1,53 @@
+import pytest
+
+from multicore import LOAD_BALANCING, MultiCoreSimulation, main
+from scheduler import ContextSwitchCost, RoundRobinSimulation
+from workload import generate_workload
+
+
+def schedule(simulation):
+    rows = list(simulation.run())
+    table = simulation.table
+    return (
+        rows,
+        [table.admitted_time[row] for row in rows],
+        [table.terminated_time[row] for row in rows],
+        [table.waiting_time[row] for row in rows],
+    )
+
+
+@pytest.mark.parametrize("load_balancing", LOAD_BALANCING)
+@pytest.mark.parametrize("method", ["Arithmetic", "Harmonic"])
+def test_single_core_matches_scheduler(load_balancing, method):
+    table = generate_workload(300, seed=5)
+    expected = schedule(
+        RoundRobinSimulation(
+            table.copy(), method, context_switch_cost=ContextSwitchCost(0.2)
+        )
+    )
+    simulation = MultiCoreSimulation(
+        table.copy(),
+        cores=1,
+        load_balancing=load_balancing,
+        time_quantum_method=method,
+        context_switch_cost=ContextSwitchCost(0.2),
+    )
+    assert schedule(simulation) == expected
+
+
+@pytest.mark.parametrize("load_balancing", LOAD_BALANCING)
+def test_every_process_runs_its_burst_once(load_balancing):
+    table = generate_workload(300, seed=6)
+    simulation = MultiCoreSimulation(
+        table.copy(), cores=4, load_balancing=load_balancing
+    )
+    rows = simulation.run()
+    assert sorted(rows) == list(range(len(table)))
+    busy = sum(simulation.busy_time)
+    assert busy == pytest.approx(sum(table.burst_time), abs=1e-6)
+
+
+def test_cli_predicts_unknown_bursts(unknown_bursts, capsys):
+    main([unknown_bursts, "--cores", "1", "2"])
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split()[0] for line in lines[1:]] == ["1", "2"]
@@ -0,0 +1,290 @@
+import itertools
+import queue
+from collections import deque
+from threading import Thread
+from types import SimpleNamespace
+
+import pytest
+
+import osproject
+from instrument import Instrumentation
+from metrics import StreamingMetrics
+from osproject import FRAME_RATE, PLAYBACK_SPEEDS, STATUS, RoundRobin, TaskListView
+from scheduler import (
+    ADMIT,
+    DISPATCH,
+    TERMINATE,
+    Process,
+    RoundRobinSimulation,
+)
+from workload import generate_workload
+
+COLOR_SCHEMES = [{"bg": "#aaa", "fg": "#000"}, {"bg": "#555", "fg": "#fff"}]
+
+
+class Font(object):
+    def __init__(self, root, font):
+        pass
+
+    def metrics(self, name):
+        return 10
+
+
+class Canvas(object):
+    """The parts of a `tk.Canvas` used by `TaskListView`,
+    scrolled to `top` in a window of `width` by `height`."""
+
+    def __init__(self, width=300, height=200):
+        self.width = width
+        self.height = height
+        self.top = 0
+        self.ids = itertools.count(1)
+        self.items = {}
+        self.options = {}
+
+    def configure(self, **options):
+        self.options.update(options)
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def canvasy(self, y):
+        return self.top + y
+
+    def _create(self, kind):
+        item = next(self.ids)
+        self.items[item] = {"kind": kind}
+        return item
+
+    def create_rectangle(self, *coords, **options):
+        return self._create("rectangle")
+
+    def create_text(self, *coords, **options):
+        return self._create("text")
+
+    def coords(self, item, *coords):
+        self.items[item]["coords"] = coords
+
+    def itemconfigure(self, item, **options):
+        self.items[item].update(options)
+
+    def visible(self, kind):
+        return sorted(
+            (item for item in self.items.values() if item["kind"] == kind),
+            key=lambda item: item["coords"][1],
+        )
+
+
+class Scrollbar(object):
+    def set(self, first, last):
+        self.position = (first, last)
+
+
+@pytest.fixture
+def view(monkeypatch):
+    monkeypatch.setattr(osproject.tkfont, "Font", Font)
+    described = []
+
+    def describe(item):
+        described.append(item)
+        return f"task {item}"
+
+    view = TaskListView(Canvas(), Scrollbar(), COLOR_SCHEMES, describe, lines=3)
+    view.described = described
+    return view
+
+
+def shown(view):
+    return [
+        item["text"]
+        for item in view.canvas.visible("text")
+        if item.get("state") == "normal"
+    ]
+
+
+def test_only_the_visible_rows_are_drawn(view):
+    # Rows of 3 lines of 10 pixels and 20 pixels of padding.
+    assert view.row_height == 50
+    view.set_items(range(1000000))
+    assert view.canvas.options["scrollregion"] == (0, 0, 300, 1000000 * 50)
+    assert shown(view) == [f"task {i}" for i in range(5)]
+    assert len(view.canvas.items) == 2 * 5
+    assert view.described == list(range(5))
+
+
+def test_scrolling_recycles_the_rows(view):
+    view.set_items(range(1000000))
+    view.canvas.top = 500000 * 50 + 25
+    view.described.clear()
+    view.on_scroll(0.5, 0.5002)
+    assert view.scrollbar.position == (0.5, 0.5002)
+    assert shown(view) == [f"task {i}" for i in range(500000, 500005)]
+    assert view.described == list(range(500000, 500005))
+    # Half of the first and of the last rows are visible,
+    # the five rows drawn before are reused.
+    assert len(view.canvas.items) == 2 * 5
+    # The colors alternate with the index of the row, not of the item.
+    rectangles = [
+        item["fill"]
+        for item in view.canvas.visible("rectangle")
+        if item.get("state") == "normal"
+    ]
+    assert rectangles == [
+        COLOR_SCHEMES[(i + 1) % 2]["bg"] for i in range(500000, 500005)
+    ]
+    assert view.index_at(20) == 500000
+    assert view.index_at(30) == 500001
+
+
+def test_shorter_lists_hide_the_unused_rows(view):
+    view.set_items(range(100))
+    view.set_items(["a", "b"], lines=1)
+    assert view.row_height == 30
+    assert shown(view) == ["task a", "task b"]
+    assert view.index_at(70) is None
+
+
+class Widget(object):
+    def __init__(self):
+        self.calls = []
+
+    def config(self, **options):
+        self.calls.append(options)
+
+    def refresh(self):
+        self.calls.append("refresh")
+
+
+def window(simulation):
+    """A stand-in for `RoundRobin` with the state that
+    `apply_updates` works on after `finalize_tasks_list`."""
+    ns = SimpleNamespace(
+        updates=queue.SimpleQueue(),
+        tasks=deque(),
+        terminated_rows=[],
+        live_metrics=StreamingMetrics(),
+        simulation=simulation,
+        status="",
+        placeholder_text=Widget(),
+        task_view=Widget(),
+    )
+    ns.describe_metrics = lambda: RoundRobin.describe_metrics(ns)
+    return ns
+
+
+def test_updates_are_coalesced_into_one_redraw():
+    simulation = RoundRobinSimulation(generate_workload(200, seed=29))
+    ns = window(simulation)
+    events = simulation.events()
+
+    def animate(count, status):
+        for event in itertools.islice(events, count):
+            RoundRobin.post_update(ns, event.kind, event.row)
+        RoundRobin.post_update(ns, STATUS, status)
+
+    for count in (150, 150, None):
+        # The animation thread posts the updates, the main loop applies them.
+        thread = Thread(target=animate, args=(count, f"status {count}"))
+        thread.start()
+        thread.join()
+        ns.placeholder_text.calls.clear()
+        ns.task_view.calls.clear()
+        RoundRobin.apply_updates(ns)
+        # The widgets show the state of the engine after the last update.
+        assert list(ns.tasks) == list(simulation.tasks)
+        assert ns.terminated_rows == list(simulation.terminated_tasks)
+        assert ns.task_view.calls == ["refresh"]
+        (options,) = ns.placeholder_text.calls
+        assert options["text"].startswith(f"status {count}\nThroughput")
+    assert not ns.tasks
+    assert ns.live_metrics.count == 200
+
+
+def test_no_updates_no_redraw():
+    ns = window(RoundRobinSimulation([]))
+    RoundRobin.apply_updates(ns)
+    assert ns.placeholder_text.calls == []
+    assert ns.task_view.calls == []
+
+
+class StopEvent(object):
+    """Records the waits of the animation instead of sleeping."""
+
+    def __init__(self, stop_after=None):
+        self.waits = []
+        self.stop_after = stop_after
+
+    def wait(self, timeout):
+        self.waits.append(timeout)
+        return self.is_set()
+
+    def is_set(self):
+        return self.stop_after is not None and len(self.waits) >= self.stop_after
+
+
+def animate(processes, speed, stop_event=None, stepping=False):
+    """Run `RoundRobin.run_animation` on a stand-in for the window."""
+    posted = []
+    ns = SimpleNamespace(
+        simulation=RoundRobinSimulation(processes),
+        ingestor=None,
+        instrumentation=Instrumentation(),
+        trace_writer=SimpleNamespace(record=lambda events: events),
+        stop_event=stop_event or StopEvent(),
+        playback_speed=PLAYBACK_SPEEDS[speed],
+        wait_while_paused=lambda: stepping,
+        post_update=lambda kind, value=None: posted.append((kind, value)),
+    )
+    RoundRobin.run_animation(ns)
+    return ns.stop_event.waits, posted
+
+
+def elapsed(posted):
+    return [
+        float(value.split("\t")[1].split("\n")[0])
+        for kind, value in posted
+        if kind == STATUS and value.startswith("Time Elapsed:\t")
+    ]
+
+
+# Two processes running for 1 time unit each, with a long idle gap.
+GAP = [Process(1, 1.0, 0.0), Process(2, 1.0, 100.0)]
+
+
+def test_playback_skips_the_idle_cpu():
+    waits, posted = animate(GAP, "1x")
+    # One tick per wait while a process runs, none while the CPU is idle.
+    assert waits == [pytest.approx(0.1)] * 20
+    assert all(t < 1.0 or 100.0 <= t < 101.0 for t in elapsed(posted))
+    assert (STATUS, "Time Elapsed: 1.0\nProcess 1 Terminated") in posted
+    assert posted[-1] == (STATUS, "Finished! Press 'Stop' to stop the animation.")
+
+
+def test_fast_playback_moves_several_ticks_per_frame():
+    waits, posted = animate(GAP, "10x")
+    # 3 ticks per frame, the waits are never shorter than a frame.
+    assert waits == [pytest.approx(1.0 / FRAME_RATE)] * 8
+    assert elapsed(posted)[:4] == [0.0, 0.3, 0.6, 0.9]
+
+
+@pytest.mark.parametrize("speed, stepping", [("Max", False), ("1x", True)])
+def test_max_speed_and_stepping_jump_to_the_next_event(speed, stepping):
+    waits, posted = animate(GAP, speed, stepping=stepping)
+    assert waits == []
+    assert [kind for kind, _ in posted if kind != STATUS] == [
+        ADMIT,
+        DISPATCH,
+        TERMINATE,
+        ADMIT,
+        DISPATCH,
+        TERMINATE,
+    ]
+
+
+def test_stop_interrupts_the_playback():
+    waits, posted = animate(GAP, "1x", stop_event=StopEvent(stop_after=3))
+    assert len(waits) == 3
+    assert TERMINATE not in [kind for kind, _ in posted]
@@ -0,0 +1,176 @@
+import math
+
+import pytest
+
+from policies import (
+    DynamicRoundRobin,
+    FirstComeFirstServed,
+    MultilevelFeedbackQueue,
+    PolicySimulation,
+    RoundRobin,
+    ShortestJobFirst,
+    ShortestRemainingTimeFirst,
+    WeightedFairShare,
+    compare,
+    default_policies,
+    main,
+)
+from scheduler import (
+    DISPATCH,
+    PREEMPT,
+    TERMINATE,
+    TIME_QUANTUM_METHODS,
+    BurstEstimator,
+    ContextSwitchCost,
+    Process,
+    RoundRobinSimulation,
+)
+from workload import generate_workload, load_workload
+
+
+def schedule(simulation):
+    rows = list(simulation.run())
+    table = simulation.table
+    return (
+        rows,
+        [table.admitted_time[row] for row in rows],
+        [table.terminated_time[row] for row in rows],
+        [table.waiting_time[row] for row in rows],
+    )
+
+
+@pytest.mark.parametrize("method", TIME_QUANTUM_METHODS)
+def test_dynamic_round_robin_matches_scheduler(method):
+    table = generate_workload(400, seed=9)
+    expected = schedule(
+        RoundRobinSimulation(
+            table.copy(), method, context_switch_cost=ContextSwitchCost(0.3)
+        )
+    )
+    simulation = PolicySimulation(
+        table.copy(), DynamicRoundRobin(method), ContextSwitchCost(0.3)
+    )
+    assert schedule(simulation) == expected
+
+
+# Quanta off the grid land on the same tick in both engines.
+@pytest.mark.parametrize("quantum", [0.5, 2.0, 4.0, 0.04, 0.25, 0.35, 1.05, 2.45])
+@pytest.mark.parametrize("resolution", [0.1, 0.25])
+def test_round_robin_matches_fixed_quantum(quantum, resolution):
+    table = generate_workload(400, seed=9)
+    expected = schedule(
+        RoundRobinSimulation(table.copy(), time_quantum=quantum, resolution=resolution)
+    )
+    simulation = PolicySimulation(
+        table.copy(), RoundRobin(quantum), resolution=resolution
+    )
+    assert schedule(simulation) == expected
+
+
+def test_compare_is_independent_of_the_order_of_policies():
+    table = generate_workload(300, seed=10)
+    for row in range(0, len(table), 7):
+        table.burst_time[row] = math.nan
+    cost = ContextSwitchCost(0.2, "exponential", warmup=0.1, seed=3)
+    estimator = BurstEstimator(0.5)
+    policies = default_policies()
+    forward = compare(table, policies, cost, estimator)
+    backward = compare(table, reversed(default_policies()), cost, estimator)
+    assert forward == backward[::-1]
+    # The arguments aren't used up by the runs.
+    assert compare(table, default_policies()[:1], cost, estimator) == forward[:1]
+    assert estimator.predictions == {}
+
+
+def test_compare_runs_on_copies():
+    table = generate_workload(100, seed=11)
+    bursts = list(table.burst_time)
+    results = compare(table, [FirstComeFirstServed(), ShortestJobFirst()])
+    assert [result["policy"] for result in results] == ["FCFS", "SJF"]
+    assert list(table.burst_time) == bursts
+    assert all(map(math.isnan, table.terminated_time))
+
+
+def trace(processes, policy):
+    simulation = PolicySimulation(processes, policy)
+    pid = simulation.table.pid
+    return [
+        (event.time, event.kind, pid[event.row], event.quantum)
+        for event in simulation.events()
+        if event.kind in (DISPATCH, PREEMPT, TERMINATE)
+    ]
+
+
+def test_srtf_preempts_for_a_shorter_arrival():
+    processes = [Process(1, 10.0, 0.0), Process(2, 2.0, 3.0), Process(3, 6.0, 4.0)]
+    assert trace(processes, ShortestRemainingTimeFirst()) == [
+        (0.0, DISPATCH, 1, None),
+        (3.0, PREEMPT, 1, None),
+        (3.0, DISPATCH, 2, None),
+        (5.0, TERMINATE, 2, None),
+        # 3 has less left to run than the 7 of 1.
+        (5.0, DISPATCH, 3, None),
+        (11.0, TERMINATE, 3, None),
+        (11.0, DISPATCH, 1, None),
+        (18.0, TERMINATE, 1, None),
+    ]
+
+
+def test_mlfq_demotes_and_boosts():
+    policy = MultilevelFeedbackQueue((1.0, 2.0, 4.0), boost_interval=None)
+    dispatches = [
+        quantum
+        for _, kind, _, quantum in trace([Process(1, 9.0, 0.0)], policy)
+        if kind == DISPATCH
+    ]
+    assert dispatches == [1.0, 2.0, 4.0, 4.0]
+
+    policy = MultilevelFeedbackQueue((1.0, 2.0, 4.0), boost_interval=6.0)
+    processes = [Process(1, 8.0, 0.0), Process(2, 8.0, 0.0)]
+    dispatches = [
+        (time, quantum)
+        for time, kind, _, quantum in trace(processes, policy)
+        if kind == DISPATCH
+    ]
+    # Both processes go back to the top level every 6 time units.
+    assert dispatches[:6] == [(0.0, 1.0), (1.0, 1.0), (2.0, 2.0), (4.0, 2.0)] + [
+        (6.0, 1.0),
+        (7.0, 1.0),
+    ]
+    assert dispatches[8:10] == [(12.0, 1.0), (13.0, 1.0)]
+
+
+def cpu_shares(processes, policy, until):
+    simulation = PolicySimulation(processes, policy)
+    for event in simulation.events():
+        if event.time >= until:
+            break
+    shares = {}
+    for row in range(len(simulation.table)):
+        group = simulation.table.pid[row] % 10
+        shares[group] = shares.get(group, 0.0) + simulation.table.runtime[row]
+    return shares
+
+
+@pytest.mark.parametrize("pids", [[1, 2], [1, 11, 2, 12]])
+def test_fair_share_follows_the_weights(pids):
+    processes = [Process(pid, 50.0, 0.0) for pid in pids]
+    policy = WeightedFairShare(1.0, {1: 3}, group=lambda pid: pid % 10)
+    assert cpu_shares(processes, policy, 40.0) == {1: 30.0, 2: 10.0}
+
+
+def test_fair_share_idle_groups_dont_catch_up():
+    # 2 arrives while 1 runs, after 1 ran alone for 20. They then take
+    # turns instead of 2 running until its charge catches up with 1.
+    processes = [Process(1, 30.0, 0.0), Process(2, 10.0, 20.5)]
+    shares = cpu_shares(processes, WeightedFairShare(1.0), 31.0)
+    assert shares == {1: 26.0, 2: 5.0}
+
+
+def test_unknown_bursts_are_predicted(unknown_bursts, capsys):
+    table, _ = load_workload(unknown_bursts)
+    results = compare(table, default_policies())
+    assert all(result["count"] == 100 for result in results)
+    main([unknown_bursts])
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1 + len(results)
@@ -0,0 +1,124 @@
+import csv
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import roundrobin
+from metrics import calculate_metrics
+from scheduler import BurstEstimator, ContextSwitchCost, RoundRobinSimulation
+from workload import generate_workload, load_workload
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def workload(tmp_path):
+    table = generate_workload(300, seed=14)
+    filename = tmp_path / "trace.csv"
+    with open(filename, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("pid", "burst_time", "arrival_time"))
+        writer.writerows(zip(table.pid, table.burst_time, table.arrival_time))
+    return str(filename)
+
+
+def run(capsys, *argv):
+    roundrobin.main(list(argv))
+    return json.loads(capsys.readouterr().out)
+
+
+def expected_metrics(workload, method="Harmonic"):
+    table, _ = load_workload(workload)
+    simulation = RoundRobinSimulation(
+        table,
+        method,
+        context_switch_cost=ContextSwitchCost(0.2),
+        burst_estimator=BurstEstimator(),
+    )
+    rows = simulation.run()
+    metrics = calculate_metrics(table, rows)
+    metrics["context_switches"] = simulation.context_switches
+    metrics["switch_overhead"] = simulation.switch_overhead
+    return metrics
+
+
+def test_metrics_are_printed_and_saved(capsys, tmp_path, workload):
+    output = str(tmp_path / "results.json")
+    printed = run(
+        capsys,
+        workload,
+        "--method",
+        "Harmonic",
+        "--switch-overhead",
+        "0.2",
+        "--output",
+        output,
+    )
+    expected = expected_metrics(workload)
+    assert printed == pytest.approx(expected)
+    assert printed["context_switches"] > 0
+    with open(output) as f:
+        saved = json.load(f)
+    assert saved["metrics"] == printed
+    assert len(saved["results"]) == expected["count"]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        ["--cache", "{tmp}/cache"],
+        ["--checkpoint", "{tmp}/run.checkpoint"],
+        ["--stream", "--output", "{tmp}/results.csv"],
+    ],
+)
+def test_every_mode_reports_the_switches(capsys, tmp_path, workload, options):
+    options = [option.format(tmp=tmp_path) for option in options]
+    args = [workload, "--method", "Harmonic", "--switch-overhead", "0.2"] + options
+    printed = run(capsys, *args)
+    expected = expected_metrics(workload)
+    assert printed["context_switches"] == expected["context_switches"]
+    assert printed["switch_overhead"] == pytest.approx(expected["switch_overhead"])
+    # Cached and checkpointed runs give the same metrics again.
+    if "--stream" not in options:
+        assert run(capsys, *args) == printed
+
+
+def test_tkinter_is_not_imported(workload):
+    code = (
+        "import sys, roundrobin\n"
+        f"roundrobin.main([{workload!r}])\n"
+        "assert 'tkinter' not in sys.modules, 'tkinter imported'\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+    )
+    assert completed.returncode == 0, completed.stderr
+    assert "context_switches" in json.loads(completed.stdout)
+
+
+@pytest.mark.parametrize("options", [[], ["--stream", "--output", "{tmp}/r.csv"]])
+def test_workload_without_valid_processes(capsys, tmp_path, options):
+    workload = tmp_path / "trace.csv"
+    workload.write_text("pid,burst_time,arrival_time\n1,x,0\n2,1,-1\n")
+    options = [option.format(tmp=tmp_path) for option in options]
+    assert roundrobin.main([str(workload)] + options) == 1
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    lines = captured.err.splitlines()
+    assert len(lines) == 3
+    assert all("skipped" in line for line in lines[:2])
+    assert lines[2] == f"{workload}: no valid processes"
+
+
+def test_infinite_throughput_is_null(capsys, tmp_path):
+    workload = tmp_path / "trace.csv"
+    workload.write_text("pid,burst_time,arrival_time\n1,0,0\n2,0,0\n")
+    output = str(tmp_path / "results.json")
+    printed = run(capsys, str(workload), "--output", output)
+    assert printed["throughput"] is None
+    assert printed["count"] == 2
+    with open(output) as f:
+        assert json.load(f)["metrics"] == printed
@@ -0,0 +1,44 @@
+import pytest
+
+from schedtrace import TraceReader, TraceWriter
+from scheduler import DISPATCH, RoundRobinSimulation
+from workload import generate_workload
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    table = generate_workload(200, seed=2)
+    simulation = RoundRobinSimulation(table)
+    filename = str(tmp_path / "run.trace")
+    # A small index interval exercises the seek through the time index.
+    with TraceWriter(filename, table, index_interval=16) as writer:
+        events = list(writer.record(simulation.events()))
+    with TraceReader(filename) as trace:
+        yield table, events, trace
+
+
+def test_trace_roundtrip(recorded):
+    table, events, trace = recorded
+    assert len(trace) == len(events)
+    for event, record in zip(events, trace):
+        assert record.time == event.time
+        assert record.kind == event.kind
+        assert record.pid == (None if event.row is None else table.pid[event.row])
+        assert record.quantum == event.quantum
+    assert trace[-1] == list(trace)[-1]
+
+
+def test_seek_and_running_at(recorded):
+    _, events, trace = recorded
+    times = [event.time for event in events]
+    for time in (-1.0, 0.0, times[len(times) // 3] + 0.05, times[-1], times[-1] + 1):
+        expected = next((i for i, t in enumerate(times) if t >= time), len(times))
+        assert trace.seek(time) == expected
+    start, end = times[100], times[200]
+    assert [r.time for r in trace.between(start, end)] == [
+        t for t in times if start <= t < end
+    ]
+    dispatch = next(
+        i for i, event in enumerate(events[1:], 1) if event.kind == DISPATCH
+    )
+    assert trace.running_at(events[dispatch].time) == trace[dispatch]
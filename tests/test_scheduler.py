@@ -0,0 +1,390 @@
+import math
+import random
+import statistics
+
+import pytest
+
+from scheduler import (
+    ADMIT,
+    DISPATCH,
+    IDLE,
+    PREEMPT,
+    TERMINATE,
+    BurstEstimator,
+    BurstStatistics,
+    ContextSwitchCost,
+    Process,
+    ProcessTable,
+    RoundRobinSimulation,
+)
+from workload import generate_workload
+
+ORIGINAL_METHODS = ("Arithmetic", "Geometric", "Harmonic")
+
+
+def original_time_quantum(burst_times, method):
+    # `RoundRobin.get_time_quantum` of the original animation.
+    if method == "Arithmetic":
+        tq = statistics.mean(burst_times)
+    elif method == "Geometric":
+        tq = math.sqrt(sum(burst_times))
+    elif method == "Harmonic":
+        tq = 1.0 / statistics.mean([1.0 / burst_time for burst_time in burst_times])
+    return round(tq, 1)
+
+
+def original_schedule(processes, method):
+    """Port of the tick by tick loop of the original `run_animation`,
+    without the widgets and the sleeps."""
+    new_tasks = sorted(
+        (
+            {"pid": p.pid, "burst_time": p.burst_time, "arrival_time": p.arrival_time}
+            for p in processes
+        ),
+        key=lambda task: task["arrival_time"],
+    )
+    tasks = []
+    terminated = []
+
+    def get_new_tasks(time_elapsed):
+        while new_tasks and new_tasks[0]["arrival_time"] <= time_elapsed:
+            task = new_tasks.pop(0)
+            task["last_preempted"] = time_elapsed
+            task["waiting_time"] = time_elapsed - task["arrival_time"]
+            task["admitted_time"] = time_elapsed
+            task["runtime"] = 0.0
+            tasks.append(task)
+
+    time_elapsed = 0.0
+    while tasks or new_tasks:
+        get_new_tasks(time_elapsed)
+        preempted_or_terminated = False
+        if tasks and tasks[0]["arrival_time"] <= time_elapsed:
+            time_quantum = original_time_quantum(
+                [task["burst_time"] for task in tasks], method
+            )
+            task = tasks.pop(0)
+            task["waiting_time"] += time_elapsed - task["last_preempted"]
+            runtime = 0.0
+            while True:
+                if task["runtime"] == task["burst_time"]:
+                    task["terminated_time"] = time_elapsed
+                    task["last_preempted"] = time_elapsed
+                    terminated.append(task)
+                    preempted_or_terminated = True
+                    break
+                elif runtime == time_quantum:
+                    task["last_preempted"] = time_elapsed
+                    tasks.append(task)
+                    preempted_or_terminated = True
+                    break
+                runtime = round(runtime + 0.1, 1)
+                task["runtime"] = round(task["runtime"] + 0.1, 1)
+                get_new_tasks(time_elapsed)
+                time_elapsed = round(time_elapsed + 0.1, 1)
+        if not preempted_or_terminated:
+            get_new_tasks(time_elapsed)
+            time_elapsed = round(time_elapsed + 0.1, 1)
+    return terminated
+
+
+def random_processes(rng, size):
+    return [
+        Process(
+            pid=pid,
+            burst_time=rng.randint(1, 60) / 10,
+            arrival_time=rng.randint(0, 100) / 10,
+        )
+        for pid in range(size)
+    ]
+
+
+@pytest.mark.parametrize("method", ORIGINAL_METHODS)
+def test_engine_matches_original_animation(method):
+    rng = random.Random(method)
+    for _ in range(150):
+        processes = random_processes(rng, rng.randint(1, 12))
+        expected = original_schedule(processes, method)
+        simulation = RoundRobinSimulation(processes, time_quantum_method=method)
+        rows = simulation.run()
+        table = simulation.table
+        assert [table.pid[row] for row in rows] == [task["pid"] for task in expected]
+        for row, task in zip(rows, expected):
+            assert table.admitted_time[row] == task["admitted_time"]
+            assert table.terminated_time[row] == task["terminated_time"]
+            assert table.waiting_time[row] == pytest.approx(task["waiting_time"])
+
+
+@pytest.mark.parametrize("method", ORIGINAL_METHODS)
+def test_running_aggregates_match_from_scratch_means(method):
+    rng = random.Random(method)
+    statistics_ = BurstStatistics()
+    queue = []
+    for _ in range(20000):
+        if queue and rng.random() < 0.5:
+            statistics_.remove(queue.pop(rng.randrange(len(queue))))
+        else:
+            burst_time = rng.randint(1, 100) / 10
+            queue.append(burst_time)
+            statistics_.add(burst_time)
+        if queue:
+            assert statistics_.time_quantum(method) == original_time_quantum(
+                queue, method
+            )
+
+
+def test_time_quantum_rounds_ties_like_statistics_mean():
+    # The mean of 2.9 and 3.0 is the float 2.95, which rounds up.
+    statistics_ = BurstStatistics([0.1, 2.9, 3.0])
+    statistics_.remove(0.1)
+    assert statistics_.time_quantum("Arithmetic") == 3.0
+
+
+def schedule(simulation):
+    rows = list(simulation.run())
+    table = simulation.table
+    return (
+        rows,
+        [table.terminated_time[row] for row in rows],
+        [table.waiting_time[row] for row in rows],
+    )
+
+
+@pytest.mark.parametrize("method", ["Arithmetic", "True Geometric", "Harmonic"])
+def test_estimator_leaves_known_bursts_alone(method):
+    table = generate_workload(500, seed=3)
+    expected = schedule(RoundRobinSimulation(table.copy(), method))
+    simulation = RoundRobinSimulation(
+        table.copy(), method, burst_estimator=BurstEstimator(0.5)
+    )
+    assert schedule(simulation) == expected
+
+
+def test_unknown_bursts_run_for_their_prediction():
+    processes = [
+        Process(pid=1, burst_time=3.0, arrival_time=0.0),
+        Process(pid=2, burst_time=None, arrival_time=0.0),
+        Process(pid=1, burst_time=None, arrival_time=10.0),
+    ]
+    estimator = BurstEstimator(alpha=0.5, initial=2.0)
+    simulation = RoundRobinSimulation(processes, burst_estimator=estimator)
+    rows = simulation.run()
+    table = simulation.table
+    assert sorted(rows) == [0, 1, 2]
+    # The first pid 1 terminated with 3.0 before the second one arrived.
+    # Unknown bursts aren't observed, they ran for their prediction.
+    assert list(table.burst_time) == [3.0, 2.0, 2.5]
+    assert list(table.runtime) == list(table.burst_time)
+    assert estimator.predictions == {1: 2.5}
+
+
+def test_blind_estimator_still_runs_actual_bursts():
+    table = generate_workload(300, seed=4)
+    bursts = list(table.burst_time)
+    simulation = RoundRobinSimulation(
+        table, burst_estimator=BurstEstimator(0.5, blind=True)
+    )
+    simulation.run()
+    assert list(table.runtime) == pytest.approx(bursts)
+
+
+@pytest.mark.parametrize(
+    "time_quantum, ticks", [(0.04, 1), (0.25, 2), (0.35, 3), (1.05, 11), (2.0, 20)]
+)
+def test_fixed_quantum_rounds_to_the_nearest_tick(time_quantum, ticks):
+    simulation = RoundRobinSimulation([], time_quantum=time_quantum)
+    assert simulation.quantum_ticks() == ticks
+    assert simulation.quantum_ticks(time_quantum=time_quantum) == ticks
+
+
+@pytest.mark.parametrize("resolution", [0.01, 0.001])
+def test_fine_resolution_terminates_exactly(resolution):
+    rng = random.Random(resolution)
+    scale = round(1 / resolution)
+    processes = [
+        Process(
+            pid=pid,
+            burst_time=rng.randint(1, 5 * scale) / scale,
+            arrival_time=rng.randint(0, 20 * scale) / scale,
+        )
+        for pid in range(300)
+    ]
+    simulation = RoundRobinSimulation(processes, "Harmonic", resolution=resolution)
+    rows = simulation.run()
+    table = simulation.table
+    assert sorted(rows) == list(range(len(processes)))
+    for row in rows:
+        assert table.runtime[row] == table.burst_time[row]
+        assert table.admitted_time[row] >= table.arrival_time[row]
+        assert table.terminated_time[row] - table.admitted_time[row] == pytest.approx(
+            table.waiting_time[row]
+            - (table.admitted_time[row] - table.arrival_time[row])
+            + table.burst_time[row]
+        )
+
+
+@pytest.mark.parametrize("method", ["Arithmetic", "Geometric", "Harmonic"])
+def test_events_are_well_formed(method):
+    table = generate_workload(500, seed=17)
+    simulation = RoundRobinSimulation(
+        table, method, context_switch_cost=ContextSwitchCost(0.2)
+    )
+    admitted = set()
+    running = None
+    last_time = 0.0
+    for event in simulation.events():
+        assert event.time >= last_time
+        last_time = event.time
+        if event.kind == ADMIT:
+            assert event.row not in admitted
+            assert event.time >= table.arrival_time[event.row]
+            admitted.add(event.row)
+        elif event.kind == DISPATCH:
+            assert running is None and event.row in admitted
+            assert event.quantum > 0
+            running = event.row
+        elif event.kind in (PREEMPT, TERMINATE):
+            assert event.row == running
+            running = None
+        else:
+            assert event.kind == IDLE and running is None
+    assert running is None
+    rows = simulation.terminated_tasks
+    assert sorted(rows) == sorted(admitted) == list(range(len(table)))
+    for row in rows:
+        assert table.runtime[row] == table.burst_time[row]
+    terminated_times = [table.terminated_time[row] for row in rows]
+    assert terminated_times == sorted(terminated_times)
+
+
+def test_added_processes_are_admitted_in_arrival_order():
+    table = generate_workload(400, seed=18)
+    processes = [table.process(row) for row in range(len(table))]
+    random.Random(18).shuffle(processes)
+    simulation = RoundRobinSimulation([])
+    for process in processes:
+        simulation.add_process(process)
+    # Processes arriving together are admitted in the order they were added.
+    processes.sort(key=lambda process: process.arrival_time)
+    expected = RoundRobinSimulation(processes)
+    assert schedule(simulation)[1:] == schedule(expected)[1:]
+    assert [simulation.table.pid[row] for row in simulation.terminated_tasks] == [
+        expected.table.pid[row] for row in expected.terminated_tasks
+    ]
+
+
+def test_ties_are_admitted_in_insertion_order():
+    simulation = RoundRobinSimulation(
+        [Process(pid=pid, burst_time=1.0, arrival_time=0.0) for pid in (1, 2)]
+    )
+    for pid in (3, 4, 5):
+        simulation.add_process(Process(pid=pid, burst_time=1.0, arrival_time=0.0))
+    rows = simulation.run()
+    assert [simulation.table.pid[row] for row in rows] == [1, 2, 3, 4, 5]
+
+
+def test_late_process_is_admitted_at_the_next_event():
+    simulation = RoundRobinSimulation([Process(pid=1, burst_time=5.0, arrival_time=0)])
+    events = simulation.events()
+    for event in events:
+        if event.kind == DISPATCH:
+            break
+    simulation.add_process(Process(pid=2, burst_time=1.0, arrival_time=0.0))
+    admitted = next(event for event in events if event.kind == ADMIT)
+    assert simulation.table.pid[admitted.row] == 2
+    assert admitted.time == 0.0
+
+
+def test_process_table_roundtrip():
+    processes = [
+        Process(pid=7, burst_time=2.5, arrival_time=1.0),
+        Process(pid=3, burst_time=None, arrival_time=0.0),
+    ]
+    table = ProcessTable.from_processes(processes)
+    assert len(table) == 2
+    # A row is 64 bytes.
+    assert sum(getattr(table, name).itemsize for name in table.columns) == 64
+    for row, process in enumerate(processes):
+        copy = table.process(row)
+        assert (copy.pid, copy.burst_time, copy.arrival_time) == (
+            process.pid,
+            process.burst_time,
+            process.arrival_time,
+        )
+        assert copy.terminated_time is None and copy.waiting_time is None
+
+
+def test_scheduling_a_copy_leaves_the_table_alone():
+    table = generate_workload(200, seed=19)
+    copy = table.copy()
+    rows = RoundRobinSimulation(copy).run()
+    assert all(map(math.isnan, table.terminated_time))
+    processes = [table.process(row) for row in range(len(table))]
+    simulation = RoundRobinSimulation(processes)
+    assert list(simulation.run()) == list(rows)
+    assert list(simulation.table.waiting_time) == list(copy.waiting_time)
+    # Materialized processes carry the results of their row.
+    process = copy.process(rows[0])
+    assert process.terminated_time == copy.terminated_time[rows[0]]
+
+
+def test_switch_costs_are_charged_per_switch():
+    processes = [Process(1, 3.0, 0.0), Process(2, 3.0, 0.0)]
+    cost = ContextSwitchCost(0.5, warmup=0.2)
+    simulation = RoundRobinSimulation(
+        processes, time_quantum=1.0, context_switch_cost=cost
+    )
+    simulation.run()
+    # A B A B A B: six switches, four of them to a resumed process.
+    assert simulation.context_switches == 6
+    assert simulation.switch_overhead == pytest.approx(6 * 0.5 + 4 * 0.2)
+    assert simulation.warmup_overhead == pytest.approx(4 * 0.2)
+    assert max(simulation.table.terminated_time) == pytest.approx(6.0 + 3.8)
+
+
+def test_redispatching_the_preempted_process_is_free():
+    cost = ContextSwitchCost(0.5, warmup=0.25)
+    simulation = RoundRobinSimulation(
+        [Process(1, 10.0, 0.0)], time_quantum=1.0, context_switch_cost=cost
+    )
+    events = list(simulation.events())
+    assert sum(event.kind == DISPATCH for event in events) == 10
+    assert simulation.context_switches == 1
+    assert simulation.switch_overhead == pytest.approx(0.5)
+    assert simulation.table.terminated_time[0] == pytest.approx(10.5)
+
+
+@pytest.mark.parametrize("distribution", ["constant", "uniform", "exponential"])
+def test_cpu_time_adds_up_to_the_makespan(distribution):
+    table = generate_workload(1000, seed=27)
+    cost = ContextSwitchCost(0.3, distribution, warmup=0.1, seed=5)
+    simulation = RoundRobinSimulation(table, "Harmonic", context_switch_cost=cost)
+    events = list(simulation.events())
+    idle = sum(
+        following.time - event.time
+        for event, following in zip(events, events[1:])
+        if event.kind == IDLE
+    )
+    makespan = max(table.terminated_time) - events[0].time
+    busy = sum(table.burst_time)
+    assert makespan == pytest.approx(busy + simulation.switch_overhead + idle)
+    # The overhead counts towards the waiting time of the processes.
+    for row in range(len(table)):
+        turnaround = table.terminated_time[row] - table.admitted_time[row]
+        assert table.waiting_time[row] == pytest.approx(
+            turnaround - table.burst_time[row], abs=1e-9
+        )
+    if distribution != "constant":
+        mean = (simulation.switch_overhead - simulation.warmup_overhead) / (
+            simulation.context_switches
+        )
+        assert mean == pytest.approx(0.3, rel=0.1)
+
+
+def test_switch_cost_rejects_invalid_parameters():
+    with pytest.raises(ValueError):
+        ContextSwitchCost(0.1, "gaussian")
+    with pytest.raises(ValueError):
+        ContextSwitchCost(-0.1)
+    with pytest.raises(ValueError):
+        ContextSwitchCost(0.1, warmup=-1.0)
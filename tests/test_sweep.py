@@ -0,0 +1,67 @@
+import csv
+
+from cache import ResultCache
+from scheduler import TIME_QUANTUM_METHODS, ContextSwitchCost
+from sweep import SWEEP_COLUMNS, format_table, main, save_sweep, sweep
+from workload import generate_workload
+
+
+def workloads():
+    return [
+        ("poisson", generate_workload(300, seed=22)),
+        ("batch", generate_workload(300, arrivals="batch", seed=23)),
+    ]
+
+
+def test_parallel_sweep_matches_serial_sweep():
+    cost = ContextSwitchCost(0.2, "exponential", seed=4)
+    serial = sweep(
+        workloads(), quanta=(2.0, 0.25), max_workers=1, context_switch_cost=cost
+    )
+    parallel = sweep(
+        workloads(), quanta=(2.0, 0.25), max_workers=2, context_switch_cost=cost
+    )
+    assert parallel == serial
+    assert [(r["workload"], r["method"]) for r in serial] == [
+        (name, method)
+        for name in ("poisson", "batch")
+        for method in TIME_QUANTUM_METHODS + ("Fixed", "Fixed")
+    ]
+    # Every cell starts from its own copy of the cost.
+    again = sweep(
+        workloads()[:1],
+        methods=TIME_QUANTUM_METHODS[:1],
+        max_workers=1,
+        context_switch_cost=cost,
+    )
+    assert again == serial[:1]
+
+
+def test_sweep_files_with_a_cache(tmp_path):
+    filename = tmp_path / "trace.csv"
+    table = generate_workload(200, seed=24)
+    with open(filename, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("pid", "burst_time", "arrival_time"))
+        writer.writerows(zip(table.pid, table.burst_time, table.arrival_time))
+        writer.writerow(("bad", "1", "2"))
+    expected = sweep([str(filename)], max_workers=1)
+    assert all(result["skipped"] == 1 for result in expected)
+    assert all(result["processes"] == 200 for result in expected)
+    cache = ResultCache(tmp_path / "cache")
+    assert sweep([str(filename)], max_workers=2, cache=cache) == expected
+    assert sweep([str(filename)], max_workers=1, cache=cache) == expected
+    assert cache.hits == len(TIME_QUANTUM_METHODS)
+
+    output = tmp_path / "sweep.csv"
+    save_sweep(output, expected)
+    with open(output, newline="") as f:
+        assert tuple(next(csv.reader(f))) == SWEEP_COLUMNS
+    assert len(format_table(expected).splitlines()) == len(expected) + 1
+
+
+def test_unknown_bursts_are_predicted(unknown_bursts, capsys):
+    results = sweep([unknown_bursts], max_workers=1)
+    assert all(result["processes"] == 100 for result in results)
+    main([unknown_bursts, "--workers", "1"])
+    assert unknown_bursts in capsys.readouterr().out
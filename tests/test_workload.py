@@ -0,0 +1,84 @@
+import math
+
+import pytest
+
+from workload import (
+    generate_workload,
+    iter_workload,
+    load_csv,
+    load_processes,
+    load_workload,
+    parse_process,
+)
+
+
+def test_parse_process():
+    process = parse_process(" 3 ;1.5;  2 ")
+    assert (process.pid, process.arrival_time, process.burst_time) == (3, 1.5, 2.0)
+
+
+@pytest.mark.parametrize(
+    "text", ["1 ; 2", "1 ; 2 ; 3 ; 4", "a ; 2 ; 3", "1 ; -2 ; 3", "1 ; 2 ; nan"]
+)
+def test_parse_process_rejects_invalid_text(text):
+    with pytest.raises(ValueError):
+        parse_process(text)
+
+
+def test_load_processes_reports_invalid_rows():
+    table, errors = load_processes(
+        [
+            "1 ; 0 ; 2",
+            (2, "x", 1.0),
+            {"pid": 3, "burst_time": "", "arrival_time": 4},
+            {"pid": 4},
+        ]
+    )
+    assert list(table.pid) == [1, 3]
+    assert math.isnan(table.burst_time[1])
+    assert [error.line for error in errors] == [2, 4]
+
+
+@pytest.mark.parametrize("extension", [".csv", ".jsonl"])
+def test_iter_workload_matches_load_workload(tmp_path, extension):
+    filename = tmp_path / f"trace{extension}"
+    if extension == ".csv":
+        filename.write_text(
+            "pid,burst_time,arrival_time\n1,2.5,0\n2,bad,1\n3,,2\n4,1,3\n"
+        )
+    else:
+        filename.write_text(
+            '{"pid": 1, "burst_time": 2.5, "arrival_time": 0}\n'
+            "not json\n\n"
+            '{"pid": 3, "burst_time": null, "arrival_time": 2}\n'
+            '{"pid": 4, "burst_time": 1, "arrival_time": 3}\n'
+        )
+    table, errors = load_workload(str(filename))
+    streamed_errors = []
+    processes = list(iter_workload(str(filename), streamed_errors))
+    assert [p.pid for p in processes] == list(table.pid) == [1, 3, 4]
+    assert [p.arrival_time for p in processes] == list(table.arrival_time)
+    assert streamed_errors == errors
+    assert [error.line for error in errors] == [3 if extension == ".csv" else 2]
+
+
+def test_generate_workload_is_reproducible():
+    first = generate_workload(500, seed=7)
+    second = generate_workload(500, seed=7)
+    assert list(first.burst_time) == list(second.burst_time)
+    assert list(first.arrival_time) == list(second.arrival_time)
+    assert list(first.arrival_time) == sorted(first.arrival_time)
+
+
+def test_loaders_and_iterator_reject_the_same_files(tmp_path):
+    header = tmp_path / "trace.csv"
+    header.write_text("pid,arrival_time\n1,0\n")
+    unknown = tmp_path / "trace.txt"
+    unknown.write_text("1 ; 0 ; 1\n")
+    for filename, message in ((header, "missing columns"), (unknown, "unknown")):
+        with pytest.raises(ValueError, match=message):
+            load_workload(str(filename))
+        with pytest.raises(ValueError, match=message):
+            list(iter_workload(str(filename)))
+    with pytest.raises(ValueError, match="missing columns"):
+        load_csv(str(header))
@@ -0,0 +1,388 @@
+# MIT License
+
+# Copyright (c) 2020 Tirth Patel & Tirth Hihoriya
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Bulk loading of workloads into a `scheduler.ProcessTable`.
+
+Workloads can be read from CSV files with the same columns as
+`process_meta.csv`, from JSON lines files or from any iterable of
+processes. Invalid rows are skipped and reported back as a list of
+`RowError` instead of stopping the whole load.
+
+`generate_workload` creates reproducible synthetic workloads for
+benchmarks and experiments.
+"""
+
+import csv
+import json
+import math
+import os
+import random
+import re
+from collections import namedtuple
+from collections.abc import Mapping
+
+from scheduler import Process, ProcessTable
+
+# Processes typed into the animation have the form
+# "<pid> ; <arrival time> ; <burst time>".
+PROCESS_PATTERN = re.compile(r" *; *")
+
+REQUIRED_COLUMNS = ("pid", "burst_time", "arrival_time")
+
+ARRIVAL_PATTERNS = ("poisson", "batch", "zero")
+BURST_DISTRIBUTIONS = ("uniform", "pareto", "lognormal")
+
+
+class RowError(namedtuple("RowError", ["line", "message"])):
+    """An invalid row of a workload.
+
+    Parameters
+    ----------
+    line: int
+        The line number of the row, starting at 1.
+
+    message: str
+        What is wrong with the row.
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        return f"line {self.line}: {self.message}"
+
+
+def validate(pid, burst_time, arrival_time):
+    """Convert the fields of a process to their types.
+
+    Returns
+    -------
+    fields: tuple
+        The `(pid, burst_time, arrival_time)` of the process. The burst
+        time is `None` if it is missing (`None` or an empty string).
+
+    Raises
+    ------
+    ValueError
+        If any of the fields is invalid.
+    """
+    try:
+        pid = int(pid)
+    except (TypeError, ValueError):
+        raise ValueError(f"pid must be an integer, got {pid!r}") from None
+    if burst_time is None or burst_time == "":
+        burst_time = None
+    else:
+        try:
+            burst_time = float(burst_time)
+        except (TypeError, ValueError):
+            raise ValueError(
+                f"burst time must be a number, got {burst_time!r}"
+            ) from None
+    try:
+        arrival_time = float(arrival_time)
+    except (TypeError, ValueError):
+        raise ValueError(
+            f"arrival time must be a number, got {arrival_time!r}"
+        ) from None
+    if burst_time is not None and (not math.isfinite(burst_time) or burst_time < 0):
+        raise ValueError(f"burst time must be non-negative, got {burst_time}")
+    if not math.isfinite(arrival_time) or arrival_time < 0:
+        raise ValueError(f"arrival time must be non-negative, got {arrival_time}")
+    return pid, burst_time, arrival_time
+
+
+def parse_process(text):
+    """Parse a process of the form "<pid> ; <arrival time> ; <burst time>".
+
+    Raises
+    ------
+    ValueError
+        If the text is not a valid process.
+    """
+    fields = PROCESS_PATTERN.split(text.strip())
+    if len(fields) != 3:
+        raise ValueError(
+            "expected '<pid> ; <arrival time> ; <burst time>', " f"got {text!r}"
+        )
+    pid, arrival_time, burst_time = fields
+    pid, burst_time, arrival_time = validate(pid, burst_time, arrival_time)
+    return Process(pid=pid, burst_time=burst_time, arrival_time=arrival_time)
+
+
+def _fields(record):
+    if isinstance(record, Process):
+        return record.pid, record.burst_time, record.arrival_time
+    if isinstance(record, Mapping):
+        missing = [column for column in REQUIRED_COLUMNS if column not in record]
+        if missing:
+            raise ValueError(f"missing columns: {', '.join(missing)}")
+        return tuple(record[column] for column in REQUIRED_COLUMNS)
+    if isinstance(record, str):
+        process = parse_process(record)
+        return process.pid, process.burst_time, process.arrival_time
+    fields = tuple(record)
+    if len(fields) != 3:
+        raise ValueError(f"expected (pid, burst_time, arrival_time), got {record!r}")
+    return fields
+
+
+def _json_record(text):
+    try:
+        record = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"invalid JSON: {e}") from None
+    if not isinstance(record, Mapping):
+        raise ValueError(f"expected a JSON object, got {text!r}")
+    return record
+
+
+def load_processes(records, table=None, start=1):
+    """Load processes from an iterable into a `ProcessTable`.
+
+    Parameters
+    ----------
+    records: iterable
+        Each record is either a `Process`, a mapping with the keys
+        `pid`, `burst_time` and `arrival_time`, a string of the form
+        "<pid> ; <arrival time> ; <burst time>" or a
+        `(pid, burst_time, arrival_time)` tuple.
+
+    table: optional, ProcessTable
+        The table to append the processes to. A new table is
+        created if not given.
+
+    start: optional, int
+        The line number of the first record. Defaults to 1.
+
+    Returns
+    -------
+    table: ProcessTable
+        The table the valid processes were appended to.
+
+    errors: list
+        A `RowError` for every record that was skipped.
+    """
+    if table is None:
+        table = ProcessTable()
+    errors = []
+    for line, record in enumerate(records, start):
+        try:
+            table.append(*validate(*_fields(record)))
+        except ValueError as e:
+            errors.append(RowError(line, str(e)))
+    return table, errors
+
+
+def _is_jsonl(filename):
+    # Whether a workload file is JSON lines rather than CSV.
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return True
+    if extension == ".csv":
+        return False
+    raise ValueError(f"{filename}: unknown workload format {extension!r}")
+
+
+def _read_rows(filename, jsonl, errors=None):
+    """Yield the validated `(pid, burst_time, arrival_time)` of every
+    row of a CSV or JSON lines file, appending a `RowError` to `errors`
+    for every row that is skipped."""
+    with open(filename, newline="") as f:
+        if jsonl:
+            records = ((line, text) for line, text in enumerate(f, 1) if text.strip())
+        else:
+            reader = csv.DictReader(f)
+            missing = [
+                column
+                for column in REQUIRED_COLUMNS
+                if column not in (reader.fieldnames or ())
+            ]
+            if missing:
+                raise ValueError(
+                    f"{filename}: missing columns in header: {', '.join(missing)}"
+                )
+            # The header is on line 1, so the first process is on line 2.
+            records = enumerate(reader, 2)
+        for line, record in records:
+            try:
+                if jsonl:
+                    record = _json_record(record.strip())
+                fields = validate(*_fields(record))
+            except ValueError as e:
+                if errors is not None:
+                    errors.append(RowError(line, str(e)))
+                continue
+            yield fields
+
+
+def _load(filename, jsonl, table):
+    if table is None:
+        table = ProcessTable()
+    errors = []
+    for fields in _read_rows(filename, jsonl, errors):
+        table.append(*fields)
+    return table, errors
+
+
+def load_csv(filename, table=None):
+    """Load processes from a CSV file with a header containing at least
+    the `pid`, `burst_time` and `arrival_time` columns. Any other column,
+    like the ones written by `metrics.save_results`, is ignored.
+
+    Returns
+    -------
+    table: ProcessTable
+        The table the valid processes were appended to.
+
+    errors: list
+        A `RowError` for every row that was skipped.
+    """
+    return _load(filename, False, table)
+
+
+def load_jsonl(filename, table=None):
+    """Load processes from a JSON lines file. Every line must be an
+    object with the `pid`, `burst_time` and `arrival_time` keys.
+
+    Returns
+    -------
+    table: ProcessTable
+        The table the valid processes were appended to.
+
+    errors: list
+        A `RowError` for every line that was skipped.
+    """
+    return _load(filename, True, table)
+
+
+def load_workload(filename, table=None):
+    """Load a workload from a CSV (`.csv`) or JSON lines
+    (`.jsonl`, `.ndjson`) file.
+
+    Returns
+    -------
+    table: ProcessTable
+        The table the valid processes were appended to.
+
+    errors: list
+        A `RowError` for every row that was skipped.
+    """
+    return _load(filename, _is_jsonl(filename), table)
+
+
+def iter_workload(filename, errors=None):
+    """Read the processes of a workload file like `load_workload`, one
+    at a time, without loading the whole file in memory.
+
+    Parameters
+    ----------
+    filename: str
+        A CSV (`.csv`) or JSON lines (`.jsonl`, `.ndjson`) file.
+
+    errors: optional, list
+        A `RowError` is appended to it for every row that is skipped.
+
+    Yields
+    ------
+    process: Process
+        The valid processes, in the order of the file.
+    """
+    for pid, burst_time, arrival_time in _read_rows(
+        filename, _is_jsonl(filename), errors
+    ):
+        yield Process(pid=pid, burst_time=burst_time, arrival_time=arrival_time)
+
+
+def generate_workload(
+    size,
+    arrivals="poisson",
+    bursts="lognormal",
+    seed=0,
+    arrival_rate=0.18,
+    mean_burst_time=5.0,
+    batch_size=100,
+):
+    """Generate a synthetic workload.
+
+    The same arguments always generate the same workload.
+
+    Parameters
+    ----------
+    size: int
+        Number of processes.
+
+    arrivals: optional, str
+        How the processes arrive.
+         - "poisson": one at a time with exponential inter-arrival times.
+         - "batch": in batches of `batch_size` processes arriving together,
+           with exponential times between the batches.
+         - "zero": all of them at time 0.
+
+    bursts: optional, str
+        Distribution of the burst times. One of "uniform", "pareto"
+        (heavy tailed, with a shape of 1.5) or "lognormal" (with a
+        sigma of 1).
+
+    seed: optional, int
+        Seed of the random number generator.
+
+    arrival_rate: optional, float
+        Mean number of processes arriving per unit of time.
+
+    mean_burst_time: optional, float
+        Mean of the burst time distribution.
+
+    batch_size: optional, int
+        Number of processes per batch for "batch" arrivals.
+
+    Returns
+    -------
+    table: ProcessTable
+        The processes, sorted by arrival time. Times are rounded to
+        one decimal place and every burst time is at least 0.1.
+    """
+    if arrivals not in ARRIVAL_PATTERNS:
+        raise ValueError(f"Unknown arrival pattern: {arrivals!r}")
+    if bursts not in BURST_DISTRIBUTIONS:
+        raise ValueError(f"Unknown burst time distribution: {bursts!r}")
+
+    rng = random.Random(seed)
+    if bursts == "uniform":
+        next_burst = lambda: rng.uniform(0, 2 * mean_burst_time)
+    elif bursts == "pareto":
+        shape = 1.5
+        scale = mean_burst_time * (shape - 1) / shape
+        next_burst = lambda: scale * rng.paretovariate(shape)
+    else:
+        sigma = 1.0
+        mu = math.log(mean_burst_time) - sigma**2 / 2
+        next_burst = lambda: rng.lognormvariate(mu, sigma)
+
+    table = ProcessTable()
+    arrival_time = 0.0
+    for pid in range(size):
+        if arrivals == "poisson":
+            arrival_time += rng.expovariate(arrival_rate)
+        elif arrivals == "batch" and pid % batch_size == 0 and pid > 0:
+            arrival_time += rng.expovariate(arrival_rate / batch_size)
+        table.append(pid, max(round(next_burst(), 1), 0.1), round(arrival_time, 1))
+    return table